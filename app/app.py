@@ -42,6 +42,7 @@ from app.service.emails.email_cache_service import EmailCacheService
 from app.service.emails.email_collection_service import EmailCollectionService
 from app.service.emails.email_crud_service import EmailCRUDService
 from app.service.emails.paginated_email_service import PaginatedEmailService
+from app.service.emails.redis_cache_backend import RedisCacheBackend
 from app.service.emails.recursive_email_service import RecursiveEmailService
 from app.service.emails.select_email_service import SelectEmailService
 from app.service.folder_service import FolderService
@@ -52,7 +53,7 @@ from app.service.session_store.session_store_service import SessionStore
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI): #we need the type hinting here but we aren't using the application object
+async def lifespan(application: FastAPI):
     """Manages the lifecycle of the FastAPI application.
     
     This context manager handles database initialization during startup and cleanup during shutdown.
@@ -95,6 +96,13 @@ async def lifespan(_: FastAPI): #we need the type hinting here but we aren't usi
     except (SQLAlchemyError, ConnectionError) as e:
         logger.exception("Error during database cleanup: %s", e)
 
+    # Close the Graph connection pool shared by every Graph client
+    await application.state.graph.close()
+
+    # Close the Redis client shared by every email cache
+    if application.state.l2_backend:
+        await application.state.l2_backend.close()
+
     logger.info("Shutting down...Goodbye!")
 
 
@@ -122,7 +130,11 @@ def init_app() -> FastAPI:
 
     # Initialize core services
     graph = Graph()
+    app_init.state.graph = graph  # closed by the lifespan on shutdown
     graph_translator = GraphIDTranslator(graph)
+    # Shared Redis tier of the email caches, None when REDIS_URL is not set
+    l2_backend = RedisCacheBackend.from_env()
+    app_init.state.l2_backend = l2_backend  # closed by the lifespan on shutdown
     
     # Initialize repositories
     repositories = {
@@ -132,7 +144,7 @@ def init_app() -> FastAPI:
     }
 
     # Initialize services
-    services = create_services(graph, graph_translator, repositories)
+    services = create_services(graph, graph_translator, repositories, l2_backend)
 
     # Add exception handler manager to services
     services['exception_handler_manager'] = handler
@@ -163,23 +175,23 @@ def init_app() -> FastAPI:
     
 
 
-def create_services(graph, graph_translator, repositories):
+def create_services(graph, graph_translator, repositories, l2_backend):
     """Creates and returns a dictionary of service instances."""
     email_crud = EmailCRUDService(repositories['email'])
     attachment_crud = AttachmentCRUDService(repositories['attachment'])
     
     return {
-        'paginated_email': PaginatedEmailService(graph),
+        'paginated_email': PaginatedEmailService(graph, l2_backend),
         'email_collection': EmailCollectionService(graph, graph_translator),
         'folder': FolderService(graph),
         'attachment_graph': AttachmentGraphService(
             graph, email_crud, attachment_crud, AttachmentFileService()
         ),
-        'email_cache': EmailCacheService(),
+        'email_cache': EmailCacheService(l2_backend=l2_backend),
         'recursive_email': RecursiveEmailService(
             folder_service=FolderService(graph),
             email_collection_service=EmailCollectionService(graph, graph_translator),
-            email_cache_service=EmailCacheService(),
+            email_cache_service=EmailCacheService(l2_backend=l2_backend),
             email_repository=repositories['email'],
             email_recipient_repository=repositories['email_recipient']
         ),
@@ -188,7 +200,7 @@ def create_services(graph, graph_translator, repositories):
             graph_translator, 
             repositories['email'],
             repositories['email_recipient'],
-            PaginatedEmailService(graph)
+            PaginatedEmailService(graph, l2_backend)
         ),
         'session_store': SessionStore()
     }
@@ -1,3 +1,6 @@
+# Python standard library imports
+from typing import Optional
+
 # Third party imports
 from fastapi import HTTPException
 
@@ -14,15 +17,20 @@ class GraphResponseException(HTTPException):
      we should raise this exception.
 
     This will help track changes in the Graph API response format.
+
+    It is also raised for throttled JSON batch sub-requests (429/503/504), carrying
+    the longest Retry-After Graph asked for, in seconds.
     """
     def __init__(
         self, 
         detail: str = "Invalid Graph API response", 
         status_code: int = 500,
-        response_type: str = None
+        response_type: str = None,
+        retry_after: Optional[float] = None
     ):
         super().__init__(status_code=status_code, detail=detail)
         self.response_type = response_type
+        self.retry_after = retry_after
 
     def __str__(self):
         base_msg = f"GraphResponseException: {self.detail}"
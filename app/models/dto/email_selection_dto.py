@@ -13,12 +13,16 @@ class EmailSelectionDTO(BaseModel):
         ref_id (int): Reference ID for the emails (e.g., matter ID, case ID)
         ref_type (str): Type of reference (e.g., "MATTER", "CASE")
         created_by (int): User ID of the person making the request
+        page (int): Page of the folder the emails were selected from, used on a cache miss
+        per_page (int): Page size the emails were selected with, used on a cache miss
     """
     
     email_source_ids: List[str] = Field(..., min_length=1, max_length=50)
     ref_id: int = Field(..., gt=0)
     ref_type: str = Field(..., min_length=1, max_length=30)
     created_by: int = Field(..., gt=0)
+    page: int = Field(default=1, gt=0)
+    per_page: int = Field(default=25, gt=0)
 
     model_config = ConfigDict(
         json_schema_extra = {
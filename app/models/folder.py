@@ -1,5 +1,5 @@
 # Standard library imports
-from typing import Optional
+from typing import Any, Dict, Optional
 
 # Third party imports
 from pydantic import BaseModel
@@ -58,4 +58,26 @@ class Folder(BaseModel):
             total_item_count=getattr(folder, 'total_item_count', 0),
             unread_item_count=getattr(folder, 'unread_item_count', 0),
             is_hidden=getattr(folder, 'is_hidden', False)
+        )
+
+    @classmethod
+    def from_graph_json(cls, folder: Dict[str, Any]):
+        """
+        Create a Folder instance from a raw mailFolder JSON object, e.g. the body
+        of a JSON batch sub-response, which the SDK does not deserialize for us.
+
+        Args:
+            folder: mailFolder JSON object, with Graph's camelCase keys.
+
+        Returns:
+            Folder: New instance with mapped properties.
+        """
+        return cls(
+            id=folder["id"],
+            display_name=folder.get("displayName") or "Unnamed Folder",
+            parent_folder_id=folder.get("parentFolderId"),
+            child_folder_count=folder.get("childFolderCount", 0),
+            total_item_count=folder.get("totalItemCount", 0),
+            unread_item_count=folder.get("unreadItemCount", 0),
+            is_hidden=folder.get("isHidden", False)
         )
\ No newline at end of file
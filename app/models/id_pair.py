@@ -0,0 +1,8 @@
+# Python standard library imports
+from typing import NamedTuple
+
+
+class IdPair(NamedTuple):
+    """A Graph REST ID and the immutable ID it translates to. As a pair, a list of them feeds dict() directly."""
+    source_id: str
+    target_id: str
@@ -25,6 +25,7 @@ class BatchMetrics(BaseMetrics):
     
     # Counters and totals
     pages_fetched: int = Field(default=0)
+    messages_fetched: int = Field(default=0)
     ids_translated: int = Field(default=0)
     emails_processed: int = Field(default=0)
     total_count: int = Field(default=0)  # Total number of emails to process
@@ -37,6 +38,7 @@ class BatchMetrics(BaseMetrics):
     # Internal start times (excluded from output)
     translation_start: float = Field(default=0.0, exclude=True)
     processing_start: float = Field(default=0.0, exclude=True)
+    last_progress_time: float = Field(default=0.0, exclude=True)  # monotonic time of the last progress update
     
     # Page details (single values instead of dictionaries)
     current_page_time: float = Field(default=0.0)
@@ -72,6 +74,13 @@ class BatchMetrics(BaseMetrics):
     def record_page_error(self):
         self.total_errors = self.total_errors + 1
 
+    # ---------------------- Translation Metrics ---------------------- #
+    def record_translation_retry(self):
+        self.total_retries = self.total_retries + 1
+
+    def record_translation_error(self):
+        self.total_errors = self.total_errors + 1
+
 
     # ---------------------- Final Logging ---------------------- #
     def log_final_metrics(self, logger: logging.Logger):
@@ -96,27 +105,18 @@ class BatchMetrics(BaseMetrics):
     def calculate_overall_progress(self) -> float:
         """
         Calculate the overall progress as a percentage (0-100).
-        The progress range is divided among the phases:
+        The phases run concurrently, so each one contributes its own share of the range:
           - Fetching: up to 33%
-          - Translating: 33%-66%
-          - Processing: 66%-100%
+          - Translating: up to 33%
+          - Processing: up to 34%
         """
-        if self.total_count == 0:
+        if not self.total_count:
             return 0
 
-        if self.current_phase == "fetching":
-            # If available, use page_items from page 0; otherwise assume 0
-            first_page_count = self.current_page_items
-            return min(100 * (self.pages_fetched * first_page_count) / self.total_count, 33)
-        if self.current_phase == "translating":
-            base = 33
-            translation_progress = (self.ids_translated / self.total_count) * 33
-            return base + translation_progress
-        if self.current_phase == "processing":
-            base = 66
-            processing_progress = (self.emails_processed / self.total_count) * 34
-            return base + processing_progress
-        return 0
+        fetching_progress = min(self.messages_fetched / self.total_count, 1) * 33
+        translation_progress = min(self.ids_translated / self.total_count, 1) * 33
+        processing_progress = min(self.emails_processed / self.total_count, 1) * 34
+        return fetching_progress + translation_progress + processing_progress
 
     def get_progress_info(self) -> Dict[str, Any]:
         """
@@ -13,9 +13,13 @@ class RetryContext:
         error_recorder: Optional function to record error metrics
         abort_on_exceptions: Optional list of Exceptions that allows for aborting retries 
         on specific exceptions 
+        respect_retry_after: Wait for the server's Retry-After, when the exception carries one,
+        instead of the exponential backoff. Throttled APIErrors (429, 503) are then retried
+        instead of aborting
     """
     operation: Callable[[], Any]
     error_msg: str
     metrics_recorder: Optional[Callable[[], None]] = None
     error_recorder: Optional[Callable[[], None]] = None 
-    abort_on_exceptions: Optional[List[Type[Exception]]] = None 
\ No newline at end of file
+    abort_on_exceptions: Optional[List[Type[Exception]]] = None
+    respect_retry_after: bool = False 
\ No newline at end of file
@@ -21,6 +21,7 @@ class RetryConfig:
     max_retries: int
     base_delay: int  # in seconds
     max_timeout: Optional[int] = None  # in seconds
+    max_delay: float = 60.0  # in seconds, cap on a single wait, our backoff or the server's Retry-After
 
 class RetryConfigurations:
     """
@@ -47,9 +48,14 @@ class RetryConfigurations:
             # - 5 seconds is generally accepted maximum for good UX
             # - Allows for initial attempt plus both retries within UX threshold
             # - Fails fast if operation isn't succeeding quickly
+            #
+            # max_delay=2:
+            # - Backoff never reaches it, it caps a server's Retry-After
+            # - Longer waits wouldn't leave room for another attempt within max_timeout
             max_retries=2,
             base_delay=1,
-            max_timeout=5
+            max_timeout=5,
+            max_delay=2
         ),
         
         RetryProfile.STANDARD: RetryConfig(
@@ -70,9 +76,14 @@ class RetryConfigurations:
             # - 30 seconds covers full retry cycle plus overhead
             # - Standard timeout for most web operations
             # - Allows for reasonable API latency and processing time
+            #
+            # max_delay=10:
+            # - Backoff never reaches it, it caps a server's Retry-After
+            # - Leaves room for further attempts within max_timeout
             max_retries=3,
             base_delay=2,
-            max_timeout=30
+            max_timeout=30,
+            max_delay=10
         ),
         
         RetryProfile.BATCH: RetryConfig(
@@ -86,7 +97,7 @@ class RetryConfigurations:
             #
             # base_delay=3:
             # - Longer delays between attempts for rate limiting and throttling
-            # - With exponential backoff: 3s, 9s, 27s, 81s, 243s between retries
+            # - With exponential backoff: 3s, 6s, 12s, 24s between retries
             # - Allows API quotas to reset between attempts
             #
             # max_timeout=300:
@@ -94,9 +105,14 @@ class RetryConfigurations:
             # - Accommodates large data sets and API throttling
             # - Matches Microsoft Graph API's typical timeout for batch operations
             # - Allows for multiple retry cycles even with longer backoff periods
+            #
+            # max_delay=60:
+            # - Backoff never reaches it, it caps a server's Retry-After
+            # - Graph's throttling waits rarely run longer, a minute keeps most of max_timeout for the retries
             max_retries=5,
             base_delay=3,
-            max_timeout=300
+            max_timeout=300,
+            max_delay=60
         )
     }
     @classmethod
@@ -1,6 +1,9 @@
 # Python standard library imports
 import logging
-from typing import List
+from typing import Any, Dict, List
+
+# Third party imports
+from sqlalchemy import insert
 
 # Application imports
 from app.error_handling.exceptions.email_persistence_exception import EmailPersistenceException
@@ -45,3 +48,30 @@ class EmailRecipientRepository:
                     raise EmailPersistenceException(f"Failed to save recipient: {str(e)}") from e
             
             self.logger.info("Successfully persisted %d recipients", len(recipients))
+
+    async def bulk_insert_rows(self, rows: List[Dict[str, Any]]):
+        """
+        Bulk insert plain recipient rows (see EmailUtils.recipient_rows_from_email) with a
+        single executemany INSERT, instead of one flush and commit per recipient.
+        """
+        retry_context = RetryContext(
+            operation=lambda: self._execute_bulk_insert(rows),
+            error_msg="Failed to insert recipients in bulk operation",
+        )
+        return await self.retry_service.retry_operation(retry_context)
+
+    async def _execute_bulk_insert(self, rows: List[Dict[str, Any]]):
+        """
+        Internal method to insert recipient rows in one statement and one transaction.
+        """
+        async with get_db() as session:
+            self.logger.info("Starting to bulk insert %d recipients", len(rows))
+            try:
+                await session.execute(insert(DBEmailRecipient), rows)
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                self.logger.error("Failed to bulk insert recipients: %s", str(e))
+                raise EmailPersistenceException(f"Failed to save recipients: {str(e)}") from e
+
+            self.logger.info("Successfully persisted %d recipients", len(rows))
@@ -1,10 +1,10 @@
 # Python standard library imports
 import logging
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
 # Third party imports
 import pymysql
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.exc import IntegrityError, NoResultFound
 
 # Application imports
@@ -72,6 +72,88 @@ class EmailRepository:
 
 
 
+    async def bulk_insert_rows(self, rows: List[Dict[str, Any]]) -> Tuple[List[Any], List[Any], List[Any]]:
+        """
+        Bulk insert plain DBEmail rows (see EmailUtils.email_to_rows_recursive). Rows whose
+        graph_message_id is already stored are reported as duplicates and the rest go in with
+        a single executemany INSERT, without building ORM instances.
+
+        Returned entries expose email_id, graph_source_id and graph_message_id, so they can be
+        handed to the same EmailUtils helpers as the results of bulk_save_emails.
+        """
+        try:
+            successful_emails, duplicate_emails, failed_emails = await self._execute_bulk_insert(rows)
+
+            if successful_emails:
+                self.logger.info("Successfully persisted %d emails", len(successful_emails))
+            if duplicate_emails:
+                self.logger.info("Found %d duplicate emails", len(duplicate_emails))
+            if failed_emails:
+                self.logger.warning("Failed to persist %d emails", len(failed_emails))
+
+            if failed_emails and not (duplicate_emails or successful_emails):
+                raise EmailPersistenceException(
+                    f"Failed to persist some emails. {len(failed_emails)} failures."
+                )
+
+            return successful_emails, duplicate_emails, failed_emails
+
+        except EmailPersistenceException:
+            raise
+        except Exception as e:
+            self.logger.error("Error during bulk email insert: %s", str(e))
+            raise EmailPersistenceException(f"Failed to persist emails: {str(e)}") from e
+
+
+
+
+
+    async def _execute_bulk_insert(self, rows: List[Dict[str, Any]]) -> Tuple[List[Any], List[Any], List[Any]]:
+        """
+        Execute the bulk insert. If a duplicate slips in between the lookup and the insert
+        (another request persisting the same folder), the batch is rolled back and handed to
+        the row by row path in _execute_persist, which sorts out duplicates individually.
+        """
+        message_ids = [row["graph_message_id"] for row in rows]
+        key_columns = (DBEmail.email_id, DBEmail.graph_source_id, DBEmail.graph_message_id)
+
+        async with get_db() as session:
+            self.logger.info("Starting repository operation to bulk insert %d emails", len(rows))
+            existing = await session.execute(
+                select(*key_columns).where(DBEmail.graph_message_id.in_(message_ids))
+            )
+            duplicate_emails = existing.all()
+            duplicate_ids = {email.graph_message_id for email in duplicate_emails}
+            new_rows = [row for row in rows if row["graph_message_id"] not in duplicate_ids]
+            if not new_rows:
+                return [], duplicate_emails, []
+
+            try:
+                await session.execute(insert(DBEmail), new_rows)
+                await session.commit()
+            except IntegrityError as e:
+                await session.rollback()
+                if not (isinstance(e.orig, pymysql.err.IntegrityError) and e.orig.args[0] == RepositoryConstants.MYSQL_DUPLICATE_ENTRY_ERROR):
+                    raise
+            else:
+                inserted = await session.execute(
+                    select(*key_columns).where(
+                        DBEmail.graph_message_id.in_([row["graph_message_id"] for row in new_rows])
+                    )
+                )
+                return inserted.all(), duplicate_emails, []
+
+        # Out of the rolled back session, the row by row path opens its own
+        self.logger.info("Duplicate found during bulk insert, falling back to persisting emails one at a time")
+        successful_emails, late_duplicates, failed_emails = await self._execute_persist(
+            [DBEmail(**row) for row in new_rows]
+        )
+        return successful_emails, duplicate_emails + late_duplicates, failed_emails
+
+
+
+
+
     async def _persist_emails(self, emails: List[DBEmail]) -> List[DBEmail]:
         """
         Internal method to persist emails to the database.
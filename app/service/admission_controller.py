@@ -0,0 +1,95 @@
+"""
+SUMMARY:
+
+Admission controller for concurrent Graph calls. It behaves like an asyncio.Semaphore
+whose limit can be changed while calls are in flight, which a Semaphore can't do safely.
+
+It is built on a plain counter and a queue of waiting futures. When Graph throttles us the
+limit shrinks by one, and after a run of successful calls it grows back by one until it
+reaches the configured maximum. Lowering the limit never interrupts calls already
+admitted, it only holds back new ones until enough of them finish.
+
+Releasing a slot is synchronous, so a call cancelled on its way out of the controller
+can't be interrupted halfway through giving its slot back.
+"""
+# Python standard library imports
+import asyncio
+from collections import deque
+import logging
+from typing import Deque
+
+
+class AdmissionController:
+    def __init__(self, max_limit: int, grow_after: int = 10):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.active = 0
+        self.grow_after = grow_after
+        self._successes = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.logger = logging.getLogger(__name__)
+
+    async def acquire(self) -> None:
+        """Wait until a slot is free under the current limit and take it."""
+        while self.active >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Woken up and cancelled at the same time, pass the wakeup on instead of losing it
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_next()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.active += 1
+
+    def release(self) -> None:
+        """Give a slot back and wake up one waiting caller."""
+        self.active -= 1
+        self._wake_next()
+
+    def set_limit(self, limit: int) -> None:
+        """
+        Change the number of calls allowed in flight.
+
+        Args:
+            limit (int): The new limit, clamped between 1 and max_limit
+        """
+        self.limit = min(max(1, limit), self.max_limit)
+        # Waiters re-check the limit when they wake, so waking one per free slot is enough
+        for _ in range(self.limit - self.active):
+            self._wake_next()
+
+    def record_throttle(self) -> None:
+        """Shrink the limit by one after the remote side throttled a call."""
+        self._successes = 0
+        self.set_limit(self.limit - 1)
+        self.logger.warning("Throttled by Graph, concurrency limit lowered to %d", self.limit)
+
+    def record_success(self) -> None:
+        """Grow the limit by one, up to max_limit, after grow_after successful calls in a row."""
+        if self.limit >= self.max_limit:
+            return
+        self._successes += 1
+        if self._successes >= self.grow_after:
+            self._successes = 0
+            self.set_limit(self.limit + 1)
+            self.logger.info("Concurrency limit raised to %d", self.limit)
+
+    def _wake_next(self) -> None:
+        # Wake the oldest waiter that is still waiting, skipping any that were cancelled
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def __aenter__(self) -> "AdmissionController":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.release()
@@ -146,7 +146,9 @@ class AttachmentGraphService:
 
         try:
             result = await self.retry_service.retry_operation(retry_context)
-            self.logger.info("Attachment fetched: %s", str(result))
+            # The attachment's repr carries its content, only render it when debugging
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Attachment fetched: %s", result)
             return result
         except APIError:
             # Let APIError propagate to parent for handling
@@ -1,11 +1,14 @@
 # Python standard library imports
+from collections import OrderedDict
 from dataclasses import dataclass
 import logging
+import os
 import time
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 # Application imports 
 from app.models.email import Email
+from app.service.emails.redis_cache_backend import RedisCacheBackend
 
 """
 SUMMARY:
@@ -17,6 +20,27 @@ for this service and we already will have the data we need in the get response.
 
 If you want to try batching with the sdk, be prepared to dig your own grave.
 
+When REDIS_URL is set, a shared Redis tier sits behind the in-process cache so
+every worker can reuse a folder that any other worker has already fetched.
+Lookups check the local cache first, then Redis. Redis hits only answer the lookup,
+they are a handful of a folder's emails and never become or extend a local folder entry.
+
+The local cache is bounded by an estimate of its size in bytes rather than by folder count,
+so one huge folder can't push the process out of memory. Past EMAIL_CACHE_MAX_BYTES
+(256MB by default), the least recently used folders are evicted first.
+
+Paginated responses are also cached locally per (folder, page, per_page, subject) for a
+shorter TTL, so paging back and forth through a folder doesn't go back to Graph. The page
+cache is bounded the same way, by EMAIL_PAGE_CACHE_MAX_BYTES (64MB by default) with the
+least recently used pages evicted first, and it keeps an index of each folder's pages so
+clearing a folder doesn't scan every cached page.
+
+Only a folder entry stored from a full download of the folder is marked complete. The
+recursive walk tops such an entry up with newly received messages instead of downloading
+the folder again, but only until the download is EMAIL_CACHE_FULL_REFRESH_AGE seconds old
+(15 minutes by default). Top-ups can't see deletions or messages moved in or out of the
+folder, so past that age the folder is downloaded in full again.
+
 """
 
 @dataclass
@@ -25,36 +49,110 @@ class CacheEntry:
     emails: Dict[str, Email]  # Map of source_id to Email object
     timestamp: float
     folder_id: str
+    size_bytes: int = 0  # Estimated memory footprint of the emails
+    complete: bool = False  # True when the emails are a full download of the folder
+    fetched_at: float = 0.0  # When the full download was made, kept through top-ups
+
+@dataclass
+class PageCacheEntry:
+    """Represents a cached page of a paginated folder response"""
+    response: Dict[str, Any]
+    timestamp: float
+    size_bytes: int = 0  # Estimated memory footprint of the page's emails
+
+PageKey = Tuple[str, int, int, Optional[str]]  # (folder_id, page, per_page, subject)
 
 class EmailCacheService:
     """Service for caching email contents from folders"""
     
-    def __init__(self, cache_ttl: int = 300):  # 5 minute default TTL
-        self.cache: Dict[str, CacheEntry] = {}
+    def __init__(self, cache_ttl: int = 300, l2_backend: Optional[RedisCacheBackend] = None,
+                 page_cache_ttl: int = 60, max_bytes: Optional[int] = None,
+                 page_max_bytes: Optional[int] = None,
+                 full_refresh_age: Optional[int] = None):  # 5 minute default TTL, 1 minute for pages
+        self.cache: OrderedDict[str, CacheEntry] = OrderedDict()  # least recently used first
         self.cache_ttl = cache_ttl
+        self.max_bytes = max_bytes or int(os.getenv("EMAIL_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        self.total_bytes = 0
+        self.page_cache: OrderedDict[PageKey, PageCacheEntry] = OrderedDict()  # least recently used first
+        self.folder_pages: Dict[str, Set[PageKey]] = {}  # folder_id to its keys in page_cache
+        self.page_cache_ttl = page_cache_ttl
+        self.page_max_bytes = page_max_bytes or int(os.getenv("EMAIL_PAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.page_total_bytes = 0
+        self.full_refresh_age = full_refresh_age or int(os.getenv("EMAIL_CACHE_FULL_REFRESH_AGE", "900"))
+        self.l2_backend = l2_backend  # built and closed by the app, shared by every cache
         self.logger = logging.getLogger(__name__)
 
-    def store_folder_emails(self, folder_id: str, emails: List[Email]) -> None:
+    async def store_folder_emails(self, folder_id: str, emails: Iterable[Email], complete: bool = False) -> None:
         """
-        Store emails from a folder in the cache
+        Store emails from a folder in the cache, and in the shared L2 cache when configured
         
         Args:
             folder_id: The ID of the folder
-            emails: List of Email objects to cache
+            emails: Email objects to cache, any iterable is consumed once
+            complete: True when the emails are every message in the folder
         """
         # Create a map of source_id to Email object for quick lookups
         email_map = {email.source_id: email for email in emails}
+        now = time.time()
         
-        self.cache[folder_id] = CacheEntry(
+        self._put_entry(CacheEntry(
             emails=email_map,
+            timestamp=now,
+            folder_id=folder_id,
+            complete=complete,
+            fetched_at=now if complete else 0.0
+        ))
+        self.logger.info("Cached %d emails for folder %s", len(email_map), folder_id)
+        if self.l2_backend:
+            await self.l2_backend.set_many(folder_id, email_map.values(), self.cache_ttl)
+
+    async def add_folder_emails(self, folder_id: str, emails: List[Email]) -> None:
+        """
+        Add newly received emails to a folder's cached emails. The entry keeps its complete
+        flag and the time of its full download, so top-ups never postpone the next full refresh.
+        
+        Args:
+            folder_id: The ID of the folder
+            emails: Email objects to add
+        """
+        previous = self.cache.get(folder_id)
+        if previous is None:
+            await self.store_folder_emails(folder_id, emails)
+            return
+
+        self._put_entry(CacheEntry(
+            emails={**previous.emails, **{email.source_id: email for email in emails}},
             timestamp=time.time(),
-            folder_id=folder_id
-        )
-        self.logger.info("Cached %d emails for folder %s", len(emails), folder_id)
+            folder_id=folder_id,
+            complete=previous.complete,
+            fetched_at=previous.fetched_at
+        ))
+        self.logger.info("Added %d emails to the cache for folder %s", len(emails), folder_id)
+        if self.l2_backend:
+            await self.l2_backend.set_many(folder_id, emails, self.cache_ttl)
 
-    def get_emails_by_ids(self, folder_id: str, source_ids: List[str]) -> List[Email]:
+    def get_complete_folder_emails(self, folder_id: str) -> Optional[Dict[str, Email]]:
         """
-        Retrieve specific emails from the cache by their IDs
+        Get a folder's cached emails if they can be topped up instead of downloaded again:
+        the entry is a full download of the folder made less than full_refresh_age seconds ago.
+        
+        Args:
+            folder_id: The ID of the folder
+            
+        Returns:
+            Optional[Dict[str, Email]]: Map of source_id to Email, None if the folder needs a full download
+        """
+        if not self._is_folder_cached(folder_id):
+            return None
+        entry = self.cache[folder_id]
+        if not entry.complete or time.time() - entry.fetched_at > self.full_refresh_age:
+            return None
+        return entry.emails
+
+    async def get_emails_by_ids(self, folder_id: str, source_ids: List[str]) -> List[Email]:
+        """
+        Retrieve specific emails from the cache by their IDs.
+        IDs missing from the local cache are looked up in the L2 cache.
         
         Args:
             folder_id: The ID of the folder
@@ -63,31 +161,96 @@ class EmailCacheService:
         Returns:
             List[Email]: The requested emails that were found in cache
         """
-        if not self._is_folder_cached(folder_id):
+        local_emails = self.cache[folder_id].emails if self._is_folder_cached(folder_id) else {}
+        missing_ids = [msg_id for msg_id in source_ids if msg_id not in local_emails]
+
+        if missing_ids and self.l2_backend:
+            l2_emails = await self.l2_backend.get_many(folder_id, missing_ids)
+            if l2_emails:
+                self.logger.info("Retrieved %d emails from L2 cache for folder %s", len(l2_emails), folder_id)
+                local_emails = {**local_emails, **l2_emails}
+
+        if not local_emails:
             self.logger.info("No cache entry found for folder %s", folder_id)
             return []
-            
-        cache_entry = self.cache[folder_id]
+
         found_emails = []
-        
         for msg_id in source_ids:
-            if msg_id in cache_entry.emails:
-                found_emails.append(cache_entry.emails[msg_id])
+            if msg_id in local_emails:
+                found_emails.append(local_emails[msg_id])
             else:
                 self.logger.warning("Message %s not found in cache for folder %s", msg_id, folder_id)
                 
         return found_emails
 
+    def get_folder_page(self, folder_id: str, page: int, per_page: int, subject: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a cached paginated response for a folder
+        
+        Args:
+            folder_id: The ID of the folder
+            page: The page number
+            per_page: The number of emails per page
+            subject: The subject filter of the request, if any
+            
+        Returns:
+            Optional[Dict[str, Any]]: The cached response, None if missing or expired
+        """
+        key = (folder_id, page, per_page, subject)
+        if (entry := self.page_cache.get(key)) is None:
+            return None
+        if time.time() - entry.timestamp > self.page_cache_ttl:
+            self._drop_page(key)
+            return None
+        self.page_cache.move_to_end(key)  # mark as recently used
+        return entry.response
+
+    def store_folder_page(self, folder_id: str, page: int, per_page: int,
+                          subject: Optional[str], response: Dict[str, Any]) -> None:
+        """
+        Store a paginated response for a folder
+        
+        Args:
+            folder_id: The ID of the folder
+            page: The page number
+            per_page: The number of emails per page
+            subject: The subject filter of the request, if any
+            response: The response to cache
+        """
+        key = (folder_id, page, per_page, subject)
+        if key in self.page_cache:
+            self._drop_page(key)
+        entry = PageCacheEntry(
+            response=response,
+            timestamp=time.time(),
+            size_bytes=self._estimate_size(response.get("data") or ())
+        )
+        self.page_cache[key] = entry
+        self.folder_pages.setdefault(folder_id, set()).add(key)
+        self.page_total_bytes += entry.size_bytes
+
+        # Always keep the page just stored, even if it alone is over budget
+        while self.page_total_bytes > self.page_max_bytes and len(self.page_cache) > 1:
+            evicted_key = next(iter(self.page_cache))
+            self._drop_page(evicted_key)
+            self.logger.info("Evicted page %s of folder %s from page cache", evicted_key[1], evicted_key[0])
+
     def clear_folder_cache(self, folder_id: str) -> None:
         """Clear the cache for a specific folder"""
         if folder_id in self.cache:
-            del self.cache[folder_id]
+            self.total_bytes -= self.cache.pop(folder_id).size_bytes
             self.logger.info("Cleared cache for folder %s", folder_id)
+        for key in self.folder_pages.pop(folder_id, ()):
+            self.page_total_bytes -= self.page_cache.pop(key).size_bytes
 
     #Unused currently but should probably stay.
     def clear_all_cache(self) -> None:
         """Clear the entire cache"""
         self.cache.clear()
+        self.total_bytes = 0
+        self.page_cache.clear()
+        self.folder_pages.clear()
+        self.page_total_bytes = 0
         self.logger.info("Cleared all email cache")
 
     def _is_folder_cached(self, folder_id: str) -> bool:
@@ -109,9 +272,45 @@ class EmailCacheService:
         if is_expired:
             self.clear_folder_cache(folder_id)
             return False
-            
+
+        self.cache.move_to_end(folder_id)  # mark as recently used
         return True
 
+    def _drop_page(self, key: PageKey) -> None:
+        """Remove one page from the page cache and from its folder's index"""
+        self.page_total_bytes -= self.page_cache.pop(key).size_bytes
+        folder_keys = self.folder_pages.get(key[0])
+        if folder_keys is not None:
+            folder_keys.discard(key)
+            if not folder_keys:
+                del self.folder_pages[key[0]]
+
+    def _put_entry(self, entry: CacheEntry) -> None:
+        """
+        Insert or replace a folder's entry as the most recently used one, then evict the
+        least recently used folders until the cache fits in max_bytes again.
+        """
+        if (previous := self.cache.pop(entry.folder_id, None)) is not None:
+            self.total_bytes -= previous.size_bytes
+        entry.size_bytes = self._estimate_size(entry.emails.values())
+        self.cache[entry.folder_id] = entry
+        self.total_bytes += entry.size_bytes
+
+        # Always keep the entry just stored, even if it alone is over budget
+        while self.total_bytes > self.max_bytes and len(self.cache) > 1:
+            evicted_id, evicted = self.cache.popitem(last=False)
+            self.total_bytes -= evicted.size_bytes
+            self.logger.info("Evicted folder %s from cache to free %d bytes", evicted_id, evicted.size_bytes)
+
+    @staticmethod
+    def _estimate_size(emails) -> int:
+        """Rough memory footprint of some emails, dominated by their bodies and recipients"""
+        return sum(
+            len(email.body or "") + len(email.subject or "") + len(email.sender or "")
+            + sum(map(len, email.receivers)) + sum(map(len, email.cc)) + sum(map(len, email.bcc))
+            for email in emails
+        )
+
     def get_cache_info(self, folder_id: str) -> Optional[Dict]:
         """
         Get information about a folder's cache status
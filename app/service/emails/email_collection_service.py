@@ -1,8 +1,10 @@
 # Python standard library imports
 import asyncio
+from contextlib import aclosing
+from datetime import datetime, timezone
 import logging
 import time
-from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
 
 # Third party imports
 from kiota_abstractions.api_error import APIError
@@ -17,9 +19,12 @@ from app.models.email import Email
 from app.models.metrics.batch_metrics import BatchMetrics
 from app.models.retries.retry_context import RetryContext
 from app.models.retries.retry_enums import RetryProfile
+from app.service.admission_controller import AdmissionController
 from app.service.graph.graph_authentication_service import Graph
 from app.service.graph.graph_id_translation_service import GraphIDTranslator
 from app.service.retry_service import RetryService
+from app.utils.async_utils import AsyncUtils
+from app.utils.constants.email_constants import EmailConstants
 from app.utils.graph_utils import GraphUtils
 
 
@@ -40,33 +45,44 @@ class EmailCollectionService:
         
         # Configurable parameters
         self.config = {
-            'page_size': 50,
+            'page_size': 999,  # Graph caps message pages at 1000
             'translation_batch_size': 1000,
-            'email_chunk_size': 100,
             'max_concurrent_requests': 5,
+            'prefetch_window': 3,
+            'event_buffer': 8,  # progress updates and email batches held for a slow consumer
+            'progress_interval': 0.1,  # seconds, progress updates closer together than this are dropped
+            'offload_threshold': 500,  # batches at least this large are converted off the event loop
             'max_retries': 3,
             'retry_delay': 2
         }
+        # Shared by every Graph call this service makes, shrinks on 429s and grows back when quiet
+        self.admission = AdmissionController(self.config['max_concurrent_requests'])
 
 
     
 
-    async def get_all_emails_by_folder_id(self, folder_id: str) -> AsyncGenerator[Union[List[Email], Dict[str, Any]], None]:
+    async def get_all_emails_by_folder_id(self, folder_id: str,
+                                          received_after: Optional[datetime] = None) -> AsyncGenerator[Tuple[str, Any], None]:
         """
         Retrieve all emails from a folder with optimized batch processing and progress updates.
         
-        This method orchestrates the complete email retrieval workflow:
-        1. Fetches messages in batches from Microsoft Graph API
-        2. Translates Graph message IDs to database IDs
-        3. Processes raw messages into domain Email objects
-        4. Provides real-time progress updates throughout the process
+        This method orchestrates the complete email retrieval workflow as a pipeline of
+        concurrent stages, so ID translation and processing start while pages are still being fetched:
+        1. Fetches messages page by page from Microsoft Graph API
+        2. Translates Graph message IDs to database IDs as soon as a batch of IDs is available
+        3. Processes raw messages into domain Email objects as soon as their IDs are translated
+        4. Provides real-time progress updates from every stage throughout the process
         
         Yields:
-            - Progress updates (as dict) during processing for frontend display
-            - Final list of Email objects when complete
+            Tagged (kind, payload) tuples, so callers dispatch on the tag instead of the payload type:
+            - ("progress", dict): progress updates during processing for frontend display
+            - ("emails", List[Email]): one per processed batch, as soon as each batch is ready
             
         Args:
             folder_id: Microsoft Graph ID of the folder to retrieve emails from
+            received_after: Only fetch messages received at or after this time. Callers that
+                already hold a folder's emails pass their newest received date, so a refresh
+                downloads just the messages that arrived since
             
         Raises:
             EmailException: Wraps any errors that occur during the process
@@ -76,27 +92,10 @@ class EmailCollectionService:
         
         try:
             self.logger.info("Starting email download service for folder: %s", folder_id)
-            messages = []
-            # Fetch messages (with progress updates and phase info)
-            async for result in self._fetch_messages(folder_id, metrics):
-                if isinstance(result, list):
-                    messages = result
-                else:
+            # Closed as soon as we are, so a consumer that stops early cancels the pipeline right away
+            async with aclosing(self._run_pipeline(folder_id, metrics, received_after)) as results:
+                async for result in results:
                     yield result
-            if not messages:
-                return
-            
-            # Translate message IDs (with progress updates and phase info)
-            id_mapping = {}
-            async for result in self._translate_ids(messages, metrics):
-                if isinstance(result, dict):
-                    id_mapping = result
-                else:
-                    yield result
-
-            # Process messages into Email objects (with progress updates and phase info)
-            async for result in self._process_emails(messages, id_mapping, metrics):
-                yield result
             self.logger.info("Email download service completed for folder: %s", folder_id)
 
         except APIError as e:
@@ -111,117 +110,234 @@ class EmailCollectionService:
 
 
 
-    async def _fetch_messages(self, folder_id: str, metrics: BatchMetrics) -> AsyncGenerator[Union[List[Any], Dict[str, Any]], None]:
+    async def _run_pipeline(self, folder_id: str, metrics: BatchMetrics,
+                            received_after: Optional[datetime] = None) -> AsyncGenerator[Tuple[str, Any], None]:
+        """
+        Run the fetch, translate and process stages concurrently.
+
+        The stages hand work to each other through bounded queues, which keeps memory flat
+        and lets a slow stage apply backpressure to the one before it. Every stage pushes its
+        progress updates onto a shared events queue, which is drained and yielded here.
+        The first stage to fail cancels the others and its exception is re-raised as is.
+        Processed emails travel through the events queue too, one list per batch. The events
+        queue is bounded as well, so a slow consumer holds the process stage back, and with
+        it the stages before it, instead of letting email batches pile up. Progress updates
+        that find it full are dropped, a later one supersedes them.
+        """
+        pages = asyncio.Queue(maxsize=max(1, self.config['prefetch_window']))
+        translated = asyncio.Queue(maxsize=max(1, self.config['max_concurrent_requests']))
+        events = asyncio.Queue(maxsize=max(1, self.config['event_buffer']))
+
+        async def run_stages() -> None:
+            async with asyncio.TaskGroup() as stages:
+                stages.create_task(self._fetch_messages(folder_id, pages, events, metrics, received_after))
+                stages.create_task(self._translate_ids(pages, translated, events, metrics))
+                stages.create_task(self._process_emails(translated, events, metrics))
+
+        def wake_consumer(_) -> None:
+            # The consumer only blocks on an empty queue, so there is always room when it needs waking.
+            # When the queue is full, it drains it and sees the pipeline is done on its own
+            if not events.full():
+                events.put_nowait(None)
+
+        pipeline = asyncio.create_task(run_stages())
+        pipeline.add_done_callback(wake_consumer)
+        try:
+            while not (pipeline.done() and events.empty()):
+                if (event := await events.get()) is not None:
+                    yield event
+
+            # Unwrap the task groups so callers can still handle the failure by type
+            error = AsyncUtils.unwrap_exception_group(pipeline.exception())
+            if error is not None:
+                raise error
+
+            metrics.end_processing()
+        finally:
+            # Consumer stopped early or a stage failed, don't leave the pipeline running
+            pipeline.cancel()
+            # Log a single final metrics summary to the console.
+            metrics.log_final_metrics(self.logger)
+
+
+
+
+
+
+    async def _fetch_messages(self, folder_id: str, pages: asyncio.Queue, events: asyncio.Queue,
+                              metrics: BatchMetrics, received_after: Optional[datetime] = None) -> None:
         """
-        Fetch all messages from a folder.
+        Fetch stage: fetch all messages from a folder.
         
-        Yields progress info from the metrics along with phase information.
+        Each page is pushed onto the pages queue as soon as it arrives, followed by
+        a progress update. A final None marks the end of the folder. With received_after,
+        only messages received since then are fetched.
         """
         metrics.current_phase = "fetching"
+        # Request builders are stateless, build the folder's one once and reuse it for every page
+        messages_builder = self.graph.client.me.mail_folders.by_mail_folder_id(folder_id).messages
         self.logger.info("Fetching first page of messages for folder: %s", folder_id)
-        first_page_messages, total_count = await self._fetch_single_page(folder_id, 0, metrics, get_count=True)
+        first_page_messages, total_count, next_link = await self._fetch_single_page(
+            folder_id, messages_builder, 0, metrics, get_count=True, received_after=received_after
+        )
         metrics.total_count = total_count
         metrics.pages_fetched += 1
-        yield metrics.get_progress_info()  # includes phase = "fetching"
 
-        if not first_page_messages:
-            yield []
-            return
+        if first_page_messages:
+            metrics.messages_fetched += len(first_page_messages)
+            await pages.put(first_page_messages)
+            await self._push_progress(events, metrics, force=True)  # includes phase = "fetching"
 
-        total_pages = (total_count + self.config['page_size'] - 1) // self.config['page_size']
-        remaining_messages = await self._fetch_all_pages(folder_id, total_pages, metrics)
-        yield first_page_messages + remaining_messages
+            async for page in self._fetch_all_pages(folder_id, messages_builder, next_link, metrics):
+                metrics.current_phase = "fetching"
+                metrics.messages_fetched += len(page)
+                await pages.put(page)
+                await self._push_progress(events, metrics)  # updated progress within fetching phase
+        else:
+            await self._push_progress(events, metrics, force=True)
+        await pages.put(None)
 
 
 
 
 
 
-    async def _translate_ids(self, messages: List[Any], metrics: BatchMetrics) -> AsyncGenerator[Union[Dict[str, str], Dict[str, Any]], None]:
+    async def _translate_ids(self, pages: asyncio.Queue, translated: asyncio.Queue, events: asyncio.Queue, metrics: BatchMetrics) -> None:
         """
-        Translate message IDs to immutable IDs.
+        Translate stage: translate message IDs to immutable IDs in batches.
         
-        Yields progress info (including current phase) before and after translation.
+        Messages are accumulated from the pages queue until a full translation batch is
+        available. Each batch is then translated in the background, gated by the shared
+        admission controller, while the next batch is accumulated. At most max_concurrent_requests
+        batches are in flight, past that no more pages are read until one finishes, so the
+        pages queue fills up and holds the fetch stage back.
+        A final None marks the end of the translated batches.
         """
-        metrics.current_phase = "translating"
-        yield metrics.get_progress_info()  # phase "translating"
+        batch_size = self.config['translation_batch_size']
+        in_flight = asyncio.Semaphore(max(1, self.config['max_concurrent_requests']))
+        pending = []
+        batch_num = 0
+
+        async def translate_batch(messages: List[Any], num: int) -> None:
+            try:
+                await self._translate_batch(messages, num, translated, events, metrics)
+            finally:
+                in_flight.release()
 
-        message_ids = [msg.id for msg in messages if msg.id]
         metrics.start_translation()
-        id_mapping = await self._translate_message_ids(message_ids, metrics)
+        async with asyncio.TaskGroup() as batches:
+            async def start_batch(messages: List[Any]) -> None:
+                nonlocal batch_num
+                await in_flight.acquire()
+                batch_num += 1
+                batches.create_task(translate_batch(messages, batch_num))
+
+            while (page := await pages.get()) is not None:
+                pending.extend(msg for msg in page if msg.id)
+                while len(pending) >= batch_size:
+                    await start_batch(pending[:batch_size])
+                    pending = pending[batch_size:]
+            if pending:
+                await start_batch(pending)
         metrics.end_translation()
-        yield id_mapping
+        await translated.put(None)
+
 
 
 
 
 
+    async def _translate_batch(self, messages: List[Any],
+                               batch_num: int,
+                               translated: asyncio.Queue,
+                               events: asyncio.Queue,
+                               metrics: BatchMetrics) -> None:
+        """
+        Translate the IDs of a single batch of messages with retry logic and hand the
+        batch, with its ID mapping, to the process stage.
 
-    async def _process_emails(self, messages: List[Any], id_mapping: Dict[str, str], metrics: BatchMetrics) -> AsyncGenerator[Union[List[Email], Dict[str, Any]], None]:
+        A batch that fails translation is logged and passed on with an empty mapping,
+        so its messages are skipped instead of failing the whole folder.
         """
-        Process Graph API messages into Email objects in manageable chunks.
+        message_ids = [msg.id for msg in messages]
+        self.logger.debug("_translate_batch: Processing batch %d (%d IDs)", batch_num, len(message_ids))
+
+        # Define the operation to be retried
+        async def translate():
+            # Coalesced, so the batches of every folder being walked share translation round trips
+            return await self._admitted(lambda: self.graph_translator.translate_ids(message_ids))
+
+        # Build the retry context
+        retry_context = self._build_retry_context(translate, metrics, batch_num)
+
+        # Attempt to translate the batch
+        id_mapping = {}
+        try:
+            results = await self.retry_service.retry_operation(retry_context)
+            self.logger.debug("Successfully translated batch %d: %d IDs processed", batch_num, len(results))
+
+            id_mapping = dict(results)  # (source_id, target_id) pairs
+            metrics.ids_translated += len(results)
+        except IdTranslationException as e:
+            self.logger.error("Failed to translate batch %d (%d IDs): %s", batch_num, len(message_ids), str(e))
+
+        metrics.current_phase = "translating"
+        await self._push_progress(events, metrics)
+        await translated.put((messages, id_mapping))
+
+
+
+
+
+
+    async def _process_emails(self, translated: asyncio.Queue, events: asyncio.Queue, metrics: BatchMetrics) -> None:
+        """
+        Process stage: convert Graph API messages into Email objects in manageable chunks.
         
         This method:
-        1. Converts raw Graph API message objects into domain Email objects
-        2. Processes messages in configurable chunks to avoid memory issues
-        3. Uses ID mapping to associate Graph message IDs with database IDs
-        4. Tracks metrics throughout the processing
-        5. Yields progress updates to inform the frontend during processing
-        6. Finally yields the complete list of processed Email objects
+        1. Takes each translated batch off the queue as soon as it is ready
+        2. Converts raw Graph API message objects into domain Email objects
+        3. Converts each batch in a single pass, one progress update per translation batch
+        4. Uses ID mapping to associate Graph message IDs with database IDs
+        5. Pushes each batch of Email objects downstream as soon as it is converted
+        6. Tracks metrics and pushes progress updates to inform the frontend during processing
         
         Args:
-            messages: List of raw message objects from Microsoft Graph API
-            id_mapping: Dictionary mapping Graph message IDs to database IDs
+            translated: Queue of (messages, id_mapping) batches, terminated by None
+            events: Queue that Email batches and progress updates are pushed onto
             metrics: BatchMetrics object for tracking performance and progress
             
-        Yields:
-            - Progress information dictionaries during processing
-            - Final list of Email objects when processing is complete
-            
         Raises:
-            Exception: Any exceptions during processing are logged and re-raised
+            EmailException: Any exceptions during processing are logged and wrapped
             
         Note:
             Messages without corresponding entries in id_mapping will be skipped.
             This can happen if ID translation failed for some messages.
         """
-        total_messages = len(messages)
-        chunk_size = self.config['email_chunk_size']
-        total_chunks = (total_messages + chunk_size - 1) // chunk_size
-
         try:
-            metrics.current_phase = "processing"
-            self.logger.info("Starting email processing phase for %d messages", total_messages)
-            yield metrics.get_progress_info()  # phase "processing"
-            
-            emails = []
-            metrics.start_processing()
-            for i in range(0, total_messages, chunk_size):
-                chunk_num = i // chunk_size + 1
-                chunk_end = min(i + chunk_size, total_messages)
-                self.logger.info("_process_emails: intializing processing of chunk %d/%d (messages %d-%d)", 
-                            chunk_num, total_chunks, i, chunk_end-1)
-                chunk = messages[i:i + chunk_size]
-                
-                chunk_emails = [
-                    Email.from_graph_message(msg, id_mapping[msg.id])
-                    for msg in chunk if msg.id in id_mapping
-                ]
-                emails.extend(chunk_emails)
-                metrics.emails_processed += len(chunk_emails)
-
-                self.logger.info("_process_emails: Processed %d/%d emails in chunk %d", 
-                           len(chunk_emails), len(chunk), chunk_num)
-
-                yield metrics.get_progress_info()  # updated progress within processing phase
-            metrics.end_processing()
-            yield emails
+            while (batch := await translated.get()) is not None:
+                messages, id_mapping = batch
+                metrics.current_phase = "processing"
+
+                if len(messages) >= self.config['offload_threshold']:
+                    # Parsing message bodies is CPU bound, keep the event loop free for the other stages
+                    batch_emails = await asyncio.to_thread(self._build_emails, messages, id_mapping)
+                else:
+                    batch_emails = self._build_emails(messages, id_mapping)
+                metrics.emails_processed += len(batch_emails)
+                if batch_emails:
+                    # Hand the batch over right away instead of holding the whole folder in memory,
+                    # waiting here when the consumer is behind
+                    await events.put(("emails", batch_emails))
+
+                self.logger.debug("_process_emails: Processed %d/%d emails in batch",
+                                  len(batch_emails), len(messages))
+                await self._push_progress(events, metrics)  # updated progress within processing phase
+            # Always report where processing ended, even if the last update was coalesced
+            await self._push_progress(events, metrics, force=True)
         except Exception as e:
             self.logger.error("_process_emails: Error during email processing: %s", str(e))
             raise EmailException(detail=f"Error during email processing: {str(e)}", status_code=500) from e
-        finally:
-            # Log a single final metrics summary to the console.
-            metrics.log_final_metrics(self.logger)
 
 
 
@@ -230,23 +346,31 @@ class EmailCollectionService:
 
 
     async def _fetch_single_page(self, folder_id: str,
+                                 messages_builder: MessagesRequestBuilder,
                                  page_num: int, 
                                  metrics: BatchMetrics,
-                                 get_count: bool = False) -> Tuple[List[Any], Optional[int]]:
+                                 get_count: bool = False,
+                                 next_link: Optional[str] = None,
+                                 received_after: Optional[datetime] = None) -> Tuple[List[Any], Optional[int], Optional[str]]:
         """
         Fetch a single page of messages from the specified folder in Microsoft Graph API.
         
-        Constructs a Graph API request with attachment data, selected fields, pagination,
-        and optional count. Implements retry logic and records performance metrics.
+        The first page is built from scratch with attachment data, selected fields, page size,
+        and optional count. Every later page is requested through the @odata.nextLink cursor
+        returned by the previous page, which already carries those query options.
+        Implements retry logic and records performance metrics.
         
         Args:
             folder_id: Mail folder Graph ID to query
-            page_num: Zero-based page number to fetch
+            messages_builder: Request builder for the folder's messages
+            page_num: Zero-based page number, used for logging
             metrics: Object for tracking performance metrics
             get_count: Whether to request total count (should only be true for first page)
+            next_link: The @odata.nextLink of the previous page, None for the first page
+            received_after: Filter the first page, and with it the cursor, to messages received since then
         
         Returns:
-            Tuple of (message list, total count or None)
+            Tuple of (message list, total count or None, next link or None)
         
         Raises:
             EmailException: If all retries fail
@@ -255,35 +379,33 @@ class EmailCollectionService:
         async def fetch():
             nonlocal start_time
             start_time = time.time()
-            self.logger.info("Starting fetch of page %d of messages for folder: %s", page_num, folder_id)
-            page_params = MessagesRequestBuilder.MessagesRequestBuilderGetQueryParameters(
-                expand=["attachments"],
-                select=[
-                    'bccRecipients', 'body', 'ccRecipients', 'conversationId',
-                    'from', 'hasAttachments', 'id', 'isRead', 'receivedDateTime',
-                    'subject', 'toRecipients'
-                ],
-                top=self.config['page_size'],
-                skip=page_num * self.config['page_size'],
-                count=get_count
-            )
-            page_config = RequestConfiguration(query_parameters=page_params)
-            result = await self.graph.client.me.mail_folders.by_mail_folder_id(
-                folder_id
-            ).messages.get(request_configuration=page_config)
+            self.logger.debug("Starting fetch of page %d of messages for folder: %s", page_num, folder_id)
+            if next_link:
+                result = await self._admitted(messages_builder.with_url(next_link).get)
+            else:
+                page_params = MessagesRequestBuilder.MessagesRequestBuilderGetQueryParameters(
+                    # kiota serializes list query parameters, so hand it lists built from the shared constants
+                    expand=list(EmailConstants.MESSAGE_EXPAND_FIELDS),
+                    select=list(EmailConstants.MESSAGE_SELECT_FIELDS),
+                    top=self.config['page_size'],
+                    count=get_count,
+                    filter=self._received_filter(received_after)
+                )
+                page_config = RequestConfiguration(query_parameters=page_params)
+                result = await self._admitted(lambda: messages_builder.get(request_configuration=page_config))
             messages = GraphUtils.get_collection_value(result, MessageCollectionResponse)
-            total_count = getattr(result, 'odata_count', None) if get_count else None
+            total_count = result.odata_count if get_count else None
             duration = time.time() - start_time
             if metrics:
                 metrics.record_page_time(duration, len(messages))
-            self.logger.info("Fetched page %d of messages for folder: %s in %s seconds", page_num, folder_id, duration)
-            return messages, total_count
+            self.logger.debug("Fetched page %d of messages for folder: %s in %s seconds", page_num, folder_id, duration)
+            return messages, total_count, result.odata_next_link
 
         retry_context = RetryContext(
             operation=fetch,
             error_msg=f"Error fetching page {page_num}",
-            metrics_recorder=lambda: metrics.record_page_retry() if metrics else None,
-            error_recorder=lambda: metrics.record_page_error() if metrics else None
+            metrics_recorder=metrics.record_page_retry,
+            error_recorder=metrics.record_page_error
         )
         return await self.retry_service.retry_operation(retry_context)
 
@@ -293,84 +415,54 @@ class EmailCollectionService:
 
 
 
-    async def _fetch_all_pages(self, folder_id: str, total_pages: int, metrics: BatchMetrics) -> List[Any]:
+    async def _fetch_all_pages(self, folder_id: str,
+                               messages_builder: MessagesRequestBuilder,
+                               next_link: Optional[str],
+                               metrics: BatchMetrics) -> AsyncGenerator[List[Any], None]:
         """
-        Fetch all remaining pages concurrently with controlled concurrency.
-        
-        Updates metrics and returns a flattened list of messages.
+        Fetch all remaining pages by following @odata.nextLink until Graph stops returning one.
+
+        Pages are yielded in order. A producer task keeps following the cursor while the caller
+        is handling the pages it has already received, buffering up to `prefetch_window` pages
+        in an asyncio.Queue, so the caller is rarely left waiting on the network.
         """
         self.logger.info("Starting fetch of all remaining pages for folder: %s", folder_id)
 
-        # If there's only one page (or somehow less), log this but don't treat as error
-        if total_pages <= 1:
-            self.logger.info("No additional pages to fetch for folder: %s (total_pages=%d)", 
-                            folder_id, total_pages)
-            return []
-
-        async def fetch_with_semaphore(sem, page_num):
-            async with sem:
-                messages, _ = await self._fetch_single_page(folder_id, page_num, metrics, get_count=False)
-                return messages
-
-        sem = asyncio.Semaphore(self.config['max_concurrent_requests'])
-        # Pages 1 to total_pages-1 (page 0 already fetched)
-        tasks = [fetch_with_semaphore(sem, i) for i in range(1, total_pages)]
-        if not tasks:
-            self.logger.warning("No remaining pages to fetch for folder: %s", folder_id)
-            return []
-
-        pages = await asyncio.gather(*tasks)
-        metrics.pages_fetched += len([page for page in pages if page])
-        # Flatten the list of pages into a single list of messages
-        return [msg for page in pages if page for msg in page]
-
-
+        # If the first page was the only page, log this but don't treat as error
+        if not next_link:
+            self.logger.info("No additional pages to fetch for folder: %s", folder_id)
+            return
 
+        pages: asyncio.Queue = asyncio.Queue(maxsize=max(1, self.config['prefetch_window']))
 
+        async def produce(link):
+            try:
+                page_num = 1  # page 0 already fetched
+                while link:
+                    messages, _, link = await self._fetch_single_page(
+                        folder_id, messages_builder, page_num, metrics, next_link=link
+                    )
+                    await pages.put(messages)
+                    page_num += 1
+                await pages.put(None)  # end of pages
+            except Exception as e: # pylint: disable=broad-exception-caught # re-raised by the consumer below
+                await pages.put(e)
+
+        producer = asyncio.create_task(produce(next_link))
+        try:
+            while (page := await pages.get()) is not None:
+                if isinstance(page, Exception):
+                    raise page
+                if page:
+                    metrics.pages_fetched += 1
+                    yield page
+        finally:
+            # Consumer stopped early or a page failed, don't leave the producer running
+            producer.cancel()
 
 
-    async def _translate_message_ids(self, message_ids: List[str], metrics: BatchMetrics) -> Dict[str, str]:
-        """
-        Translate message IDs in batches with retry logic.
-        
-        Returns a mapping of source IDs to translated IDs.
-        """
-        self.logger.info("Starting translation of %d message IDs", len(message_ids))
 
-        id_mapping = {}
-        batch_size = self.config['translation_batch_size']
-        total_batches = (len(message_ids) + batch_size - 1) // batch_size
-
-        # Process the message IDs in batches
-        for i in range(0, len(message_ids), batch_size):
-            current_batch = message_ids[i:i + batch_size]
-            batch_num = i // batch_size + 1
-            batch_end = min(i + batch_size, len(message_ids))
-            self.logger.info("_translate_message_ids: Processing batch %d/%d (IDs %d-%d)", 
-                        batch_num, total_batches, i, batch_end-1)
-            
-            # Define the operation to be retried
-            async def translate(batch=current_batch):
-                return await self.graph_translator.translate_ids(batch)
-            
-            # Build the retry context
-            retry_context = self._build_retry_context(translate, metrics, batch_num, total_batches)
-
-            # Attempt to translate the batch
-            try:
-                results = await self.retry_service.retry_operation(retry_context)
-                self.logger.info("Successfully translated batch %d/%d: %d IDs processed", 
-                           batch_num, total_batches, len(results))
 
-                for item in results:
-                    id_mapping[item["source_id"]] = item["target_id"]
-                metrics.ids_translated += len(results)
-            except IdTranslationException as e:
-                self.logger.error("Failed to translate batch %d/%d (%d IDs): %s", 
-                            batch_num, total_batches, len(current_batch), str(e))
-                continue
-                
-        return id_mapping
 
 
     ##################
@@ -378,6 +470,58 @@ class EmailCollectionService:
     ##################
 
 
+    async def _push_progress(self, events: asyncio.Queue, metrics: BatchMetrics, force: bool = False) -> None:
+        # Coalesce progress updates: consumers render at a few Hz, so only emit one per progress_interval.
+        # Forced updates mark where a stage ended and wait for room, the others are dropped when the
+        # consumer is behind
+        now = time.monotonic()
+        if not (force or now - metrics.last_progress_time >= self.config['progress_interval']):
+            return
+        metrics.last_progress_time = now
+        update = ("progress", metrics.get_progress_info())
+        if force:
+            await events.put(update)
+            return
+        try:
+            events.put_nowait(update)
+        except asyncio.QueueFull:
+            pass
+
+
+    @staticmethod
+    def _received_filter(received_after: Optional[datetime]) -> Optional[str]:
+        # OData wants UTC literals, naive datetimes from Graph are already UTC. ge rather than gt
+        # so messages sharing the boundary second aren't lost, callers drop the ones they hold
+        if received_after is None:
+            return None
+        if received_after.tzinfo is not None:
+            received_after = received_after.astimezone(timezone.utc)
+        return f"receivedDateTime ge {received_after.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+
+
+    @staticmethod
+    def _build_emails(messages: List[Any], id_mapping: Dict[str, str]) -> List[Email]:
+        # Convert the messages that have a translated ID, skipping the rest
+        from_graph_message = Email.from_graph_message  # bound once, called per message
+        return [
+            from_graph_message(msg, immutable_id)
+            for msg in messages if (immutable_id := id_mapping.get(msg.id)) is not None
+        ]
+
+
+    async def _admitted(self, call):
+        # Run a Graph call under the admission controller, adapting its limit to throttling.
+        async with self.admission:
+            try:
+                result = await call()
+            except APIError as e:
+                if e.response_status_code == 429:
+                    self.admission.record_throttle()
+                raise
+        self.admission.record_success()
+        return result
+
+
     def __start_metrics(self) -> BatchMetrics:
         # Initialize metrics and start overall processing timer.
         metrics = BatchMetrics(start_time=time.time())
@@ -385,10 +529,11 @@ class EmailCollectionService:
         return metrics    
 
 
-    def _build_retry_context(self, operation, metrics, batch_num, total_batches):
+    def _build_retry_context(self, operation, metrics, batch_num):
+        # Bound methods are passed as is, no per-batch lambdas wrapping them
         return RetryContext(
                 operation=operation,
-                error_msg=f"Error translating batch {batch_num}/{total_batches}",
-                metrics_recorder=lambda: metrics.record_translation_retry() if metrics else None,
-                error_recorder=lambda: metrics.record_translation_error() if metrics else None
+                error_msg=f"Error translating batch {batch_num}",
+                metrics_recorder=metrics.record_translation_retry,
+                error_recorder=metrics.record_translation_error
             )
\ No newline at end of file
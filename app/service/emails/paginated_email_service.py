@@ -1,6 +1,6 @@
 # Python standard library imports
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 # Third party imports
 from kiota_abstractions.api_error import APIError
@@ -15,8 +15,10 @@ from app.models.metrics.paginated_metrics import PaginatedMetrics
 from app.models.retries.retry_context import RetryContext
 from app.models.retries.retry_enums import RetryProfile
 from app.service.emails.email_cache_service import EmailCacheService
+from app.service.emails.redis_cache_backend import RedisCacheBackend
 from app.service.graph.graph_authentication_service import Graph
 from app.service.retry_service import RetryService
+from app.utils.constants.email_constants import EmailConstants
 from app.utils.graph_utils import GraphUtils
 
 """
@@ -27,12 +29,12 @@ on the message processing and not the ID translation as the ID translation typic
 then the message processing.
 """
 class PaginatedEmailService:
-    def __init__(self, graph: Graph):
+    def __init__(self, graph: Graph, l2_backend: Optional[RedisCacheBackend] = None):
         self.graph = graph
         self.logger = logging.getLogger(__name__)
         # Use STANDARD profile for pagination as it's less aggressive than BATCH
         self.retry_service = RetryService(retry_profile=RetryProfile.STANDARD)
-        self.email_cache = EmailCacheService()
+        self.email_cache = EmailCacheService(l2_backend=l2_backend)
         
 
     def __start_metrics(self) -> PaginatedMetrics:
@@ -52,11 +54,8 @@ class PaginatedEmailService:
         metrics = self.__start_metrics()  # Assume this returns a BatchMetrics instance.
         
         try:
-            self.logger.info("""
-            Getting paginated emails for folder %s,
-            page %s, per_page %s, subject %s",
-            folder_id, page, per_page, subject)
-            """)
+            self.logger.info("Getting paginated emails for folder %s, page %s, per_page %s, subject %s",
+                             folder_id, page, per_page, subject)
 
             # Initialize vars that might be accessed in finally block
             messages = None
@@ -67,15 +66,22 @@ class PaginatedEmailService:
             per_page = max(1, per_page)
             offset = (page - 1) * per_page
 
+            # Serve repeat requests for the same page from the cache instead of Graph
+            cached_page = self.email_cache.get_folder_page(folder_id, page, per_page, subject)
+            if cached_page:
+                self.logger.info("Serving page %s of folder %s from cache", page, folder_id)
+                messages = cached_page["data"]
+                total = cached_page["total_elements"]
+                total_pages = cached_page["total_pages"]
+                return {**cached_page, "metrics": metrics.get_progress_info()}
+
             page_params = MessagesRequestBuilder.MessagesRequestBuilderGetQueryParameters(
-                select=['bccRecipients', 'body', 'ccRecipients', 'conversationId', 
-                        'from', 'hasAttachments', 'id', 'isRead', 'receivedDateTime', 
-                        'subject', 'toRecipients'],
+                select=list(EmailConstants.MESSAGE_SELECT_FIELDS),
                 top=per_page,
                 skip=offset,
                 count=True,
-                filter=f"contains(subject, '{subject}')" if subject else '',
-                expand=["attachments"]
+                filter=f"contains(subject, '{GraphUtils.escape_odata_string(subject)}')" if subject else '',
+                expand=list(EmailConstants.MESSAGE_EXPAND_FIELDS)
             )
             page_config = RequestConfiguration(query_parameters=page_params)
             
@@ -91,19 +97,20 @@ class PaginatedEmailService:
             result = await self.retry_service.retry_operation(retry_context)
             messages = GraphUtils.get_collection_value(result, MessageCollectionResponse)
             if messages:
-                total = getattr(result, 'odata_count', len(messages))
+                total = result.odata_count if result.odata_count is not None else len(messages)
                 total_pages = (total + per_page - 1) // per_page
                 emails = [Email.from_graph_message_without_id(msg) for msg in messages]
                 email_count = len(emails)
-                self.email_cache.store_folder_emails(folder_id, emails) # here we are calling the cache service to store the emails
-            
-                return {
+                await self.email_cache.store_folder_emails(folder_id, emails) # here we are calling the cache service to store the emails
+                response = {
                     "data": emails,
                     "elements_on_page": email_count,
                     "total_elements": total,
                     "total_pages": total_pages,
-                    "metrics": metrics.get_progress_info()
                 }
+                self.email_cache.store_folder_page(folder_id, page, per_page, subject, response)
+            
+                return {**response, "metrics": metrics.get_progress_info()}
             
             raise ValueError(f"No emails found for folder {folder_id} on page {page}")
                 
@@ -126,13 +133,15 @@ class PaginatedEmailService:
 
         
     async def get_cached_emails_by_ids(
-        self, folder_id: str, source_ids: List[str]) -> List[Email]:
+        self, folder_id: str, source_ids: List[str], page: int = 1, per_page: int = 25) -> List[Email]:
         """
         Try to retrieve emails from cache first, fallback to API if needed
         
         Args:
             folder_id: The ID of the folder
             source_ids: List of source IDs to retrieve
+            page: The page the emails were selected from, refetched on a cache miss
+            per_page: The page size the emails were selected with
             
         Returns:
             List[Email]: The requested emails
@@ -142,14 +151,14 @@ class PaginatedEmailService:
         """
         # Try cache first
         self.logger.info("Attempting to get cached emails for folder %s, source_ids %s", folder_id, source_ids)
-        cached_emails = self.email_cache.get_emails_by_ids(folder_id, source_ids)
+        cached_emails = await self.email_cache.get_emails_by_ids(folder_id, source_ids)
         if cached_emails and len(cached_emails) == len(source_ids):
             self.logger.info("Retrieved %d emails from cache for folder %s", len(cached_emails), folder_id)
             return cached_emails
             
         # If cache miss or partial hit, fetch the page again
         self.logger.info("Cache miss for folder %s, fetching from API", folder_id)
-        result = await self.get_paginated_emails_by_folder_id(folder_id)
+        result = await self.get_paginated_emails_by_folder_id(folder_id, page=page, per_page=per_page)
         emails = result["data"]
         
         # Create a map of source_id to Email object
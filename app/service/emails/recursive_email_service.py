@@ -1,6 +1,8 @@
 # Python standard library imports
+import asyncio
 import logging
-from typing import Any, AsyncGenerator, Dict, List, Union
+import os
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set, Tuple
 
 # Third party imports
 from kiota_abstractions.api_error import APIError
@@ -12,28 +14,40 @@ from app.error_handling.exceptions.folder_exception import FolderException
 from app.error_handling.exceptions.recursive_email_exception import RecursiveEmailException
 from app.models.dto.recursive_email_request_dto import RecursiveEmailRequestDTO
 from app.models.email import Email
+from app.models.folder import Folder
 from app.repository.email_recipient_repository import EmailRecipientRepository
 from app.repository.email_repository import EmailRepository
 from app.service.emails.email_cache_service import EmailCacheService
 from app.service.emails.email_collection_service import EmailCollectionService
 from app.service.folder_service import FolderService
+from app.utils.async_utils import AsyncUtils
 from app.utils.email_utils import EmailUtils
 
+logger = logging.getLogger(__name__)
+
 class RecursiveEmailService:
+    PERSIST_BATCH_SIZE = 500
+    PERSIST_QUEUE_SIZE = 4  # batches waiting on the database before the traversal is held back
+    EVENT_QUEUE_SIZE = 8  # folder events waiting on the consumer before the walkers are held back
+
     def __init__(
         self, 
         folder_service: FolderService, 
         email_collection_service: EmailCollectionService,
         email_cache_service: EmailCacheService,
         email_repository: EmailRepository,
-        email_recipient_repository: EmailRecipientRepository
+        email_recipient_repository: EmailRecipientRepository,
+        max_concurrent_folders: Optional[int] = None
     ):
         self.folder_service = folder_service
         self.email_collection_service = email_collection_service
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
         self.email_cache_service = email_cache_service
         self.email_repository = email_repository
         self.email_recipient_repository = email_recipient_repository
+        # Folders walked at once. Each holds at most one email pipeline, whose Graph calls are
+        # bounded by the collection service's admission controller
+        self.max_concurrent_folders = max_concurrent_folders or int(os.getenv("RECURSIVE_MAX_CONCURRENT_FOLDERS", "8"))
 
         
 
@@ -47,42 +61,55 @@ class RecursiveEmailService:
         Yields status updates about the operation progress and finally returns
         the IDs of successful, duplicate, and failed emails.
         """
+        pending_emails = []
+        seen_source_ids = set()  # folders can overlap, only persist each message once
+        successful_email_ids, duplicate_email_ids, failed_email_ids = [], [], []
+        # Graph fetching and database writes have separate bottlenecks, so a worker persists
+        # batches in the background while the traversal keeps going
+        # Both queues are bounded. Whenever the traversal waits on the worker it drains the
+        # worker's results too, so neither side can block the other for good
+        batches = asyncio.Queue(maxsize=self.PERSIST_QUEUE_SIZE)
+        results = asyncio.Queue(maxsize=self.PERSIST_QUEUE_SIZE)
+
+        async def persist_worker():
+            while (batch := await batches.get()) is not None:
+                await results.put(await self._persist_batch(
+                    batch, request, successful_email_ids, duplicate_email_ids, failed_email_ids
+                ))
+
+        worker = asyncio.create_task(persist_worker())
         try:
-            all_emails = []
             yield {"status": "initializing", "message": "Starting recursive email retrieval", "folder_id": folder_id}
-            async for item in self._get_all_emails_recursively_internal(folder_id):
-                if isinstance(item, list):
-                    all_emails.extend(item)
-                else:
-                    yield item
-            
-            # Handle persistence with request data
-            if all_emails:
-                # First convert and save emails
-                db_emails = [EmailUtils.email_to_db_email_recursive(email, request) for email in all_emails]
-                successful_emails, duplicate_emails, failed_emails = await self.email_repository.bulk_save_emails(db_emails)
-                
-                self.logger.info("Extracting recipients from successful emails, note that duplicate emails will not have recipients extracted")
-                all_recipients = []
-                # Match graph emails with their corresponding db emails using source_id
-                if successful_emails:
-                    all_recipients = EmailUtils.extract_recipients_from_init_response_emails(all_emails, successful_emails)
-                    # Save recipients - any failure here will raise an exception
-                    if all_recipients:
-                        await self.email_recipient_repository.bulk_save_recipients(all_recipients)
+            async for kind, payload in self._get_all_emails_recursively_internal(folder_id):
+                if kind == "emails":
+                    for email in payload:
+                        if email.source_id not in seen_source_ids:
+                            seen_source_ids.add(email.source_id)
+                            pending_emails.append(email)
+                    while len(pending_emails) >= self.PERSIST_BATCH_SIZE:
+                        batch = pending_emails[:self.PERSIST_BATCH_SIZE]
+                        del pending_emails[:self.PERSIST_BATCH_SIZE]
+                        async for result in self._enqueue_batch(batches, results, batch, worker):
+                            yield result
                 else:
-                    self.logger.error("No recipients to save, there are no successful emails")
+                    yield payload
+                while not results.empty():
+                    yield results.get_nowait()
 
-                # Extract IDs for the response
-                successful_email_ids, duplicate_email_ids, failed_email_ids = EmailUtils.extract_email_ids_from_results(
-                    successful_emails, duplicate_emails, failed_emails
-                )
-                
-                total_emails = len(successful_email_ids) + len(duplicate_email_ids) + len(failed_email_ids)
+            # Flush the tail and wait for the worker to finish
+            if pending_emails:
+                async for result in self._enqueue_batch(batches, results, pending_emails, worker):
+                    yield result
+            async for result in self._enqueue_batch(batches, results, None, worker):
+                yield result
+            async for result in self._results_until_done(results, worker):
+                yield result
 
+            total_emails = len(successful_email_ids) + len(duplicate_email_ids) + len(failed_email_ids)
+            if total_emails:
                 yield {
                     "status": "persistence_complete",
-                    "message": f"Emails: {len(successful_emails)} saved, {len(duplicate_emails)} duplicates, {len(failed_emails)} failed.",
+                    "message": f"Emails: {len(successful_email_ids)} saved, {len(duplicate_email_ids)} duplicates, {len(failed_email_ids)} failed.",
                     "data": {
                         "total_emails": total_emails,
                         "successful": successful_email_ids,
@@ -119,6 +146,107 @@ class RecursiveEmailService:
                 folder_id=folder_id,
                 status_code=500
             ) from e
+        finally:
+            worker.cancel()
+
+
+
+
+    @classmethod
+    async def _enqueue_batch(
+        cls,
+        batches: asyncio.Queue,
+        results: asyncio.Queue,
+        batch: Optional[List[Email]],
+        worker: asyncio.Task
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Queue a batch for the persistence worker, yielding the worker's results while waiting
+        for room so the worker never stalls on a full results queue. If the worker has failed,
+        its exception is raised here instead of blocking forever on a queue nobody is reading.
+        """
+        put = asyncio.ensure_future(batches.put(batch))
+        try:
+            while not put.done():
+                async for result in cls._next_result(results, {put, worker}):
+                    yield result
+                if worker.done() and not put.done():
+                    worker.result()
+        finally:
+            put.cancel()
+
+
+
+
+    @classmethod
+    async def _results_until_done(cls, results: asyncio.Queue, worker: asyncio.Task) -> AsyncGenerator[Dict[str, Any], None]:
+        """Yield the worker's results until it has finished, then re-raise its failure, if any."""
+        while not worker.done():
+            async for result in cls._next_result(results, {worker}):
+                yield result
+        while not results.empty():
+            yield results.get_nowait()
+        worker.result()
+
+
+
+
+    @staticmethod
+    async def _next_result(results: asyncio.Queue, waiting_on: Set[asyncio.Future]) -> AsyncGenerator[Dict[str, Any], None]:
+        """Wait for the next result or for any of waiting_on to finish, yielding the result if it came first."""
+        get = asyncio.ensure_future(results.get())
+        try:
+            await asyncio.wait({get, *waiting_on}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            get.cancel()
+        if get.done() and not get.cancelled():
+            yield get.result()
+
+
+
+
+    async def _persist_batch(
+        self,
+        emails: List[Email],
+        request: RecursiveEmailRequestDTO,
+        successful_email_ids: List[int],
+        duplicate_email_ids: List[str],
+        failed_email_ids: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Save a batch of emails and their recipients, and add the resulting IDs to the running totals.
+
+        Returns:
+            Dict[str, Any]: A progress update describing the batch
+        """
+        # First convert and save emails. Conversion is CPU work, keep it off the event loop
+        # so the traversal keeps streaming while a batch converts
+        # Rows are plain dicts, a straight INSERT gains nothing from ORM instances
+        rows = await asyncio.to_thread(EmailUtils.email_to_rows_recursive, emails, request)
+        successful_emails, duplicate_emails, failed_emails = await self.email_repository.bulk_insert_rows(rows)
+
+        self.logger.info("Extracting recipients from successful emails, note that duplicate emails will not have recipients extracted")
+        # Match graph emails with their corresponding db emails using source_id
+        if successful_emails:
+            recipients = EmailUtils.recipient_rows_from_init_response_emails(emails, successful_emails)
+            # Save recipients - any failure here will raise an exception
+            if recipients:
+                await self.email_recipient_repository.bulk_insert_rows(recipients)
+        else:
+            self.logger.error("No recipients to save, there are no successful emails in this batch")
+
+        # Extract IDs for the response
+        batch_successful_ids, batch_duplicate_ids, batch_failed_ids = EmailUtils.extract_email_ids_from_results(
+            successful_emails, duplicate_emails, failed_emails
+        )
+        successful_email_ids.extend(batch_successful_ids)
+        duplicate_email_ids.extend(batch_duplicate_ids)
+        failed_email_ids.extend(batch_failed_ids)
+
+        return {
+            "status": "progress",
+            "message": f"Persisted batch: {len(successful_emails)} saved, {len(duplicate_emails)} duplicates, {len(failed_emails)} failed."
+        }
 
 
 
@@ -126,65 +254,187 @@ class RecursiveEmailService:
     async def _get_all_emails_recursively_internal(
         self, 
         folder_id: str
-    ) -> AsyncGenerator[Union[List[Email], Dict[str, Any]], None]:
+    ) -> AsyncGenerator[Tuple[str, Any], None]:
         """
-        Internal method that handles the recursive traversal of folders and email retrieval.
+        Internal method that handles the traversal of folders and email retrieval.
+
+        Folders are walked by a pool of workers, at most max_concurrent_folders at a time.
+        Every folder pushes its emails and progress updates onto a shared queue, which is
+        drained here so callers still see a single stream. Items are the same tagged
+        ("emails" | "progress", payload) tuples the collection service yields.
         """
-        try:
-            # Get all subfolders
-            folder = await self.folder_service.get_folder(folder_id) # track current folder
-            subfolders = await self.folder_service.get_child_folders(folder_id)
-
-            # Check cache and get new emails
-            cached_info = self.email_cache_service.get_cache_info(folder_id)
-            cached_emails = []
-            if cached_info:
-                self.logger.info("Found cached emails for folder %s", folder_id)
-                cached_emails = list(self.email_cache_service.cache[folder_id].emails.values())
-                yield {"status": "progress", "message": f"Retrieved {len(cached_emails)} emails from cache", "folder_id": folder_id}
+        # Bounded, so walkers wait on a slow consumer instead of buffering the whole mailbox
+        events = asyncio.Queue(maxsize=self.EVENT_QUEUE_SIZE)
 
-            # Always check for new emails
-            new_emails = []
-            async for item in self.email_collection_service.get_all_emails_by_folder_id(folder_id):
-                if isinstance(item, list):
-                    # Filter out emails that are already in cache
-                    if cached_emails:
-                        cached_ids = {email.source_id for email in cached_emails}
-                        new_emails = [email for email in item if email.source_id not in cached_ids]
-                        if new_emails:
-                            self.logger.info("Found %d new emails in folder %s", len(new_emails), folder_id)
-                            # Update cache with new emails
-                            all_emails = cached_emails + new_emails
-                            self.email_cache_service.store_folder_emails(folder_id, all_emails)
-                            yield {"status": "progress", "message": f"Found {len(new_emails)} new emails", "folder_id": folder_id}
-                    else:
-                        new_emails = item
-                        self.email_cache_service.store_folder_emails(folder_id, new_emails)
-                        yield {"status": "progress", "message": f"Retrieved {len(new_emails)} emails", "folder_id": folder_id}
-                else:
+        def wake_consumer(_) -> None:
+            # The consumer only blocks on an empty queue, so there is always room when it needs waking.
+            # When the queue is full, it drains it and sees the traversal is done on its own
+            if not events.full():
+                events.put_nowait(None)
+
+        traversal = asyncio.create_task(self._walk_folders(folder_id, events))
+        traversal.add_done_callback(wake_consumer)
+        try:
+            while not (traversal.done() and events.empty()):
+                if (item := await events.get()) is not None:
                     yield item
+            traversal.result()  # re-raise the traversal's failure, if any
+        finally:
+            # Consumer stopped early or the traversal failed, don't leave folders downloading
+            traversal.cancel()
+
+
+
+
+    async def _walk_folders(self, root_folder_id: str, events: asyncio.Queue) -> None:
+        """
+        Walk the folder tree breadth first using an explicit queue instead of recursion,
+        so deeply nested mailboxes can't run into the recursion limit.
 
-            # Yield combined emails from this folder
-            all_folder_emails = cached_emails + new_emails
-            if all_folder_emails:
-                yield all_folder_emails
-            
-            # Recursively get emails from all subfolders
-            for folder in subfolders:
+        Each worker takes a folder off the queue, processes it and queues its subfolders,
+        together with their own child folders when those were already fetched.
+        A subfolder that fails with a FolderException or EmailException is skipped along
+        with its subtree. Any other failure, or a failure of the root folder, stops the walk.
+        """
+        pending = asyncio.Queue()
+        pending.put_nowait((root_folder_id, None, None))
+
+        async def worker():
+            while True:
+                folder_id, folder, subfolders = await pending.get()
                 try:
-                    async for item in self._get_all_emails_recursively_internal(folder.id):
-                        yield item
+                    next_level = await self._process_single_folder(folder_id, events, folder, subfolders)
+                    for subfolder, children in next_level:
+                        pending.put_nowait((subfolder.id, subfolder, children))
                 except APIError as e:
-                    self.logger.error("API Error in _get_all_emails_recursively_internal for folder %s: %s", folder_id, str(e))
-                    raise  # Let it propagate to parent for global handling
+                    self.logger.error("API Error in _walk_folders for folder %s: %s", folder_id, str(e))
+                    raise  # Let it propagate for global handling
                 except (FolderException, EmailException) as e:
+                    if folder_id == root_folder_id:
+                        raise
                     self.logger.warning(
                         "Skipping problematic subfolder %s: %s",
-                        folder.id,
+                        folder_id,
                         str(e)
                     )
-                    continue
+                finally:
+                    pending.task_done()
+
+        async def stop_when_drained(workers: List[asyncio.Task]):
+            await pending.join()
+            for task in workers:
+                task.cancel()
+
+        try:
+            # A worker that raises cancels its siblings and the drain watcher with it
+            async with asyncio.TaskGroup() as tg:
+                workers = [tg.create_task(worker()) for _ in range(self.max_concurrent_folders)]
+                tg.create_task(stop_when_drained(workers))
+        except BaseExceptionGroup as eg:
+            # Skippable subfolder errors were handled in the worker, anything left stops the walk.
+            # Unwrap it so callers can still handle the failure by type
+            raise AsyncUtils.unwrap_exception_group(eg) from None
+
+
+
+
+    async def _process_single_folder(
+        self,
+        folder_id: str,
+        events: asyncio.Queue,
+        folder: Optional[Folder] = None,
+        subfolders: Optional[List[Folder]] = None
+    ) -> List[Tuple[Folder, Optional[List[Folder]]]]:
+        """
+        Retrieve the emails of a single folder, pushing emails and progress updates onto
+        the events queue.
+
+        Subfolders are passed the Folder their parent already got from get_child_folders,
+        so only the root of the traversal is looked up with get_folder. Their own child
+        folders are fetched by the parent too, through get_child_folders_batch, so a level
+        of up to 20 folders costs one Graph round trip instead of one per folder.
+
+        Returns:
+            List[Tuple[Folder, Optional[List[Folder]]]]: The folder's subfolders, still to be walked,
+            each with its child folders, or None when those still have to be fetched
+        """
+        # The constant part of every progress update for this folder
+        progress = {"status": "progress", "folder_id": folder_id}
+        try:
+            # Get all subfolders. For the root, its own lookup doesn't depend on the listing,
+            # so both round trips run at once. A task group cancels the other one if either fails
+            if folder is None:
+                try:
+                    async with asyncio.TaskGroup() as tg:
+                        folder_task = tg.create_task(self.folder_service.get_folder(folder_id)) # track current folder
+                        subfolders_task = tg.create_task(self.folder_service.get_child_folders(folder_id))
+                except BaseExceptionGroup as eg:
+                    # Unwrap the task group so the handlers below still catch the failure by type
+                    raise AsyncUtils.unwrap_exception_group(eg) from None
+                folder, subfolders = folder_task.result(), subfolders_task.result()
+            elif subfolders is None:
+                subfolders = await self.folder_service.get_child_folders(folder_id)
+
+            # Check cache and get new emails. Only a recent full download of the folder is topped up,
+            # anything else (no entry, a partial one, or one due a full refresh) is downloaded again
+            cached_map = self.email_cache_service.get_complete_folder_emails(folder_id) or {}
+            if cached_map:
+                self.logger.info("Found cached emails for folder %s", folder_id)
+                await events.put(("progress", {**progress, "message": f"Retrieved {len(cached_map)} emails from cache"}))
+            # A view, not a copy. Storing the folder again swaps in a new map and cached maps are
+            # never changed in place, so the consumer can read it after the folder moves on
+            cached_emails = cached_map.values()
+
+            # Always check for new emails, they arrive one processed batch at a time. With a
+            # cached folder only messages received since the newest cached one are downloaded
+            new_emails = []
+            # Built once per folder, not per batch, and grown as new emails come in
+            cached_ids = set(cached_map) if cached_map else None  # the map is keyed by source_id
+            received_after = max(email.received_date for email in cached_emails) if cached_emails else None
+            async for kind, payload in self.email_collection_service.get_all_emails_by_folder_id(
+                folder_id, received_after=received_after
+            ):
+                if kind == "emails":
+                    # Filter out emails that are already in cache
+                    if cached_ids is not None:
+                        batch_new_emails = [email for email in payload if email.source_id not in cached_ids]
+                        cached_ids.update(email.source_id for email in batch_new_emails)
+                        new_emails.extend(batch_new_emails)
+                    else:
+                        new_emails.extend(payload)
+                else:
+                    await events.put((kind, payload))
+
+            if cached_emails:
+                if new_emails:
+                    self.logger.info("Found %d new emails in folder %s", len(new_emails), folder_id)
+                    # Update cache with new emails, keeping the time of the folder's full download
+                    await self.email_cache_service.add_folder_emails(folder_id, new_emails)
+                    await events.put(("progress", {**progress, "message": f"Found {len(new_emails)} new emails"}))
+            elif new_emails:
+                await self.email_cache_service.store_folder_emails(folder_id, new_emails, complete=True)
+                await events.put(("progress", {**progress, "message": f"Retrieved {len(new_emails)} emails"}))
+
+            # Push the emails from this folder, the consumer iterates each batch as it comes
+            if cached_emails:
+                await events.put(("emails", cached_emails))
+            if new_emails:
+                await events.put(("emails", new_emails))
+
+            # Folders without children are never asked for theirs
+            parent_ids = [subfolder.id for subfolder in subfolders if subfolder.child_folder_count]
+            grandchildren = {}
+            if parent_ids:
+                try:
+                    grandchildren = await self.folder_service.get_child_folders_batch(parent_ids)
+                except FolderException as e:
+                    # Leave the listings to each subfolder, so only the one that fails is skipped
+                    self.logger.warning("Batched child folder lookup failed for folder %s: %s", folder_id, str(e))
+            return [
+                (subfolder, grandchildren.get(subfolder.id) if subfolder.child_folder_count else [])
+                for subfolder in subfolders
+            ]
                     
         except (FolderException, EmailException) as e:
             self.logger.error("Error processing folder %s: %s", folder_id, str(e))
-            raise
\ No newline at end of file
+            raise
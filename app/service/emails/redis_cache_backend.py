@@ -0,0 +1,107 @@
+# Python standard library imports
+import logging
+import os
+from typing import Collection, Dict, List, Optional
+
+# Third party imports
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+# Application imports
+from app.models.email import Email
+
+"""
+SUMMARY:
+
+Shared second level cache for the email cache service. The in-process cache is per worker,
+so a multi-worker deployment ends up caching the same folder once per worker and paying the
+Graph quota for each of them. This backend keeps one copy per folder in Redis instead.
+
+Each folder is stored as a hash at folder:{folder_id}, mapping source_id to the JSON
+serialized Email. The whole hash shares one TTL, so dropping a folder everywhere is a
+single DEL.
+
+Redis is an optimization, never a dependency. Every call swallows Redis errors and behaves
+like a cache miss so the service keeps working when Redis is down. Connecting and every
+command are held to short timeouts, so an unreachable Redis costs a request a fraction of
+a second instead of stalling it.
+"""
+class RedisCacheBackend:
+    """Redis backed L2 store for cached folder emails"""
+
+    KEY_PREFIX = "folder:"
+    CONNECT_TIMEOUT = 0.5  # seconds to open a connection
+    SOCKET_TIMEOUT = 0.5  # seconds to wait on a command once connected
+
+    def __init__(self, client: Redis):
+        self.client = client
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_env(cls) -> Optional["RedisCacheBackend"]:
+        """
+        Build a backend from the REDIS_URL environment variable.
+
+        Returns:
+            Optional[RedisCacheBackend]: None when REDIS_URL is not set, L2 caching is then disabled
+        """
+        redis_url = os.getenv("REDIS_URL")
+        if not redis_url:
+            return None
+        return cls(Redis.from_url(
+            redis_url,
+            socket_connect_timeout=cls.CONNECT_TIMEOUT,
+            socket_timeout=cls.SOCKET_TIMEOUT
+        ))
+
+    async def close(self) -> None:
+        """Close the client's connection pool, called once on shutdown."""
+        await self.client.aclose()
+
+    async def get_many(self, folder_id: str, source_ids: List[str]) -> Dict[str, Email]:
+        """
+        Fetch the cached emails for the given source IDs in a single round trip.
+
+        Args:
+            folder_id: The ID of the folder
+            source_ids: List of source IDs to retrieve
+
+        Returns:
+            Dict[str, Email]: Map of source_id to Email for every ID found in Redis
+        """
+        if not source_ids:
+            return {}
+        try:
+            raw_emails = await self.client.hmget(self._key(folder_id), source_ids)
+        except (RedisError, OSError) as e:
+            self.logger.warning("Redis unavailable, skipping L2 lookup for folder %s: %s", folder_id, str(e))
+            return {}
+
+        return {
+            source_id: Email.model_validate_json(raw_email)
+            for source_id, raw_email in zip(source_ids, raw_emails)
+            if raw_email is not None
+        }
+
+    async def set_many(self, folder_id: str, emails: Collection[Email], ttl: int) -> None:
+        """
+        Store emails for a folder and refresh the folder's TTL.
+
+        Args:
+            folder_id: The ID of the folder
+            emails: Email objects to cache
+            ttl: Time to live for the folder entry, in seconds
+        """
+        if not emails:
+            return
+        key = self._key(folder_id)
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping={email.source_id: email.model_dump_json() for email in emails})
+                pipe.expire(key, ttl)
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            self.logger.warning("Redis unavailable, skipping L2 store for folder %s: %s", folder_id, str(e))
+
+    def _key(self, folder_id: str) -> str:
+        return f"{self.KEY_PREFIX}{folder_id}"
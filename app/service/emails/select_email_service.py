@@ -1,4 +1,5 @@
 # Python standard library imports
+import asyncio
 import logging
 from typing import Dict, List
 
@@ -14,6 +15,7 @@ from app.error_handling.exceptions.id_translation_exception import IdTranslation
 # Models
 from app.models.dto.email_selection_dto import EmailSelectionDTO
 from app.models.email import Email
+from app.models.id_pair import IdPair
 from app.models.persistence_models.email_orm import DBEmail
 from app.models.retries.retry_context import RetryContext
 from app.models.retries.retry_enums import RetryProfile
@@ -29,6 +31,7 @@ from app.service.graph.graph_id_translation_service import GraphIDTranslator
 from app.service.retry_service import RetryService
 
 # Utils
+from app.utils.async_utils import AsyncUtils
 from app.utils.email_utils import EmailUtils
 
 
@@ -86,26 +89,30 @@ class SelectEmailService:
             # Validate selection
             self._validate_source_ids(selection.email_source_ids)
 
-            # Try to get emails from cache first
-            emails = await self.paginated_email_service.get_cached_emails_by_ids(
-                folder_id, 
-                selection.email_source_ids
-            )
+            # Try to get emails from cache first. The lookup and the ID translation don't
+            # depend on each other, so the translation round trip runs alongside it. A task group
+            # cancels the other one if either fails
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    emails_task = tg.create_task(self.paginated_email_service.get_cached_emails_by_ids(
+                        folder_id, 
+                        selection.email_source_ids,
+                        page=selection.page,
+                        per_page=selection.per_page
+                    ))
+                    id_mapping_task = tg.create_task(self._translate_ids_parallel(selection))
+            except BaseExceptionGroup as eg:
+                # Unwrap the task group so the handlers below still catch the failure by type
+                raise AsyncUtils.unwrap_exception_group(eg) from None
+            emails, id_mapping_dict = emails_task.result(), id_mapping_task.result()
             
             self._validate_emails(emails, folder_id)
-            id_mapping_dict = await self._translate_ids_parallel(selection)
             self._validate_id_mappings(id_mapping_dict, emails)
             
             # First convert and save emails
-            db_emails = []
-            for email in emails:
-                immutable_id = id_mapping_dict[email.source_id]
-                db_email = EmailUtils.email_to_db_email(
-                    email=email,
-                    selection=selection,
-                    immutable_id=immutable_id
-                )
-                db_emails.append(db_email)
+            db_emails = EmailUtils.email_to_db_email_batch(
+                emails, selection, [id_mapping_dict[email.source_id] for email in emails]
+            )
 
 
             successful_emails, duplicate_emails, failed_emails = await self.email_repository.bulk_save_emails(db_emails)
@@ -149,36 +156,25 @@ class SelectEmailService:
 
 
 
-    async def _batch_translate_ids(self, source_ids: List[str], batch_size: int = 20) -> List[Dict[str, str]]:
+    async def _batch_translate_ids(self, source_ids: List[str]) -> List[IdPair]:
         """
-        Translate source IDs to immutable IDs in batches.
+        Translate source IDs to immutable IDs in batches. The batches travel as sub-requests
+        of one Graph JSON batch request, so the whole selection costs a single round trip.
         
         Args:
             source_ids: List of source IDs to translate
-            batch_size: Size of each batch for translation
             
         Returns:
-            List[Dict[str, str]]: List of mappings from source to translated IDs
+            List[IdPair]: (source_id, target_id) pairs of the translated IDs
         """
-        all_translated_ids = []
-        for i in range(0, len(source_ids), batch_size):
-            batch = source_ids[i:i + batch_size]
-            try:
-                translated_batch = await self.graph_translator.translate_ids(batch)
-                all_translated_ids.extend(translated_batch)
-                
-            except APIError as e:
-                self.logger.error("API Error in _batch_translate_ids: %s", str(e))
-                raise e
-            except Exception as e:
-                self.logger.error("Error translating batch of IDs: %s", str(e))
-                raise IdTranslationException(
-                    detail=f"Failed to translate batch of IDs: {str(e)}",
-                    source_ids=batch,
-                    status_code=500
-                ) from e
-
-        return all_translated_ids
+        try:
+            return await self.graph_translator.translate_ids(source_ids)
+        except APIError as e:
+            self.logger.error("API Error in _batch_translate_ids: %s", str(e))
+            raise e
+        except IdTranslationException as e:
+            self.logger.error("Error translating batch of IDs: %s", str(e))
+            raise
 
 
 
@@ -223,5 +219,5 @@ class SelectEmailService:
                 error_msg="Failed to translate IDs"
             )
         translated_ids = await self.retry_service.retry_operation(translate_context)
-        id_mapping = {item["source_id"]: item["target_id"] for item in translated_ids}
+        id_mapping = dict(translated_ids)  # (source_id, target_id) pairs
         return id_mapping
\ No newline at end of file
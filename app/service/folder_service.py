@@ -1,6 +1,12 @@
 # Python standard library imports
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 import logging
-from typing import List
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import quote
 
 # Third party imports
 from kiota_abstractions.api_error import APIError
@@ -17,6 +23,9 @@ from app.models.retries.retry_context import RetryContext
 from app.models.retries.retry_enums import RetryProfile
 from app.service.graph.graph_authentication_service import Graph
 from app.service.retry_service import RetryService
+from app.utils.async_utils import AsyncUtils
+from app.utils.constants.folder_constants import FolderConstants
+from app.utils.constants.graph_constants import GraphConstants
 from app.utils.graph_utils import GraphUtils
 
 
@@ -30,58 +39,114 @@ I have tested this with 10 nested folders, and it performed well. I do not expec
 using more than 10 levels of folders, so I believe our current implementation is sufficient. 
 
 AGAIN: Our heaviest bottleneck is the email retrieval, not the folder retrieval.
+
+UPDATE: The recursive email service now walks sibling folders concurrently, so every Graph
+call made here goes through a semaphore, sized by GRAPH_MAX_CONCURRENCY (default 16).
+
+UPDATE: The folder hierarchy changes slowly, so successful fetches are kept for CACHE_TTL
+seconds in a small LRU cache. UI navigation and repeat downloads don't hit Graph again for
+folders they just listed. Call invalidate after anything that changes the hierarchy.
 """
 class FolderService:
+    CACHE_TTL = 60.0
+    CACHE_MAX_ENTRIES = 1024
+
     def __init__(self, graph: Graph):
         self.graph = graph
         self.logger = logging.getLogger(__name__)
         self.retry_service = RetryService(retry_profile=RetryProfile.STANDARD)
+        self._sem = asyncio.Semaphore(int(os.getenv("GRAPH_MAX_CONCURRENCY", "16")))
+        # key -> (time.monotonic() when stored, fetched value), least recently used first
+        self._folder_cache: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+
+
+
+
+    def invalidate(self, folder_id: Optional[str] = None) -> None:
+        """
+        Drop cached folder responses. With a folder ID only that folder and its child listing
+        are dropped, along with the root listing, otherwise the whole cache is cleared.
+        """
+        if folder_id is None:
+            self._folder_cache.clear()
+            return
+        for key in (f"folder:{folder_id}", f"children:{folder_id}", "__root__"):
+            self._folder_cache.pop(key, None)
 
 
+    def _cache_get(self, key: str) -> Optional[Any]:
+        hit = self._folder_cache.get(key)
+        if hit is None:
+            return None
+        stored_at, value = hit
+        if time.monotonic() - stored_at >= self.CACHE_TTL:
+            del self._folder_cache[key]
+            return None
+        self._folder_cache.move_to_end(key)
+        return value
 
 
-    def __start_metrics(self) -> FolderMetrics:
-        """Initialize metrics for folder operations"""
+    def _cache_put(self, key: str, value: Any) -> None:
+        self._folder_cache[key] = (time.monotonic(), value)
+        self._folder_cache.move_to_end(key)
+        if len(self._folder_cache) > self.CACHE_MAX_ENTRIES:
+            self._folder_cache.popitem(last=False)
+
+
+
+
+    @asynccontextmanager
+    async def _metrics(self, operation: str, failure_key: str) -> AsyncIterator[FolderMetrics]:
+        """
+        Time a folder operation and log its metrics once it ends, however it ends.
+        Failures other than APIErrors are recorded against failure_key, or the
+        failing folder's ID when the exception carries one.
+        """
         metrics = FolderMetrics()
         metrics.start_processing()
-        return metrics
+        try:
+            yield metrics
+            metrics.current_phase = "complete"
+        except Exception as e:
+            if not isinstance(e, APIError):
+                metrics.record_retrieval_failure(getattr(e, "folder_id", None) or failure_key, str(e))
+            metrics.current_phase = "error"
+            raise
+        finally:
+            metrics.end_processing()
+            metrics.log_metrics_retrieval(self.logger, operation)
 
 
 
 
     async def get_root_folders(self) -> List[Folder]:
-        metrics = self.__start_metrics()
         self.logger.info("Starting service to get root folders")
         try:
-            folders = await self.retry_service.retry_operation(
-                RetryContext(
-                    operation=self.__fetch_root_folders,
-                    error_msg="Failed to retrieve root folders"
+            async with self._metrics("Get Root Folders", "root") as metrics:
+                folders = await self.retry_service.retry_operation(
+                    RetryContext(
+                        operation=self.__fetch_root_folders,
+                        error_msg="Failed to retrieve root folders",
+                        respect_retry_after=True
+                    )
                 )
-            )
-            self.logger.info("Retrieved %d root folders", len(folders))
-            # Just pass the child_folder_count from each folder
-            metrics.record_retrieval(len(folders))
-            return folders
+                self.logger.info("Retrieved %d root folders", len(folders))
+                # Just pass the child_folder_count from each folder
+                metrics.record_retrieval(len(folders))
+                return folders
 
         except APIError as e:
             self.logger.error("API Error in get_root_folders: %s", str(e))
             raise e
         except GraphResponseException as e:
             self.logger.error("Graph API error retrieving root folders: %s", str(e))
-            metrics.record_retrieval_failure("root", str(e))
             raise
         except Exception as e:
             self.logger.error("Error retrieving root folders: %s", str(e))
-            metrics.record_retrieval_failure("root", str(e))
             raise FolderException(
                 detail=f"Failed to retrieve root folders: {str(e)}",
                 status_code=500
             ) from e
-        finally:
-            metrics.end_processing()
-            metrics.current_phase = "complete"
-            metrics.log_metrics_retrieval(self.logger, "Get Root Folders")
 
 
 
@@ -90,35 +155,27 @@ class FolderService:
         """
         Get all child folders for a specific folder ID.
         """
-        metrics = self.__start_metrics()
         self.logger.info("Starting service to get child folders for folder ID: %s", folder_id)
         try:
-            folders = await self.retry_service.retry_operation(
-                RetryContext(
-                    operation=lambda: self.__fetch_child_folders(folder_id),
-                    error_msg=f"Failed to retrieve child folders for folder {folder_id}"
+            async with self._metrics("Get Child Folders", folder_id) as metrics:
+                folders = await self.retry_service.retry_operation(
+                    RetryContext(
+                        operation=lambda: self.__fetch_child_folders(folder_id),
+                        error_msg=f"Failed to retrieve child folders for folder {folder_id}",
+                        respect_retry_after=True
+                    )
                 )
-            )
-            # Only process metrics if we found child folders
-            if folders:
                 for folder in folders:
                     metrics.record_retrieval(folder.child_folder_count, folder.id, folder.parent_folder_id, folder.display_name)
-                metrics.end_processing()
-                metrics.current_phase = "complete"
-                metrics.log_metrics_retrieval(self.logger, "Get Child Folders")
 
-            self.logger.info("Retrieved %d child folders for folder ID: %s", len(folders), folder_id)
-            return folders
+                self.logger.info("Retrieved %d child folders for folder ID: %s", len(folders), folder_id)
+                return folders
 
         except APIError as e:
             self.logger.error("API Error in get_child_folders: %s", str(e))
             raise e
         except Exception as e:
             self.logger.error("Error retrieving child folders for folder ID %s: %s", folder_id, str(e))
-            metrics.record_retrieval_failure(folder_id, str(e))
-            metrics.end_processing()
-            metrics.current_phase = "error"
-            metrics.log_metrics_retrieval(self.logger, "Get Child Folders")
             raise FolderException(
                 detail=f"Failed to retrieve child folders: {str(e)}",
                 folder_id=folder_id,
@@ -128,74 +185,201 @@ class FolderService:
 
 
 
+    async def get_child_folders_batch(self, parent_ids: List[str]) -> Dict[str, List[Folder]]:
+        """
+        Get the child folders of many folders at once. Up to 20 folders share one Graph
+        JSON batch request, instead of paying one round trip per folder.
+
+        A throttled sub-request is retried on its own, the rest of its batch is kept.
+
+        Returns:
+            Dict[str, List[Folder]]: Child folders keyed by parent folder ID
+        """
+        self.logger.info("Starting service to get child folders for %d folders", len(parent_ids))
+        children: Dict[str, List[Folder]] = {}
+        step = GraphConstants.BATCH_MAX_REQUESTS
+        try:
+            async with self._metrics("Get Child Folders Batch", "batch") as metrics:
+                try:
+                    async with asyncio.TaskGroup() as tg:
+                        for start in range(0, len(parent_ids), step):
+                            chunk = parent_ids[start:start + step]
+                            tg.create_task(self.retry_service.retry_operation(
+                                RetryContext(
+                                    operation=lambda chunk=chunk: self.__fetch_child_folders_batch(chunk, children),
+                                    error_msg=f"Failed to retrieve child folders for {len(chunk)} folders",
+                                    abort_on_exceptions=[FolderException],
+                                    respect_retry_after=True
+                                )
+                            ))
+                except BaseExceptionGroup as eg:
+                    # Unwrap the task group so callers can still handle the failure by type
+                    raise AsyncUtils.unwrap_exception_group(eg) from None
+
+                for folders in children.values():
+                    for folder in folders:
+                        metrics.record_retrieval(folder.child_folder_count, folder.id, folder.parent_folder_id, folder.display_name)
+                self.logger.info("Retrieved child folders for %d folders", len(children))
+                return children
+
+        except (APIError, FolderException) as e:
+            self.logger.error("Error retrieving child folders in batch: %s", str(e))
+            raise
+        except Exception as e:
+            self.logger.error("Error retrieving child folders in batch: %s", str(e))
+            raise FolderException(
+                detail=f"Failed to retrieve child folders: {str(e)}",
+                status_code=500
+            ) from e
+
+
+
+
     async def get_folder(self, folder_id: str) -> Folder:
         """
         Get details of a specific folder by its ID.
         """
-        metrics = self.__start_metrics()  # This returns an instance of FolderMetrics.
         self.logger.info("Starting service to get folder for folder ID: %s", folder_id)
         
         try:
-            folder = await self.retry_service.retry_operation(
-                RetryContext(
-                    operation=lambda: self.graph.client.me.mail_folders.by_mail_folder_id(folder_id).get(),
-                    error_msg=f"Failed to retrieve folder {folder_id}"
+            async with self._metrics("Get Folder", folder_id) as metrics:
+                folder = await self.retry_service.retry_operation(
+                    RetryContext(
+                        operation=lambda: self.__fetch_folder(folder_id),
+                        error_msg=f"Failed to retrieve folder {folder_id}",
+                        respect_retry_after=True
+                    )
                 )
-            )
-            folder = Folder.from_graph_folder(folder)
-            metrics.record_retrieval(folder.child_folder_count, folder.id, folder.parent_folder_id, folder.display_name)
-            self.logger.info("Retrieved folder: %s", folder.display_name)
-            return folder
+                folder = Folder.from_graph_folder(folder)
+                metrics.record_retrieval(folder.child_folder_count, folder.id, folder.parent_folder_id, folder.display_name)
+                self.logger.info("Retrieved folder: %s", folder.display_name)
+                return folder
 
         except APIError as e:
             self.logger.error("API Error retrieving folder %s: %s", folder_id, e)
             raise
         except Exception as e:
             self.logger.error("Error retrieving folder %s: %s", folder_id, e)
-            metrics.record_retrieval_failure(folder_id, str(e))
             raise FolderException(
                 detail=f"Failed to retrieve folder: {str(e)}",
                 folder_id=folder_id,
                 status_code=500
             ) from e
-        finally:
-            metrics.end_processing()
-            metrics.current_phase = "complete"
-            metrics.log_metrics_retrieval(self.logger, "Get Folder")
                 
 
 
 
 
-    # Helper methods for the actual fetching
+    # Helper methods for the actual fetching, each Graph call holds the semaphore
+    async def __fetch_folder(self, folder_id: str):
+        key = f"folder:{folder_id}"
+        if (cached := self._cache_get(key)) is not None:
+            return cached
+        async with self._sem:
+            folder = await self.graph.client.me.mail_folders.by_mail_folder_id(folder_id).get()
+        if folder is not None:
+            self._cache_put(key, folder)
+        return folder
+
     async def __fetch_root_folders(self):
-        result = await self.graph.client.me.mail_folders.get(
-            request_configuration=RequestConfiguration(
-                query_parameters=MailFoldersRequestBuilder.MailFoldersRequestBuilderGetQueryParameters(
-                    top=200
+        if (cached := self._cache_get("__root__")) is not None:
+            return list(cached)
+        async with self._sem:
+            result = await self.graph.client.me.mail_folders.get(
+                request_configuration=RequestConfiguration(
+                    query_parameters=MailFoldersRequestBuilder.MailFoldersRequestBuilderGetQueryParameters(
+                        top=200,
+                        select=list(FolderConstants.FOLDER_SELECT_FIELDS)
+                    )
                 )
             )
-        )
-        return [
-            Folder.from_graph_folder(folder)
-            for folder in GraphUtils.get_collection_value(
-                result, MailFolderCollectionResponse
-            )
-        ]
+        folders = list(map(
+            Folder.from_graph_folder,
+            GraphUtils.get_collection_value(result, MailFolderCollectionResponse)
+        ))
+        self._cache_put("__root__", folders)
+        return list(folders)
 
     async def __fetch_child_folders(self, folder_id: str):
-        result = await (
-            self.graph.client.me.mail_folders
-            .by_mail_folder_id(folder_id)
-            .child_folders.get(
-                request_configuration=RequestConfiguration(
-                    query_parameters=MailFoldersRequestBuilder.MailFoldersRequestBuilderGetQueryParameters(
-                        top=200
+        key = f"children:{folder_id}"
+        if (cached := self._cache_get(key)) is not None:
+            return list(cached)
+        async with self._sem:
+            result = await (
+                self.graph.client.me.mail_folders
+                .by_mail_folder_id(folder_id)
+                .child_folders.get(
+                    request_configuration=RequestConfiguration(
+                        query_parameters=MailFoldersRequestBuilder.MailFoldersRequestBuilderGetQueryParameters(
+                            top=200,
+                            select=list(FolderConstants.FOLDER_SELECT_FIELDS)
+                        )
                     )
                 )
             )
-        )
-        return [
-            Folder.from_graph_folder(folder)
-            for folder in GraphUtils.get_collection_value(result, MailFolderCollectionResponse)
-        ]
\ No newline at end of file
+        folders = list(map(
+            Folder.from_graph_folder,
+            GraphUtils.get_collection_value(result, MailFolderCollectionResponse)
+        ))
+        self._cache_put(key, folders)
+        return list(folders)
+
+
+
+    async def __fetch_child_folders_batch(self, parent_ids: List[str], children: Dict[str, List[Folder]]) -> None:
+        """
+        Fetch the child folders of up to 20 folders in a single JSON batch request, adding them
+        to children. Folders already in children were fetched by an earlier attempt and are skipped,
+        folders with a cached child listing are served from the cache.
+
+        Raises:
+            GraphResponseException: If some sub-requests were throttled, so the retry picks them up
+            FolderException: If a sub-request failed for any other reason
+        """
+        pending = []
+        for parent_id in parent_ids:
+            if parent_id in children:
+                continue
+            if (cached := self._cache_get(f"children:{parent_id}")) is not None:
+                children[parent_id] = list(cached)
+            else:
+                pending.append(parent_id)
+        if not pending:
+            return
+        select = ",".join(FolderConstants.FOLDER_SELECT_FIELDS)
+        requests = [
+            {
+                "method": "GET",
+                "url": f"/me/mailFolders/{quote(parent_id, safe='')}/childFolders?$top=200&$select={select}"
+            }
+            for parent_id in pending
+        ]
+        async with self._sem:
+            responses = await GraphUtils.send_json_batch(self.graph.client, requests)
+
+        throttled = []
+        retry_after = None
+        for parent_id, response in zip(pending, responses):
+            status = response["status"]
+            if status == 200:
+                folders = list(map(Folder.from_graph_json, response["body"]["value"]))
+                self._cache_put(f"children:{parent_id}", folders)
+                children[parent_id] = list(folders)
+            elif status in GraphConstants.RETRYABLE_STATUS_CODES:
+                throttled.append(parent_id)
+                # Wait as long as the most throttled sub-request asks for
+                if (seconds := GraphUtils.retry_after_seconds(response)) is not None:
+                    retry_after = max(retry_after or 0, seconds)
+            else:
+                raise FolderException(
+                    detail=f"Failed to retrieve child folders, Graph returned {status}",
+                    folder_id=parent_id,
+                    status_code=500
+                )
+
+        if throttled:
+            raise GraphResponseException(
+                detail=f"{len(throttled)} of {len(pending)} child folder requests were throttled",
+                status_code=429,
+                retry_after=retry_after
+            )
@@ -1,18 +1,26 @@
 # Python standard library imports
-from datetime import datetime, timedelta
+import asyncio
+from collections import OrderedDict
 import logging
 import os
 import secrets
-from typing import Any, Dict, Optional
+import time
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+from urllib.parse import quote, urlencode
 
 # Third party imports
+import httpx
 from azure.core.exceptions import ClientAuthenticationError
-from azure.identity import AuthorizationCodeCredential
+from azure.identity.aio import AuthorizationCodeCredential
 from kiota_abstractions.api_error import APIError
-from msgraph import GraphServiceClient
+from kiota_authentication_azure.azure_identity_authentication_provider import AzureIdentityAuthenticationProvider
+from msgraph import GraphRequestAdapter, GraphServiceClient
+from msgraph_core import GraphClientFactory
 
 # Application imports
 from app.error_handling.exceptions.authentication_exception import AuthenticationFailedException
+from app.service.graph.orjson_parse_node_factory import OrjsonParseNodeFactory
 
 """
 SUMMARY:
@@ -24,10 +32,24 @@ and allowing for the refresh token to fail gracefully. This is done by clearing
 credential when the refresh token fails, ensuring that only fresh tokens are used, and preventing
 cache poisoning. I would recommend keeping it in place.
 
+UPDATE: Every Graph client is built on one shared httpx client. The folder walk and the email
+pipeline run many short Graph calls in parallel; with a pooled HTTP/2 client they share kept alive
+connections instead of paying a TLS handshake per call, and the pool survives re-authentication.
+
 """
+# Returned on every authenticated call, read only so callers can't alter the shared instance
+_AUTHED: Mapping[str, Any] = MappingProxyType({"authenticated": True, "auth_url": None})
+
 class Graph:
     """Handles Microsoft Graph API client setup and authentication."""
 
+    HTTP_MAX_CONNECTIONS = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+    HTTP_KEEPALIVE_EXPIRY = 120  # seconds an idle connection is kept open
+
+    # Environment variables checked by is_loaded, each one's config key is its name without "AZURE_"
+    _REQUIRED_ENV = ("AZURE_CLIENT_ID", "AZURE_CLIENT_SECRET", "AZURE_TENANT_ID", "AZURE_REDIRECT_URI")
+
     def __init__(self):
         """
         Initializes the Graph API client with environment variables.
@@ -39,29 +61,59 @@ class Graph:
             "client_secret": os.getenv("AZURE_CLIENT_SECRET"),
             "tenant_id": os.getenv("AZURE_TENANT_ID"),
             "redirect_uri": os.getenv("AZURE_REDIRECT_URI"),
-            "scopes": os.getenv("AZURE_GRAPH_USER_SCOPES", "").split(" ")
+            # Bare split() drops the empty scope "".split(" ") would produce from an unset variable
+            "scopes": tuple(os.getenv("AZURE_GRAPH_USER_SCOPES", "").split())
         }
         self.client: Optional[GraphServiceClient] = None
         self.credential: Optional[AuthorizationCodeCredential] = None
         self.logger = logging.getLogger(__name__)
-        self._state_store: Dict[str, datetime] = {}  # Store states with timestamps
+        # Store states with monotonic timestamps, in insertion order so the oldest expire first
+        self._state_store: OrderedDict[str, float] = OrderedDict()
         self.STATE_TIMEOUT = 300 # 5 minute timeout  # pylint: disable=invalid-name
-        self.token_expires_at: Optional[datetime] = None
+        self.token_expires_at: Optional[float] = None  # time.monotonic() deadline
         self.token_refresh_window = 300 # 5 minute refresh window  # Refresh token before expiration
+        # Serializes credential changes, so concurrent callers don't refresh or log in twice
+        self._auth_lock = asyncio.Lock()
+        # Shared by every GraphServiceClient we build, HTTP/2 multiplexes parallel calls over one connection.
+        # The SDK's default Graph middleware (retries, redirects, telemetry) is mounted on it once, here
+        self.http_client = GraphClientFactory.create_with_default_middleware(
+            client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=self.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=self.HTTP_KEEPALIVE_EXPIRY
+                ),
+                http2=True
+            )
+        )
 
         # init check
-        self .is_loaded()
+        self.is_loaded()
+
+        # Everything in the authorization URL except the state is fixed for the process
+        self._scopes_joined = " ".join(self.config["scopes"])
+        self._auth_base_url = f"https://login.microsoftonline.com/{self.config['tenant_id']}/oauth2/v2.0/authorize"
+        # Percent-encode every value (the space separated scopes and the redirect URI included)
+        self._auth_static_query = urlencode({
+            "client_id": self.config["client_id"],
+            "response_type": "code",
+            "redirect_uri": self.config["redirect_uri"],
+            "response_mode": "query",
+            "scope": self._scopes_joined,
+            "prompt": "select_account",      # forces user to select account everytime 
+            "login_hint": "",      # Clears previous login hints
+            "domain_hint": ""
+        }, quote_via=quote)
         
 
-    def _cleanup_expired_states(self):
-        """Remove expired states from the store"""
-        current_time = datetime.utcnow()
-        expired_states = [
-            state for state, timestamp in self._state_store.items()
-            if current_time - timestamp > timedelta(seconds=self.STATE_TIMEOUT)
-        ]
-        for state in expired_states:
-            self._state_store.pop(state, None)
+    def _cleanup_expired_states(self, current_time: float):
+        """
+        Remove expired states from the store. States are stored oldest first,
+        so only the expired prefix is visited.
+        """
+        store = self._state_store
+        while store and current_time - next(iter(store.values())) > self.STATE_TIMEOUT:
+            store.popitem(last=False)
 
     def get_authorization_url(self) -> str:
         """
@@ -72,56 +124,48 @@ class Graph:
         """
         # Generate a secure random state
         state = secrets.token_urlsafe(32)
-        print(f"state: {state}")
         # Store state with timestamp
-        self._state_store[state] = datetime.utcnow()
-        self._cleanup_expired_states()
+        now = time.monotonic()
+        self._state_store[state] = now
+        self._cleanup_expired_states(now)
         
-        self.logger.debug("Generated state: %s", state)
-        self.logger.debug("Stored states after adding new one: %s", list(self._state_store.keys()))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Generated state: %s", state)
+            self.logger.debug("Stored states after adding new one: %s", list(self._state_store.keys()))
 
-        # Build authorization URL with state parameter
-        base_url = f"https://login.microsoftonline.com/{self.config['tenant_id']}/oauth2/v2.0/authorize"
-        params = {
-            "client_id": self.config["client_id"],
-            "response_type": "code",
-            "redirect_uri": self.config["redirect_uri"],
-            "response_mode": "query",
-            "scope": " ".join(self.config["scopes"]),
-            "state": state,
-            "prompt": "select_account",      # forces user to select account everytime 
-            "login_hint": "",      # Clears previous login hints
-            "domain_hint": ""
-        }
-        
-        query_string = "&".join(f"{key}={value}" for key, value in params.items())
-        self.logger.info(f"Authorization URL generated successfully with state parameter:\n{base_url}?{query_string}") # pylint: disable=W1203
-        return f"{base_url}?{query_string}"
+        # Build authorization URL with state parameter. token_urlsafe only produces URL safe
+        # characters, so the state can be appended to the pre-encoded query as is
+        # The full URL carries the state, which must not end up in the logs
+        self.logger.info("Authorization URL generated successfully with state parameter %s...", state[:6])
+        return f"{self._auth_base_url}?{self._auth_static_query}&state={state}"
 
 
     def verify_state(self, received_state: Optional[str]) -> bool:
         """Verify the received state matches a stored state and hasn't expired."""
-        self.logger.debug("Verifying state: %s", received_state)
-        self.logger.debug("Current store contents: %s", list(self._state_store.keys()))
+        debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            self.logger.debug("Verifying state: %s", received_state)
+            self.logger.debug("Current store contents: %s", list(self._state_store.keys()))
         
         if not received_state:
             self.logger.debug("No state received, skipping verification")
             return False
             
-        if received_state not in self._state_store:
-            self.logger.warning("State not found in store: %s", received_state)
-            self.logger.debug("Available states: %s", list(self._state_store.keys()))
+        # States are single use, pop it whether or not it turns out to be valid
+        state_time = self._state_store.pop(received_state, None)
+        if state_time is None:
+            self.logger.warning("State not found in store: %s...", received_state[:6])
+            if debug_enabled:
+                self.logger.debug("Available states: %s", list(self._state_store.keys()))
             return False
-                
-        state_time = self._state_store[received_state]
-        current_time = datetime.utcnow()
-        is_valid = (current_time - state_time) <= timedelta(seconds=self.STATE_TIMEOUT)
+
+        age = time.monotonic() - state_time
+        is_valid = age <= self.STATE_TIMEOUT
         
         if not is_valid:
-            self.logger.warning("State expired. Created: %s, Current: %s", 
-                            state_time, current_time)
+            self.logger.warning("State expired. Age: %.1f seconds, timeout: %s seconds", 
+                            age, self.STATE_TIMEOUT)
         
-        self._state_store.pop(received_state)
         return is_valid
 
 
@@ -145,21 +189,25 @@ class Graph:
             )
 
         try:
-            self.credential = AuthorizationCodeCredential(
-                tenant_id=self.config["tenant_id"],
-                client_id=self.config["client_id"],
-                authorization_code=authorization_code,
-                redirect_uri=self.config["redirect_uri"],
-                client_secret=self.config["client_secret"],
-            )
-            self.client = GraphServiceClient(self.credential, self.config["scopes"])
-            self.logger.info("Graph client initialized successfully")
-
-            # Retrieve token details and update expiration time.
-            token_response = self.credential.get_token(*self.config["scopes"])
-            self.token_expires_at = datetime.utcfromtimestamp(token_response.expires_on)
+            async with self._auth_lock:
+                # A new login replaces the previous credential, release its transport first
+                await self._discard_credential()
+                self.credential = AuthorizationCodeCredential(
+                    tenant_id=self.config["tenant_id"],
+                    client_id=self.config["client_id"],
+                    authorization_code=authorization_code,
+                    redirect_uri=self.config["redirect_uri"],
+                    client_secret=self.config["client_secret"],
+                )
+                self.client = self._build_client(self.credential)
+                self.logger.info("Graph client initialized successfully")
+
+                # Retrieve token details and update expiration time, without blocking the event loop.
+                token_response = await self.credential.get_token(*self.config["scopes"])
+                self.token_expires_at = self._monotonic_expiry(token_response.expires_on)
             
-            self.logger.info("Graph client initialized successfully; token expires at %s", self.token_expires_at)
+                self.logger.info("Graph client initialized successfully; token expires in %.0f seconds",
+                                 self.token_expires_at - time.monotonic())
 
         except APIError as e:
             self.logger.error("API Error in exchange_code_for_token: %s", str(e))
@@ -168,23 +216,49 @@ class Graph:
             self.logger.error("Failed to exchange code for token: %s", e)
             # Clear potentially corrupted state
             self.client = None
-            self.credential = None
+            await self._discard_credential()
             raise AuthenticationFailedException(
                 detail="Failed to exchange authorization code for access token."
             ) from e
 
 
-    async def refresh_token_if_needed(self) -> bool:
+    async def _discard_credential(self) -> None:
+        """Close the current credential, if any, and forget it."""
+        credential, self.credential = self.credential, None
+        if credential is not None:
+            await credential.close()
+
+
+    def _build_client(self, credential: AuthorizationCodeCredential) -> GraphServiceClient:
+        """Build a GraphServiceClient for the credential on top of the shared http client."""
+        auth_provider = AzureIdentityAuthenticationProvider(credential, scopes=list(self.config["scopes"]))
+        client = GraphServiceClient(request_adapter=GraphRequestAdapter(auth_provider, client=self.http_client))
+        # Constructing the client registers the stock JSON factory again, put the orjson one back
+        OrjsonParseNodeFactory.register()
+        return client
+
+
+    @staticmethod
+    def _monotonic_expiry(expires_on: int) -> float:
+        """Convert a token's expires_on, in epoch seconds, to a time.monotonic() deadline."""
+        return time.monotonic() + (expires_on - time.time())
+
+
+    async def refresh_token_if_needed(self, now: Optional[float] = None) -> bool:
         """
         Refreshes the access token if it's close to expiration.
         Returns True if the token is still valid or refreshed successfully,
         and False if the token refresh fails (e.g. due to an expired refresh token).
+
+        Args:
+            now: The caller's time.monotonic() reading, taken here when not given
         """
         if not self.credential or not self.token_expires_at:
             return False
 
-        now = datetime.utcnow()
-        time_remaining = (self.token_expires_at - now).total_seconds()
+        if now is None:
+            now = time.monotonic()
+        time_remaining = self.token_expires_at - now
         
         # Only attempt a refresh if the token is within the refresh window.
         if time_remaining > self.token_refresh_window:
@@ -193,10 +267,11 @@ class Graph:
 
         try:
             # Refresh the token by calling get_token with unpacked scopes.
-            token_response = self.credential.get_token(*self.config["scopes"])
+            token_response = await self.credential.get_token(*self.config["scopes"])
             if token_response.expires_on:
-                self.token_expires_at = datetime.utcfromtimestamp(token_response.expires_on)
-                self.logger.info("Token refreshed successfully; new expiration at %s", self.token_expires_at)
+                self.token_expires_at = self._monotonic_expiry(token_response.expires_on)
+                self.logger.info("Token refreshed successfully; new expiration in %.0f seconds",
+                                 self.token_expires_at - time.monotonic())
                 return True
             self.logger.error("Token response did not contain an expiration time.")
             return False
@@ -208,13 +283,13 @@ class Graph:
             self.logger.error("Failed to refresh token: %s", e)
             if "AADSTS70008" in str(e):
                 self.logger.info("Refresh token expired, clearing credentials to force new login.")
-                self.client = None
-                self.credential = None
+                # The client is rebuilt on the next login, its http pool is shared and stays open
+                await self._discard_credential()
             return False
 
 
 
-    async def ensure_authenticated(self, authorization_code: Optional[str] = None ) -> Dict[str, Any]:
+    async def ensure_authenticated(self, authorization_code: Optional[str] = None ) -> Mapping[str, Any]:
         """
         Ensures the Graph client is authenticated. If not initialized
         and an authorization code is provided, exchanges it for a token.
@@ -224,52 +299,64 @@ class Graph:
             authorization_code (Optional[str]): The authorization code to exchange for a token.
 
         Returns:
-            dict: A response indicating whether authentication
+            Mapping: A response indicating whether authentication
             is required, including the authorization URL if
-            needed.
+            needed. Read only when already authenticated.
 
         Raises:
             AuthenticationFailedException: If authentication fails.
         """
-        self.logger.info("Ensuring Graph client is authenticated.")
-
+        now = time.monotonic()
         has_credentials = bool(self.client and self.credential)
+        token_valid = bool(self.token_expires_at) and self.token_expires_at - now > self.token_refresh_window
+        # Fast path, every Graph call lands here and almost all of them are already authenticated
+        if has_credentials and token_valid:
+            return _AUTHED
+
+        self.logger.info("Ensuring Graph client is authenticated.")
         has_auth_code = bool(authorization_code)
-        
-        token_valid = False
-        if self.token_expires_at:
-            remaining = (self.token_expires_at - datetime.utcnow()).total_seconds()
-            token_valid = remaining > self.token_refresh_window
 
         match (has_credentials, has_auth_code, token_valid):
             # Case 1: We have credentials and the token is valid.
             case (True, _, True):
                 self.logger.info("Token is valid; no refresh needed.")
-                return {"authenticated": True, "auth_url": None}
-            
-            # Case 2: We have credentials but token is near expiration.
+                return _AUTHED
+
+            # Case 2: We have credentials but token is near expiration. Only one caller refreshes,
+            # the rest wait on the lock and then see the new expiry instead of refreshing again
             case (True, _, False):
-                if await self.refresh_token_if_needed():
+                async with self._auth_lock:
+                    refreshed = await self.refresh_token_if_needed()
+                if refreshed:
                     self.logger.info("Token refreshed successfully.")
-                    return {"authenticated": True, "auth_url": None}
+                    return _AUTHED
                 self.logger.info("Token refresh failed; forcing new login.")
                 return {"authenticated": False, "auth_url": self.get_authorization_url()}
-            
-            # Case 3: No credentials and no auth code provided.
-            case (False, False, _):
-                self.logger.info("No credentials and no auth code; initiating login flow.")
+
+            # Case 3: No credentials. An auth code can only be exchanged with its state, on the
+            # auth callback, so with or without one the user has to log in.
+            case (False, _, _):
+                self.logger.info("No credentials; initiating login flow.")
                 return {"authenticated": False, "auth_url": self.get_authorization_url()}
 
 
 
+    async def close(self):
+        """Close the credential and the shared http client and its connection pool, on application shutdown."""
+        await self._discard_credential()
+        await self.http_client.aclose()
+        self.logger.info("Graph http client closed.")
+
+
+
     def is_loaded(self):
-        if not all([self.config["client_id"], self.config["client_secret"],
-            self.config["tenant_id"], self.config["redirect_uri"]]):
-            self.logger.error(
-                """
-                Missing required environment variables:
-                AZURE_CLIENT_ID, AZURE_CLIENT_SECRET, AZURE_TENANT_ID, AZURE_REDIRECT_URI
-                """
-            )
-            raise ValueError("Missing required environment variables for Graph API authentication")
+        missing = [
+            env_var for env_var in self._REQUIRED_ENV
+            if not self.config[env_var.removeprefix("AZURE_").lower()]
+        ]
+        if not self.config["scopes"]:
+            missing.append("AZURE_GRAPH_USER_SCOPES")
+        if missing:
+            self.logger.error("Missing required environment variables: %s", ", ".join(missing))
+            raise ValueError(f"Missing required environment variables for Graph API authentication: {', '.join(missing)}")
         self.logger.info("env has loaded successfully, proceeding")
@@ -1,74 +1,243 @@
 # Python standard library imports
+import asyncio
 import logging
-from typing import Any, Dict, List
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 # Third party imports
 from kiota_abstractions.api_error import APIError
-from msgraph.generated.models.exchange_id_format import ExchangeIdFormat
-from msgraph.generated.users.item.translate_exchange_ids.translate_exchange_ids_post_request_body import (
-    TranslateExchangeIdsPostRequestBody,
-)
 
 # Application imports
 from app.error_handling.exceptions.id_translation_exception import IdTranslationException
+from app.models.id_pair import IdPair
 from app.service.graph.graph_authentication_service import Graph
+from app.utils.constants.graph_constants import GraphConstants
+from app.utils.graph_utils import GraphUtils
 
+logger = logging.getLogger(__name__)
 
+
+"""
+SUMMARY:
+
+Translates Graph REST message IDs to immutable IDs. A REST ID always maps to the same
+immutable ID, so translations are memoized per ID in a bounded LRU map. Repeat downloads
+of a folder, retries and overlapping selections only send the IDs we haven't seen yet.
+
+UPDATE: The recursive walk downloads several folders at once, and most folders are small, so
+every folder used to cost its own translateExchangeIds POST. translate_ids parks the
+IDs of concurrent callers for a few milliseconds and sends them together as sub-requests of
+one JSON batch request, so a whole wave of folders shares a single round trip.
+"""
 class GraphIDTranslator:
+    CACHE_MAX_SIZE = 100_000
+    CHUNK_SIZE = 1000  # IDs per translateExchangeIds sub-request, the Graph maximum
+    COALESCE_WINDOW = 0.01  # seconds translate_ids waits for other callers to join a batch
+
     def __init__(self, graph: Graph):
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
         self.graph = graph
+        self._id_cache: OrderedDict[str, str] = OrderedDict()
+        # Chunks waiting for the next coalesced batch, each with the future its caller awaits
+        self._queued: List[Tuple[List[str], asyncio.Future]] = []
+        # Flushes still running, see _enqueue
+        self._flush_tasks: Set[asyncio.Task] = set()
 
 
-    async def translate_ids(self, input_ids: List[str]) -> List[Dict[str, Any]]:
+    async def translate_ids(self, input_ids: List[str]) -> List[IdPair]:
         """
-        Translate regular IDs to immutable IDs for emails using the SDK's built-in translate_exchange_ids method.
+        Translate regular IDs to immutable IDs for emails, sharing the Graph round trip with
+        concurrent callers. IDs translated before are served from the cache, the missing ones
+        are queued, and after COALESCE_WINDOW everything queued by then goes out as one JSON
+        batch request, 20 chunks of up to CHUNK_SIZE IDs apiece.
+        A failed sub-request only fails the caller whose chunk it carried.
 
         Args:
             input_ids (List[str]): List of input IDs to translate.
 
         Returns:
-            List[Dict[str, Any]]: Translated IDs with source and target mapping.
+            List[IdPair]: Translated IDs as (source_id, target_id) pairs, in input order.
         """
-        self.logger.info("Starting ID translation service for %d input IDs", len(input_ids))
-        try:
-            if not input_ids:
-                raise IdTranslationException(
-                    detail="No input IDs to translate", status_code=400
-                )
-
-            await self.graph.ensure_authenticated()
-            request_body = TranslateExchangeIdsPostRequestBody(
-                input_ids=input_ids,
-                source_id_type=ExchangeIdFormat.RestId,
-                target_id_type=ExchangeIdFormat.RestImmutableEntryId,
+        if not input_ids:
+            raise IdTranslationException(
+                detail="No input IDs to translate", status_code=400
             )
 
-            result = await self.graph.client.me.translate_exchange_ids.post(request_body)
-            if not result or not result.value:
-                self.logger.error("No results returned from translation service")
-                raise IdTranslationException(
-                    detail="No results returned from translation service",
-                    source_ids=input_ids,
-                    status_code=500
-                )
-
-            self.logger.info("Translation service completed successfully for %d input IDs", len(input_ids))
-            return [
-                {"source_id": item.source_id, "target_id": item.target_id}
-                for item in result.value
-            ]
-
+        self.logger.info("Starting ID translation service for %d input IDs", len(input_ids))
+        translated, missing_ids = self._split_cached(input_ids)
+        try:
+            if missing_ids:
+                for mapping in await asyncio.gather(*self._enqueue(missing_ids)):
+                    translated.update(mapping)
         except APIError as e:
             self.logger.error("API Error in translate_ids: %s", str(e))
             raise e
         except IdTranslationException as e:
             self.logger.error("Error translating IDs: %s", e)
+            self._forget(e.source_ids)
             raise
         except Exception as e:
             self.logger.error("Error translating IDs: %s", e)
             raise IdTranslationException(
                 detail=f"Failed to translate IDs: {str(e)}",
-                source_ids=input_ids,
+                source_ids=missing_ids,
                 status_code=500,
-            ) from e
\ No newline at end of file
+            ) from e
+
+        return [
+            IdPair(input_id, translated[input_id])
+            for input_id in input_ids if input_id in translated
+        ]
+
+
+
+
+    def _enqueue(self, missing_ids: List[str]) -> List[asyncio.Future]:
+        """
+        Queue the IDs for the next coalesced batch, CHUNK_SIZE IDs per sub-request, and return
+        the futures their translations arrive on. The first caller of a batch starts its flush.
+        """
+        start_flush = not self._queued
+        loop = asyncio.get_running_loop()
+        futures = []
+        for start in range(0, len(missing_ids), self.CHUNK_SIZE):
+            future = loop.create_future()
+            self._queued.append((missing_ids[start:start + self.CHUNK_SIZE], future))
+            futures.append(future)
+        if start_flush:
+            # The flush owns this batch list, callers queueing during the window append to it.
+            # The loop only keeps weak references to tasks, so the task is held until it is done
+            batch = self._queued
+            flush_task = asyncio.create_task(self._flush_queued(batch))
+            self._flush_tasks.add(flush_task)
+            flush_task.add_done_callback(lambda task: self._flush_done(task, batch))
+        return futures
+
+
+
+
+    def _flush_done(self, flush_task: asyncio.Task, batch: List[Tuple[List[str], asyncio.Future]]) -> None:
+        """
+        Drop the finished flush. A flush cancelled before it got to run never reaches its own
+        cleanup, so its batch is closed and failed here instead.
+        """
+        self._flush_tasks.discard(flush_task)
+        if flush_task.cancelled():
+            self._close_batch(batch)
+            self._fail_unsettled(batch, None)
+
+
+
+
+    async def _flush_queued(self, queued: List[Tuple[List[str], asyncio.Future]]) -> None:
+        """
+        Wait out the coalescing window, then send every chunk of the batch and settle its future.
+        Failures are handed to the waiting callers, never raised here, and however the flush
+        ends no caller is left waiting.
+        """
+        error: Optional[Exception] = None
+        try:
+            await asyncio.sleep(self.COALESCE_WINDOW)
+            # Callers arriving from now on start the next batch
+            self._close_batch(queued)
+            self.logger.debug("Sending %d coalesced translation chunks", len(queued))
+            await self.graph.ensure_authenticated()
+            step = GraphConstants.BATCH_MAX_REQUESTS
+            await asyncio.gather(*(self._send_chunks(queued[start:start + step]) for start in range(0, len(queued), step)))
+        except Exception as e: # pylint: disable=broad-exception-caught # handed to every waiting caller
+            error = e
+        finally:
+            self._close_batch(queued)  # cancelled inside the window, the batch is still open
+            self._fail_unsettled(queued, error)
+
+
+
+
+    def _close_batch(self, batch: List[Tuple[List[str], asyncio.Future]]) -> None:
+        """Stop new callers joining the batch, the next one to queue starts a fresh batch."""
+        if self._queued is batch:
+            self._queued = []
+
+
+
+
+    @staticmethod
+    def _fail_unsettled(queued: List[Tuple[List[str], asyncio.Future]], error: Optional[Exception]) -> None:
+        """Fail every chunk whose future is still pending, with the flush's error if it had one."""
+        for chunk, future in queued:
+            if not future.done():
+                future.set_exception(error or IdTranslationException(
+                    detail="Translation batch ended before these IDs were translated",
+                    source_ids=chunk,
+                    status_code=500
+                ))
+
+
+
+
+    async def _send_chunks(self, group: List[Tuple[List[str], asyncio.Future]]) -> None:
+        """Send up to 20 queued chunks as one JSON batch request and settle each chunk's future."""
+        try:
+            responses = await GraphUtils.send_json_batch(
+                self.graph.client, [self._translate_sub_request(chunk) for chunk, _ in group]
+            )
+        except Exception as e: # pylint: disable=broad-exception-caught # handed to every waiting caller
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (chunk, future), response in zip(group, responses):
+            if future.done():  # the caller was cancelled
+                continue
+            if response["status"] != 200:
+                future.set_exception(IdTranslationException(
+                    detail=f"Translation sub-request failed with status {response['status']}",
+                    source_ids=chunk,
+                    status_code=500
+                ))
+                continue
+            mapping = {item["sourceId"]: item["targetId"] for item in response["body"]["value"]}
+            for source_id, target_id in mapping.items():
+                self._remember(source_id, target_id)
+            future.set_result(mapping)
+
+
+
+
+    @staticmethod
+    def _translate_sub_request(chunk: List[str]) -> Dict[str, Any]:
+        # One translateExchangeIds call as a JSON batch sub-request
+        return {
+            "method": "POST",
+            "url": "/me/translateExchangeIds",
+            "headers": {"Content-Type": "application/json"},
+            "body": {"inputIds": chunk, "sourceIdType": "restId", "targetIdType": "restImmutableEntryId"}
+        }
+
+
+    def _split_cached(self, input_ids: List[str]) -> Tuple[Dict[str, str], List[str]]:
+        # Serve what we can from the cache, returning the translations found and the IDs still missing
+        translated = {}
+        missing_ids = []
+        for input_id in input_ids:
+            if input_id in self._id_cache:
+                self._id_cache.move_to_end(input_id)
+                translated[input_id] = self._id_cache[input_id]
+            else:
+                missing_ids.append(input_id)
+        return translated, missing_ids
+
+
+    def _remember(self, source_id: str, target_id: str) -> None:
+        # Store a translation, evicting the least recently used one when the cache is full
+        self._id_cache[source_id] = target_id
+        self._id_cache.move_to_end(source_id)
+        if len(self._id_cache) > self.CACHE_MAX_SIZE:
+            self._id_cache.popitem(last=False)
+
+
+    def _forget(self, source_ids: List[str]) -> None:
+        # Drop cached translations for IDs that Graph refused to translate
+        for source_id in source_ids:
+            self._id_cache.pop(source_id, None)
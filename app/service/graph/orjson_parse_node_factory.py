@@ -0,0 +1,46 @@
+# Third party imports
+import orjson
+from kiota_abstractions.api_client_builder import (
+    enable_backing_store_for_parse_node_registry,
+    register_default_deserializer,
+)
+from kiota_abstractions.serialization import ParseNode, ParseNodeFactoryRegistry
+from kiota_serialization_json.json_parse_node import JsonParseNode
+from kiota_serialization_json.json_parse_node_factory import JsonParseNodeFactory
+
+
+"""
+SUMMARY:
+
+Drop in replacement for the SDK's JSON parse node factory. Every Graph response is decoded
+by the factory before the SDK hydrates its models from it; the stock one goes through the
+standard library json module, this one decodes the raw bytes with orjson. Large folder and
+message pages spend a good share of their time there.
+"""
+class OrjsonParseNodeFactory(JsonParseNodeFactory):
+
+    def get_root_parse_node(self, content_type: str, content: bytes) -> ParseNode:
+        """
+        Same contract as JsonParseNodeFactory.get_root_parse_node, decoding with orjson.
+        """
+        if not content_type:
+            raise TypeError("Content Type cannot be null")
+        valid_content_type = self.get_valid_content_type()
+        if valid_content_type.casefold() != content_type.casefold():
+            raise TypeError(f"Expected {valid_content_type} as content type")
+        if not content:
+            raise TypeError("Content cannot be null")
+        return JsonParseNode(orjson.loads(content))
+
+
+    @classmethod
+    def register(cls) -> None:
+        """
+        Register the factory for application/json in place of the stock one.
+
+        GraphServiceClient registers the stock factories every time one is constructed, so this is
+        called right after each construction. The registry's factories are then wrapped for the
+        backing store again, as the SDK does for every factory it registers.
+        """
+        register_default_deserializer(cls)
+        enable_backing_store_for_parse_node_registry(ParseNodeFactoryRegistry())
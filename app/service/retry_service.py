@@ -1,9 +1,10 @@
 # Python standard library imports
 import asyncio
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import logging
 import random
-import time
-from typing import TypeVar
+from typing import Optional, TypeVar
 
 # Third party imports
 from kiota_abstractions.api_error import APIError
@@ -13,6 +14,8 @@ from sqlalchemy.exc import IntegrityError
 from app.models.retries.retry_context import RetryContext
 from app.models.retries.retry_enums import RetryConfigurations, RetryProfile
 
+logger = logging.getLogger(__name__)
+
 
 
 """
@@ -26,26 +29,68 @@ It is designed with a catch all exception block to make it widely usable.
 T = TypeVar('T')
 
 class RetryService:
+    JITTER_RATIO = 0.1  # delays vary by up to this fraction either way, so concurrent retries spread out
+    THROTTLE_STATUS_CODES = (429, 503)  # Graph's throttling statuses, these come with a Retry-After
+
     def __init__(self, retry_profile: RetryProfile = RetryProfile.STANDARD):
         config = RetryConfigurations.get_config(retry_profile)
         self.max_retries = config.max_retries
         self.retry_delay = config.base_delay
         self.max_timeout = config.max_timeout
-        self.logger = logging.getLogger(__name__)
+        self.max_delay = config.max_delay
+        self.logger = logger
+        # Own generator per service, jitter draws don't share the module level random state
+        self._rng = random.Random() # nosec B311 # jitter only, not used for secrets
 
 
 
 
-    def _calculate_delay(self, attempt: int) -> float:
-        """Calculate the delay for the current retry attempt using exponential backoff with jitter."""
-        delay = self.retry_delay * (2 ** attempt)
-        jitter = delay * 0.1
-        delay += random.uniform(-jitter, jitter) # nosec B311 # this is needed...we aren't using this for secrets, Gitlab CI will fail if not 
+    def _calculate_delay(self, attempt: int, exception: Optional[Exception] = None) -> float:
+        """
+        Calculate the delay for the current retry attempt using exponential backoff with jitter.
+        When the exception says how long the server wants us to wait, that wins instead,
+        capped at max_delay like our own backoff.
+        """
+        retry_after = self._retry_after(exception) if exception is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        delay = min(self.retry_delay * (2 ** attempt), self.max_delay)
+        jitter = delay * self.JITTER_RATIO
+        delay += self._rng.uniform(-jitter, jitter) # nosec B311 # this is needed...we aren't using this for secrets, Gitlab CI will fail if not 
         return max(0, delay)  # Ensure delay is never negative
 
 
 
 
+    @staticmethod
+    def _retry_after(exception: Exception) -> Optional[float]:
+        """
+        Read the server's Retry-After from an exception, in seconds. Our own exceptions carry
+        it as retry_after, SDK errors as a Retry-After response header, either delta seconds
+        or an HTTP date. Never negative, None when there is nothing usable.
+        """
+        retry_after = getattr(exception, "retry_after", None)
+        if retry_after is not None:
+            return max(0.0, float(retry_after))
+
+        headers = getattr(exception, "response_headers", None) or {}
+        header = headers.get("Retry-After") or headers.get("retry-after")
+        if isinstance(header, (list, tuple, set)):
+            header = next(iter(header), None)
+        if not header:
+            return None
+        header = str(header).strip()
+        if header.isdigit():
+            return float(header)
+        try:
+            retry_at = parsedate_to_datetime(header)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+
+
     async def retry_operation(self, context: RetryContext) -> T:
         """
         Generic retry mechanism with exponential backoff.
@@ -59,16 +104,17 @@ class RetryService:
         Raises:
             Exception: If operation fails after all retries
         """
-        start_time = time.time()
+        # The loop's monotonic clock, wall clock jumps can't cut the timeout short or stretch it
+        clock = asyncio.get_running_loop().time
+        start_time = clock()
         self.logger.info("Starting retry operation for %s", context.operation.__name__)
-        abort_exceptions = [APIError, IntegrityError]
-        if context.abort_on_exceptions:
-            abort_exceptions.extend(context.abort_on_exceptions)
-        context.abort_on_exceptions = abort_exceptions
+        # A tuple, so the check below is a single isinstance call. Built locally, the context
+        # isn't mutated and can be reused without its abort list growing
+        abort_exceptions = (APIError, IntegrityError, *(context.abort_on_exceptions or ()))
         
         for attempt in range(self.max_retries):
             try:
-                if self.max_timeout and time.time() - start_time > self.max_timeout:
+                if self.max_timeout and clock() - start_time > self.max_timeout:
                     self.logger.info("Operation exceeded maximum timeout of %s seconds", self.max_timeout)
                     raise TimeoutError(
                         f"Operation exceeded maximum timeout of {self.max_timeout} seconds"
@@ -79,10 +125,14 @@ class RetryService:
                 return result
 
             except Exception as e: # pylint: disable=W0718
+                # A throttled Graph call is worth another attempt once the server's Retry-After has passed
+                throttled = (
+                    context.respect_retry_after
+                    and isinstance(e, APIError)
+                    and getattr(e, "response_status_code", None) in self.THROTTLE_STATUS_CODES
+                )
                 # Check if this exception type should abort retries
-                if context.abort_on_exceptions and any(
-                    isinstance(e, abort_type) for abort_type in context.abort_on_exceptions
-                ):
+                if isinstance(e, abort_exceptions) and not throttled:
                     self.logger.info(
                         "Aborting retries due to exception type %s: %s",
                         type(e).__name__, str(e)
@@ -101,7 +151,18 @@ class RetryService:
                     self.logger.error("Operation failed after %d attempts: %s", self.max_retries, str(e))
                     raise e
                     
-                delay = self._calculate_delay(attempt)
+                # When the server told us how long to back off, trust it over our own formula
+                delay = self._calculate_delay(attempt, e if context.respect_retry_after else None)
+                # No point waiting out a delay that ends past the timeout, fail with the real error now
+                if self.max_timeout and clock() - start_time + delay > self.max_timeout:
+                    if context.error_recorder:
+                        context.error_recorder()
+                    self.logger.error("%s: %s", context.error_msg, str(e))
+                    self.logger.error(
+                        "Retry in %.2f seconds would exceed the maximum timeout of %s seconds: %s",
+                        delay, self.max_timeout, str(e)
+                    )
+                    raise e
                 self.logger.warning(
                     "Attempt %d failed, retrying in %.2f seconds: %s",
                     attempt + 1, delay, str(e)
@@ -1,9 +1,12 @@
 # Python standard library imports
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+import heapq
 import logging
 import time
 from dataclasses import dataclass
 
+logger = logging.getLogger(__name__)
+
 @dataclass
 class SessionData:
     order_id: str
@@ -14,41 +17,51 @@ class SessionStore:
     
     def __init__(self, expiry_seconds: int = 300):  # 5 minute default expiry
         self._sessions: Dict[str, SessionData] = {}
+        # (expiry time, state) min-heap, entries for replaced or removed sessions are skipped lazily
+        self._expiry_heap: List[Tuple[float, str]] = []
         self._expiry_seconds = expiry_seconds
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
 
     def store_order_id(self, state: str, order_id: str) -> None:
         """Store order ID with state as key"""
-        self.logger.info("Storing order ID: %s for state: %s", order_id, state)
+        self.logger.debug("Storing order ID: %s for state: %s", order_id, state)
         self._cleanup_expired()
+        timestamp = time.time()
         self._sessions[state] = SessionData(
             order_id=order_id,
-            timestamp=time.time()
+            timestamp=timestamp
         )
+        heapq.heappush(self._expiry_heap, (timestamp + self._expiry_seconds, state))
             
     def get_order_id(self, state: str) -> Optional[str]:
         """Retrieve order ID for given state"""
-        self.logger.info("Getting order ID for state: %s", state)
+        self.logger.debug("Getting order ID for state: %s", state)
         self._cleanup_expired()
         if state in self._sessions:
-            self.logger.info("Order ID found for state: %s", state)
+            self.logger.debug("Order ID found for state: %s", state)
             return self._sessions[state].order_id
-        self.logger.info("No order ID found for state: %s", state)
+        self.logger.debug("No order ID found for state: %s", state)
         return None
             
     def remove_session(self, state: str) -> None:
         """Remove a session after it's been used"""
-        self.logger.info("Removing session for state: %s", state)
+        self.logger.debug("Removing session for state: %s", state)
         self._sessions.pop(state, None)
             
     def _cleanup_expired(self) -> None:
-        """Remove expired sessions"""
-        self.logger.info("Cleaning up expired sessions")
+        """
+        Remove expired sessions. Only heap entries that are due are looked at, so
+        the common case, nothing expired, is a single comparison.
+        """
         current_time = time.time()
-        expired = [
-            state for state, data in self._sessions.items()
-            if current_time - data.timestamp > self._expiry_seconds
-        ]
-        for state in expired:
-            self.logger.info("Removing expired session for state: %s", state)
-            self._sessions.pop(state)
\ No newline at end of file
+        heap = self._expiry_heap
+        removed = 0
+        while heap and heap[0][0] < current_time:
+            _, state = heapq.heappop(heap)
+            data = self._sessions.get(state)
+            # The session may have been removed, or stored again with a later expiry
+            if data is not None and current_time - data.timestamp > self._expiry_seconds:
+                self._sessions.pop(state)
+                removed += 1
+        if removed:
+            self.logger.debug("Removed %d expired sessions", removed)
\ No newline at end of file
@@ -0,0 +1,25 @@
+# Python standard library imports
+from typing import Optional
+
+"""
+SUMMARY:
+This class serves as a utility class for asyncio helpers shared by the services, such as
+unwrapping the exception groups raised by task groups.
+"""
+class AsyncUtils:
+
+    @staticmethod
+    def unwrap_exception_group(error: Optional[BaseException]) -> Optional[BaseException]:
+        """
+        Unwrap (nested) exception groups down to the first exception they hold, so callers
+        can still handle a task group failure by type.
+
+        Args:
+            error: The exception raised by a task group, or any other exception or None
+
+        Returns:
+            Optional[BaseException]: The first wrapped exception, or error itself when it isn't a group
+        """
+        while isinstance(error, BaseExceptionGroup):
+            error = error.exceptions[0]
+        return error
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class EmailConstants:
+    """
+    Constants for fetching messages from the Graph API.
+    """
+    # Message fields needed to build our Email model
+    MESSAGE_SELECT_FIELDS = (
+        'bccRecipients', 'body', 'ccRecipients', 'conversationId',
+        'from', 'hasAttachments', 'id', 'isRead', 'receivedDateTime',
+        'subject', 'toRecipients'
+    )
+    MESSAGE_EXPAND_FIELDS = ('attachments',)
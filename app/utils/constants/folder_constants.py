@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class FolderConstants:
+    """
+    Constants for fetching mail folders from the Graph API.
+    """
+    # Folder fields needed to build our Folder model
+    FOLDER_SELECT_FIELDS = (
+        'childFolderCount', 'displayName', 'id', 'isHidden',
+        'parentFolderId', 'totalItemCount', 'unreadItemCount'
+    )
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class GraphConstants:
+    """
+    Constants for calling the Graph API directly, outside of the SDK's request builders.
+    """
+    # JSON batching, Graph accepts at most 20 requests per batch
+    BATCH_URL = "https://graph.microsoft.com/v1.0/$batch"
+    BATCH_MAX_REQUESTS = 20
+    # Sub-request statuses worth retrying, the rest of the batch succeeded
+    RETRYABLE_STATUS_CODES = (429, 503, 504)
@@ -1,7 +1,7 @@
 # Python standard library imports
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
-from typing import List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 # Application imports
 # Error handling
@@ -23,7 +23,8 @@ class EmailUtils:
     def email_to_db_email(
         email: Email, 
         selection: EmailSelectionDTO,
-        immutable_id: str) -> DBEmail:
+        immutable_id: str,
+        created_date: Optional[datetime] = None) -> DBEmail:
         """
         Convert Email model to DBEmail model.
         
@@ -31,6 +32,7 @@ class EmailUtils:
             email: Email model instance
             selection: Selection parameters including reference info
             immutable_id: Translated immutable ID
+            created_date: Timestamp for the created_date column, defaults to now (UTC)
             
         Returns:
             DBEmail: Converted database email object
@@ -47,7 +49,7 @@ class EmailUtils:
                 body=email.body or "",
                 email_date=email.received_date,
                 created_by=selection.created_by,
-                created_date=datetime.utcnow(),
+                created_date=created_date or EmailUtils._utc_now(),
                 graph_message_id=immutable_id,
                 graph_source_id=email.source_id,
                 graph_conversation_id=email.conversation_id,
@@ -60,35 +62,93 @@ class EmailUtils:
 
 
 
+    @staticmethod
+    def email_to_db_email_batch(
+        emails: List[Email],
+        selection: EmailSelectionDTO,
+        immutable_ids: List[str]) -> List[DBEmail]:
+        """
+        Convert Email models to DBEmail models with email_to_db_email for each pair of email
+        and immutable ID. Every row of a batch shares the same created_date.
+        
+        Args:
+            emails: Email model instances
+            selection: Selection parameters including reference info
+            immutable_ids: Translated immutable IDs, in the same order as emails
+            
+        Returns:
+            List[DBEmail]: Converted database email objects
+
+        Raises:
+            DBEmailException if there are any issues converting
+        """
+        now = EmailUtils._utc_now()
+        return [
+            EmailUtils.email_to_db_email(email, selection, immutable_id, now)
+            for email, immutable_id in zip(emails, immutable_ids)
+        ]
+
+
+
+    @staticmethod
+    def _utc_now() -> datetime:
+        # Naive UTC, like the column and the old datetime.utcnow(), without the deprecated call
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+
     @staticmethod
     def email_to_db_email_recursive(email: Email, request) -> DBEmail:
         """
-        Convert an Email model to a DBEmail model for recursive email processing.
+        Convert an Email model to a DBEmail model for recursive email processing, built
+        from the same columns as email_to_rows_recursive.
         
         Args:
             email (Email): The email object to convert
             request (RecursiveEmailRequestDTO): The request containing reference information
         """
         try:
-            return DBEmail(
-            ref_id=request.ref_id,
-            ref_type=request.ref_type,
-            from_addr=email.sender,
-            subject=email.subject,
-            body=email.body,
-            email_date=email.received_date,
-            created_by=request.created_by,
-            graph_message_id=email.source_id,
-            graph_source_id=email.source_id,
-            graph_conversation_id=email.conversation_id,
-            is_read=email.is_read,
-            has_attachments=email.has_attachments
-            )
+            return DBEmail(**EmailUtils.email_to_rows_recursive((email,), request)[0])
         except (TypeError, ValueError) as e:
             logger.error("Validation error when creating the DBEmail model: %s", e)
             raise DBEmailException("Failed to create DBEmail due to a validation error", email.source_id, email.source_id) from e
 
 
+
+    @staticmethod
+    def email_to_rows_recursive(emails: Iterable[Email], request) -> List[Dict[str, Any]]:
+        """
+        Convert a batch of Email models to plain DBEmail rows for recursive email processing.
+        Skips building ORM instances since the recursive path inserts rows in bulk, and reads
+        the request's reference fields once for the whole batch.
+        
+        Args:
+            emails (Iterable[Email]): The email objects to convert
+            request (RecursiveEmailRequestDTO): The request containing reference information
+
+        Returns:
+            List[Dict[str, Any]]: Column values keyed by DBEmail column name, one per email
+        """
+        ref_id, ref_type, created_by = request.ref_id, request.ref_type, request.created_by
+        return [
+            {
+                "ref_id": ref_id,
+                "ref_type": ref_type,
+                "from_addr": email.sender,
+                "subject": email.subject,
+                "body": email.body,
+                "email_date": email.received_date,
+                "created_by": created_by,
+                "graph_message_id": email.source_id,
+                "graph_source_id": email.source_id,
+                "graph_conversation_id": email.conversation_id,
+                "is_read": email.is_read,
+                "has_attachments": email.has_attachments
+            }
+            for email in emails
+        ]
+
+
     @staticmethod
     def extract_recipients_from_email(email: Email, email_id: int) -> List[DBEmailRecipient]:
         """
@@ -102,39 +162,14 @@ class EmailUtils:
             List[DBEmailRecipient]: A list of DBEmailRecipient objects containing recipient information
         """
         try:
-            recipients = []
-            
-            # TO recipients
-            if email.receivers:
-                recipients.extend([
-                    DBEmailRecipient(
-                        email_id=email_id,
-                        email_address=addr,
-                        recipient_type=RecipientType.TO
-                    ) for addr in email.receivers
-                ])
-
-            # CC recipients
-            if email.cc:
-                recipients.extend([
-                    DBEmailRecipient(
-                        email_id=email_id,
-                        email_address=addr,
-                        recipient_type=RecipientType.CC
-                    ) for addr in email.cc
-                ])
-
-            # BCC recipients
-            if email.bcc:
-                recipients.extend([
-                    DBEmailRecipient(
-                        email_id=email_id,
-                        email_address=addr,
-                        recipient_type=RecipientType.BCC
-                    ) for addr in email.bcc
-                ])
-
-            return recipients
+            return [
+                DBEmailRecipient(
+                    email_id=email_id,
+                    email_address=addr,
+                    recipient_type=recipient_type
+                )
+                for recipient_type, addr in EmailUtils._recipients(email)
+            ]
         except (TypeError, ValueError) as e:
             logger.error("Validation error when extracting recipients from email: %s", e)
             raise DBEmailRecipientException("Failed to extract recipients from email due to a validation error", email.source_id) from e
@@ -159,17 +194,68 @@ class EmailUtils:
         4. Returns a combined list of all recipients as DBEmailRecipient objects
         """
         logger.info("Extracting recipients from initial graph response email objects")
-        db_email_map = {db_email.graph_source_id: db_email for db_email in successful_emails}
-
         all_recipients = []
-        for init_response_email in init_response_emails:
-            if init_response_email.source_id in db_email_map:
-                db_email = db_email_map[init_response_email.source_id]
-                recipients = EmailUtils.extract_recipients_from_email(init_response_email, db_email.email_id)
-                all_recipients.extend(recipients)
+        for init_response_email, email_id in EmailUtils._match_persisted(init_response_emails, successful_emails):
+            all_recipients.extend(EmailUtils.extract_recipients_from_email(init_response_email, email_id))
 
         return all_recipients
 
+
+    @staticmethod
+    def recipient_rows_from_email(email: Email, email_id: int) -> List[Dict[str, Any]]:
+        """
+        Same as extract_recipients_from_email, but as plain DBEmailRecipient rows for bulk inserts.
+        
+        Args:
+            email (Email): The email object containing recipient information
+            email_id (int): The ID of the email in the database
+            
+        Returns:
+            List[Dict[str, Any]]: Column values keyed by DBEmailRecipient column name
+        """
+        return [
+            {"email_id": email_id, "email_address": addr, "recipient_type": recipient_type}
+            for recipient_type, addr in EmailUtils._recipients(email)
+        ]
+
+
+    @staticmethod
+    def _recipients(email: Email) -> Iterator[Tuple[RecipientType, str]]:
+        # One pass over the TO, CC and BCC lists, empty groups fall out of the inner loop
+        groups = (
+            (RecipientType.TO, email.receivers),
+            (RecipientType.CC, email.cc),
+            (RecipientType.BCC, email.bcc)
+        )
+        for recipient_type, addresses in groups:
+            for addr in addresses or ():
+                yield recipient_type, addr
+
+
+    @staticmethod
+    def recipient_rows_from_init_response_emails(init_response_emails: Iterable[Email], successful_emails: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        Same as extract_recipients_from_init_response_emails, but as plain DBEmailRecipient rows
+        for bulk inserts. successful_emails only need email_id and graph_source_id, so the key
+        rows returned by EmailRepository.bulk_insert_rows work as well as DBEmail objects.
+        """
+        logger.debug("Extracting recipient rows from initial graph response email objects")
+        rows = []
+        for init_response_email, email_id in EmailUtils._match_persisted(init_response_emails, successful_emails):
+            rows.extend(EmailUtils.recipient_rows_from_email(init_response_email, email_id))
+        return rows
+
+
+    @staticmethod
+    def _match_persisted(init_response_emails: Iterable[Email], successful_emails: Iterable[Any]) -> Iterator[Tuple[Email, int]]:
+        # Pair each graph email with the database ID it was persisted under, skipping the rest
+        db_email_map = {db_email.graph_source_id: db_email for db_email in successful_emails}
+        for init_response_email in init_response_emails:
+            # One lookup per email, emails that weren't persisted are skipped
+            db_email = db_email_map.get(init_response_email.source_id)
+            if db_email is not None:
+                yield init_response_email, db_email.email_id
+
     @staticmethod
     def extract_email_ids_from_results(successful_emails, duplicate_emails, failed_emails):
         """
@@ -1,9 +1,15 @@
 # Python standard library imports
 import logging
-from typing import Any, List, Type, TypeVar
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+# Third party imports
+import orjson
+from kiota_abstractions.method import Method
+from kiota_abstractions.request_information import RequestInformation
 
 # Application imports 
 from app.error_handling.exceptions.graph_response_exception import GraphResponseException
+from app.utils.constants.graph_constants import GraphConstants
 
 T = TypeVar("T")
 logger = logging.getLogger(__name__)
@@ -30,26 +36,75 @@ class GraphUtils:
         Raises:
             GraphResponseException: If response is invalid or wrong type
         """
-        match response:
-            case _ if not response:
-                logger.info("Graph response is empty or invalid. \nRESPONSE: %s", str(response))
-                raise GraphResponseException(
-                    detail=f"Response is empty or invalid.\nRESPONSE: {response}",
-                    response_type=type(response).__name__,
-                    status_code=500
-                )
-            case _ if not isinstance(response, expected_type):
-                logger.info("Graph response type is invalid. Expected: %s Actual: %s", str(expected_type), str(response))
-                raise GraphResponseException(
-                    detail=f"Invalid response type - expected {expected_type.__name__}",
-                    response_type=type(response).__name__,
-                    status_code=500,
-                )
-            case _ if getattr(response, "value", None) is None:
-                logger.info("Graph response value key is missing, uh oh. \nRESPONSE: %s", str(response))
-                raise GraphResponseException(
-                    detail="Response missing 'value' property",
-                    status_code=500
-                )
-            case _:
-                return response.value
+        # Plain branches, the success path is the common one and falls straight through.
+        # Responses are passed to the logger as is, it only renders them when INFO logging is on
+        if not response:
+            logger.info("Graph response is empty or invalid. \nRESPONSE: %s", response)
+            raise GraphResponseException(
+                detail=f"Response is empty or invalid.\nRESPONSE: {response}",
+                response_type=type(response).__name__,
+                status_code=500
+            )
+        if not isinstance(response, expected_type):
+            logger.info("Graph response type is invalid. Expected: %s Actual: %s", expected_type, response)
+            raise GraphResponseException(
+                detail=f"Invalid response type - expected {expected_type.__name__}",
+                response_type=type(response).__name__,
+                status_code=500,
+            )
+        value = getattr(response, "value", None)
+        if value is None:
+            logger.info("Graph response value key is missing, uh oh. \nRESPONSE: %s", response)
+            raise GraphResponseException(
+                detail="Response missing 'value' property",
+                status_code=500
+            )
+        return value
+
+
+    @staticmethod
+    def escape_odata_string(value: str) -> str:
+        """
+        Escape a value for use inside a single quoted OData string literal.
+        OData escapes a single quote by doubling it.
+
+        Args:
+            value: The raw value, e.g. user input
+
+        Returns:
+            str: The value, safe to embed between single quotes in a $filter
+        """
+        return value.replace("'", "''")
+
+
+    @staticmethod
+    async def send_json_batch(client: Any, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send up to 20 Graph requests in a single JSON batch request. The batch goes through
+        the client's request adapter, so auth and the Graph middleware still apply.
+
+        Args:
+            client: The authenticated GraphServiceClient
+            requests: Batch sub-requests (method, url and optionally headers and body),
+                their "id" is assigned here from their position
+
+        Returns:
+            List[Dict[str, Any]]: The sub-responses (status, headers, body), in request order
+        """
+        body = {"requests": [{**request, "id": str(index)} for index, request in enumerate(requests)]}
+        request_info = RequestInformation()
+        request_info.http_method = Method.POST
+        request_info.url = GraphConstants.BATCH_URL
+        request_info.headers.try_add("Content-Type", "application/json")
+        request_info.content = orjson.dumps(body)
+
+        raw = await client.request_adapter.send_primitive_async(request_info, "bytes", None)
+        # Graph may answer sub-requests out of order
+        return sorted(orjson.loads(raw)["responses"], key=lambda response: int(response["id"]))
+
+
+    @staticmethod
+    def retry_after_seconds(response: Dict[str, Any]) -> Optional[int]:
+        """Read a batch sub-response's Retry-After header, in seconds, or None without one."""
+        header = (response.get("headers") or {}).get("Retry-After")
+        return int(header) if header and header.isdigit() else None
@@ -0,0 +1,11 @@
+# Third party imports
+import pytest
+
+# Application imports
+from app.logging.logging_config import setup_logging
+
+
+# Configure logging once for the whole session instead of inside each test.
+@pytest.fixture(scope="session", autouse=True)
+def _logging():
+    setup_logging()
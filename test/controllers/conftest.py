@@ -0,0 +1,32 @@
+# Third party imports
+import pytest
+import sse_starlette.sse
+from fastapi import Request
+from sse_starlette.sse import EventSourceResponse
+
+# Application imports
+from app.controllers.fAPI_dependencies.auth_dependency import AuthDependency
+
+
+# Create dummy classes to patch AppStatus.
+class DummyEvent:
+    async def wait(self):
+        return
+
+class DummyAppStatus:
+    should_exit_event = DummyEvent()
+    @property
+    def should_exit(self):
+        return False
+
+# Patch the auth dependency and the AppStatus once for the session. SSE reads app status, we need it.
+# The ping interval is pushed out of reach so no keepalive frame fires during a test.
+@pytest.fixture(scope="session")
+def _patch_auth_and_appstatus(session_mocker):
+    # FastAPI reads the dependency's signature, so the stand-in keeps the real one.
+    async def _noop(self, request: Request): # pylint: disable=unused-argument
+        return None
+    session_mocker.patch.object(AuthDependency, "__call__", new=_noop)
+    session_mocker.patch.object(sse_starlette.sse, "AppStatus", new=DummyAppStatus())
+    session_mocker.patch.object(EventSourceResponse, "DEFAULT_PING_INTERVAL", new=10**9)
+    yield
@@ -1,8 +1,11 @@
 # Python standard library imports
-import json
-from unittest.mock import AsyncMock, MagicMock, patch
+import logging
+import re
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
 # Third party imports
+import orjson
 import pytest
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
@@ -26,6 +29,12 @@ from app.error_handling.exceptions.graph_response_exception import GraphResponse
 from app.error_handling.exceptions.id_translation_exception import IdTranslationException
 from app.error_handling.exceptions.recursive_email_exception import RecursiveEmailException
 
+# Keep every case on one xdist worker so they share the module-scoped client,
+# run with: pytest -n auto --dist loadgroup test/controllers/
+pytestmark = pytest.mark.xdist_group("sse_errors")
+
+logger = logging.getLogger(__name__)
+
 # Update VALID_PAYLOAD to include all required fields.
 VALID_PAYLOAD = {
     "ref_type": "test",
@@ -34,86 +43,145 @@ VALID_PAYLOAD = {
     "test": "dummy"  # added required field
 }
 
-# Helper: creates an async generator that always raises the given exception.
-def make_failing_generator(exception_instance):
-    async def failing_generator(folder_id, email_request): # pylint: disable=unused-argument
-        raise exception_instance
-        yield # pylint: disable=unreachable # dummy yield to mark this as an async generator
-    return failing_generator
+# Plain stand-ins for the graph and the recursive email service, the controller only
+# calls ensure_authenticated and get_all_emails_recursively on them.
+_AUTH_OK = {"authenticated": True, "auth_url": None}
 
-# Create dummy classes to patch AppStatus.
-class DummyEvent:
-    async def wait(self):
-        return
+class _StubGraph:
+    async def ensure_authenticated(self):
+        return _AUTH_OK
 
-class DummyAppStatus:
-    should_exit_event = DummyEvent()
-    @property
-    def should_exit(self):
-        return False
+# The app runs on the client's portal thread, so the exception for each case is handed over
+# on the service itself rather than through a context variable.
+class _StubService:
+    exc: BaseException
+
+    # One async generator for every case, it always raises the exception set on the service.
+    async def get_all_emails_recursively(self, folder_id, email_request): # pylint: disable=unused-argument
+        raise self.exc
+        yield # pylint: disable=unreachable # dummy yield to mark this as an async generator
 
-# Parameterize with different exception instances and expected message substrings.
+# A dummy response to simulate what a mocked exception handler returns, only its body is read.
+_DUMMY_BODY = b'{"detail":"Test error detail","type":"server_error"}'
+
+# Matches the payload of every complete "data:" line in a chunk of the raw SSE stream.
+_DATA_FRAME = re.compile(rb"^data:(.*?)\r?$", re.MULTILINE)
+
+# Read the raw stream in large chunks and return the first error payload, scanning only complete
+# lines and carrying any partial trailing line over to the next chunk.
+def first_streamed_error_event(response):
+    pending = b""
+    for chunk in response.iter_bytes(chunk_size=65536):
+        logger.debug("Raw chunk: %r", chunk)  # Debug: print each raw chunk from the stream.
+        buffer = pending + chunk
+        end = buffer.rfind(b"\n") + 1
+        pending = buffer[end:]
+        error_event = _first_error_payload(_DATA_FRAME.finditer(buffer, 0, end))
+        if error_event is not None:
+            return error_event
+
+    # Flush a last line the stream closed without terminating.
+    return _first_error_payload(_DATA_FRAME.finditer(pending))
+
+# Anything that doesn't open like a JSON object or array is skipped on its first byte,
+# so the decode needs no try/except around it.
+def _first_error_payload(frames):
+    for match in frames:
+        payload = match.group(1).lstrip()
+        if not payload or payload[0] not in b"{[":
+            continue
+        event_data = orjson.loads(payload)
+        if event_data.get("status") == "error":
+            return event_data
+    return None
+
+# Selects the real ExceptionHandlerManager or a mocked one, set indirectly by the parametrize below.
+@pytest.fixture(scope="module")
+def handler_mode(request):
+    return request.param
+
+# The real ExceptionHandlerManager, built once and shared by every test in the module.
+@pytest.fixture(scope="module")
+def exception_handler_manager():
+    return ExceptionHandlerManager()
+
+# One app and client per handler mode, only the raised exception changes per case.
+@pytest.fixture(scope="module")
+def sse_client(handler_mode, exception_handler_manager, _patch_auth_and_appstatus): # pylint: disable=redefined-outer-name
+    if handler_mode == "mocked":
+        # A mocked manager whose value error and global handlers return the dummy body.
+        manager = MagicMock()
+        dummy_response = SimpleNamespace(body=_DUMMY_BODY)
+        async def _dummy_handler(request, exc): # pylint: disable=unused-argument
+            return dummy_response
+        manager.handle_value_error = _dummy_handler
+        manager.handle_global_error = _dummy_handler
+    else:
+        # Reuse the module's real ExceptionHandlerManager.
+        manager = exception_handler_manager
+
+    # Stub the recursive email service, each case only sets the exception it should raise.
+    recursive_email_service = _StubService()
+
+    # Setup app and client, pinning the asyncio backend rather than leaving it to the client's default.
+    app = FastAPI()
+    app.include_router(recursive_email_controller(_StubGraph(), recursive_email_service, manager))
+
+    return TestClient(app, backend="asyncio"), recursive_email_service
+
+# Parameterize with the handler mode, exception factories and expected message substrings. The exceptions
+# are built inside the test, so collection stays cheap and no instance is shared between runs.
 @pytest.mark.parametrize(
-    "exception_instance, expected_message_substring",
+    "handler_mode, exception_factory, expected_message_substring",
     [
-        (APIError(message="Test API error", response_status_code=400), "Test API error"),
-        (AttachmentPersistenceException(detail="Test attachment persistence error"), "Test attachment persistence error"),
-        (AuthenticationFailedException(detail="Test auth error", status_code=401), "Test auth error"),
-        (DBEmailRecipientException("Test db email recipient error"), "Test db email recipient error"),
-        (EmailAttachmentException(detail="Test attachment error", attachment_id="att123"), "Test attachment error"),
-        (EmailPersistenceException(detail="Test email persistence error", message_ids=["msg1"]), "Test email persistence error"),
-        (FolderException("Test folder error", folder_id="folder1"), "Test folder error"),
-        (GraphResponseException(detail="Test graph response error", response_type="MessageCollectionResponse"), "Test graph response error"),
-        (IdTranslationException(detail="Test id translation error", source_ids=["id1"]), "Test id translation error"),
-        (NoResultFound("Test no result found error"), "Test no result found error"),
-        (RecursiveEmailException(detail="Test recursive email error", folder_id="folder2"), "Test recursive email error"),
-        (RequestValidationError([{"loc": ("body", "test"), "msg": "field required", "type": "value_error.missing"}]), "field required"),
-        (ValueError("Test value error occurred"), "Test value error occurred")
-    ]
+        ("real", lambda: APIError(message="Test API error", response_status_code=400), "Test API error"),
+        ("real", lambda: AttachmentPersistenceException(detail="Test attachment persistence error"), "Test attachment persistence error"),
+        ("real", lambda: AuthenticationFailedException(detail="Test auth error", status_code=401), "Test auth error"),
+        ("real", lambda: DBEmailRecipientException("Test db email recipient error"), "Test db email recipient error"),
+        ("real", lambda: EmailAttachmentException(detail="Test attachment error", attachment_id="att123"), "Test attachment error"),
+        ("real", lambda: EmailPersistenceException(detail="Test email persistence error", message_ids=["msg1"]), "Test email persistence error"),
+        ("real", lambda: FolderException("Test folder error", folder_id="folder1"), "Test folder error"),
+        ("real", lambda: GraphResponseException(detail="Test graph response error", response_type="MessageCollectionResponse"), "Test graph response error"),
+        ("real", lambda: IdTranslationException(detail="Test id translation error", source_ids=["id1"]), "Test id translation error"),
+        ("real", lambda: NoResultFound("Test no result found error"), "Test no result found error"),
+        ("real", lambda: RecursiveEmailException(detail="Test recursive email error", folder_id="folder2"), "Test recursive email error"),
+        ("real", lambda: RequestValidationError([{"loc": ("body", "test"), "msg": "field required", "type": "value_error.missing"}]), "field required"),
+        ("real", lambda: ValueError("Test value error occurred"), "Test value error occurred"),
+        # The mocked manager's handler response is what reaches the client, not the exception text
+        ("mocked", lambda: ValueError("Test error occurred"), "Test error detail")
+    ],
+    ids=[
+        "api_error", "attach_persist", "auth_failed", "db_recip", "email_attach", "email_persist", "folder",
+        "graph_resp", "id_trans", "no_result", "recursive", "req_validation", "value_error", "value_error_mocked"
+    ],
+    indirect=["handler_mode"]
 )
 
 
 
-def test_sse_error_handler_for_all_exceptions(exception_instance, expected_message_substring):
-    # Instantiate the real ExceptionHandlerManager.
-    manager = ExceptionHandlerManager()
-
-    # Create dependencies and services
-    graph = MagicMock()
-
-    # Mock the graph ensure_authenticated method.
-    graph.ensure_authenticated = AsyncMock(return_value={"authenticated": True, "auth_url": None})
-
-    # Mock the recursive email service. Make a service that always raises the given exception.
-    recursive_email_service = MagicMock()
-    recursive_email_service.get_all_emails_recursively = make_failing_generator(exception_instance)
-
-    # Test the endpoint, must mock the auth dependency and the AppStatus. SSE reads app status, we need it
-    with patch("app.controllers.fAPI_dependencies.auth_dependency.AuthDependency") as mock_auth_dependency,   \
-        patch("sse_starlette.sse.AppStatus", new=DummyAppStatus()):
-        mock_auth_instance = mock_auth_dependency.return_value
-        mock_auth_instance.__call__ = AsyncMock(return_value=None)
-
-        # Setup app and client
-        app = FastAPI()
-        app.include_router(recursive_email_controller(graph, recursive_email_service, manager))
-        
-        # Test the endpoint and collect events
-        events = []
-        client = TestClient(app)
-        with client.stream("POST", "/folder/test_folder/all_emails", json=VALID_PAYLOAD) as response:
-            for line in response.iter_lines():
-                if isinstance(line, bytes):
-                    line = line.decode("utf-8")
-                if line.startswith("data:"):
-                    try:
-                        events.append(json.loads(line[len("data:"):].strip()))
-                    except Exception as e: # pylint: disable=broad-exception-caught # we can ignore this in a test
-                        print("Error decoding line:", line, e)
-        
-        # Verify results
-        error_event = next((event for event in events if event.get("status") == "error"), None)
-        assert error_event is not None, f"No error event found for exception: {exception_instance}"
-        assert expected_message_substring in error_event.get("message", ""), (
-            f"Expected '{expected_message_substring}' in error message, got: {error_event.get('message')}"
-        )
+def test_sse_error_handler_for_all_exceptions( # pylint: disable=redefined-outer-name
+    sse_client,
+    handler_mode,
+    exception_factory,
+    expected_message_substring
+):
+    client, recursive_email_service = sse_client
+    exception_instance = exception_factory()
+
+    # Make the shared service raise the given exception.
+    recursive_email_service.exc = exception_instance
+
+    # Trigger the SSE endpoint, stopping at the first error frame.
+    with client.stream("POST", "/folder/test_folder/all_emails", json=VALID_PAYLOAD) as response:
+        error_event = first_streamed_error_event(response)
+
+    logger.info("Captured error event: %s", error_event)
+
+    # Verify results
+    assert error_event is not None, f"No error event found for exception: {exception_instance}"
+    assert expected_message_substring in error_event.get("message", ""), (
+        f"Expected '{expected_message_substring}' in error message, got: {error_event.get('message')}"
+    )
+    if handler_mode == "mocked":
+        assert error_event.get("message") == "Test error detail"
+        assert error_event.get("type") == "server_error"
@@ -0,0 +1,50 @@
+# Python standard library imports
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+# Third party imports
+import pytest
+from pydantic import ValidationError
+
+# Application imports
+from app.models.email import Email
+
+RECEIVED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+# Helper: the parts of a Graph SDK Message that Email reads, overridable per test.
+def make_message(**overrides):
+    fields = {
+        "id": "source-1",
+        "subject": "Hello",
+        "from_": SimpleNamespace(email_address=SimpleNamespace(name="Sender")),
+        "to_recipients": [SimpleNamespace(email_address=SimpleNamespace(name="To"))],
+        "cc_recipients": None,
+        "bcc_recipients": None,
+        "body": SimpleNamespace(content="<p>body</p>"),
+        "received_date_time": RECEIVED,
+        "conversation_id": "conversation-1",
+        "is_read": True,
+        "attachments": None,
+    }
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+
+
+def test_from_graph_message_maps_the_message():
+    email = Email.from_graph_message(make_message(), "immutable-1")
+
+    assert email.source_id == "source-1"
+    assert email.message_id == "immutable-1"
+    assert email.sender == "Sender"
+    assert email.receivers == ["To"]
+    assert email.received_date == RECEIVED
+    assert email.is_read is True
+
+
+@pytest.mark.parametrize("missing_field", ["received_date_time", "id"])
+def test_from_graph_message_rejects_a_message_missing_required_fields(missing_field):
+    with pytest.raises(ValidationError):
+        Email.from_graph_message(make_message(**{missing_field: None}), "immutable-1")
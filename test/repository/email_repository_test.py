@@ -0,0 +1,113 @@
+# Python standard library imports
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+# Third party imports
+import pymysql
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+# Application imports
+from app.error_handling.exceptions.email_persistence_exception import EmailPersistenceException
+# DBEmail's recipients relationship is resolved against this mapping once the first DBEmail is built
+from app.models.persistence_models.email_recipient_orm import DBEmailRecipient # pylint: disable=unused-import
+from app.repository import email_repository as email_repository_module
+from app.repository.email_repository import EmailRepository
+
+"""
+The database is replaced by a fake session handed out through get_db. Its first execute
+answers the duplicate lookup, its second is the bulk INSERT, so the assertions only depend
+on how the repository reacts to what the INSERT does.
+"""
+
+
+def make_row(message_id):
+    return {"graph_message_id": message_id, "graph_source_id": f"src-{message_id}", "subject": ""}
+
+
+def duplicate_entry_error():
+    return IntegrityError("INSERT", {}, pymysql.err.IntegrityError(1062, "Duplicate entry"))
+
+
+# Stand-in for an AsyncSession, records what the repository does with it.
+class _FakeSession:
+    def __init__(self, existing, insert_error=None):
+        self.existing = existing
+        self.insert_error = insert_error
+        self.calls = []
+
+    async def execute(self, statement, params=None): # pylint: disable=unused-argument
+        self.calls.append("execute")
+        if self.calls.count("execute") == 2 and self.insert_error:
+            raise self.insert_error
+        return SimpleNamespace(all=lambda: list(self.existing))
+
+    async def commit(self):
+        self.calls.append("commit")
+
+    async def rollback(self):
+        self.calls.append("rollback")
+
+@pytest.fixture
+def repository(monkeypatch):
+    email_repository = EmailRepository()
+    email_repository.open_sessions = 0
+    email_repository.sessions = []
+
+    def use_session(session):
+        @asynccontextmanager
+        async def get_db():
+            email_repository.sessions.append(session)
+            email_repository.open_sessions += 1
+            try:
+                yield session
+            finally:
+                email_repository.open_sessions -= 1
+        monkeypatch.setattr(email_repository_module, "get_db", get_db)
+    email_repository.use_session = use_session
+    return email_repository
+
+
+
+
+async def test_duplicate_during_insert_falls_back_outside_the_rolled_back_session(repository): # pylint: disable=redefined-outer-name
+    session = _FakeSession(existing=[], insert_error=duplicate_entry_error())
+    repository.use_session(session)
+    persisted = []
+
+    async def execute_persist(emails):
+        # The bulk insert's session is closed before the row by row path opens its own
+        assert repository.open_sessions == 0
+        persisted.extend(email.graph_message_id for email in emails)
+        return emails[:1], emails[1:], []
+    repository._execute_persist = execute_persist # pylint: disable=protected-access
+
+    successful, duplicates, failed = await repository.bulk_insert_rows([make_row("a"), make_row("b")])
+
+    assert session.calls == ["execute", "execute", "rollback"]
+    assert persisted == ["a", "b"]
+    assert [email.graph_message_id for email in successful] == ["a"]
+    assert [email.graph_message_id for email in duplicates] == ["b"]
+    assert not failed
+
+
+async def test_other_integrity_errors_are_wrapped_once(repository): # pylint: disable=redefined-outer-name
+    error = IntegrityError("INSERT", {}, pymysql.err.IntegrityError(1452, "Foreign key"))
+    repository.use_session(_FakeSession(existing=[], insert_error=error))
+
+    with pytest.raises(EmailPersistenceException) as exc_info:
+        await repository.bulk_insert_rows([make_row("a")])
+    assert exc_info.value.__cause__ is error
+
+
+async def test_all_failed_is_not_wrapped_twice(repository): # pylint: disable=redefined-outer-name
+    repository.use_session(_FakeSession(existing=[], insert_error=duplicate_entry_error()))
+
+    async def execute_persist(emails):
+        return [], [], emails
+    repository._execute_persist = execute_persist # pylint: disable=protected-access
+
+    with pytest.raises(EmailPersistenceException) as exc_info:
+        await repository.bulk_insert_rows([make_row("a")])
+    assert exc_info.value.detail == "Failed to persist some emails. 1 failures."
+    assert exc_info.value.__cause__ is None
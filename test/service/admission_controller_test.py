@@ -0,0 +1,159 @@
+# Python standard library imports
+import asyncio
+
+# Third party imports
+import pytest
+
+# Application imports
+from app.service.admission_controller import AdmissionController
+
+
+# Helper: start a task that enters the controller and holds its slot until release is set.
+def hold_slot(controller, release):
+    async def hold():
+        async with controller:
+            await release.wait()
+    return asyncio.create_task(hold())
+
+async def settle():
+    # Let every runnable task take its next step
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+
+
+def test_throttle_shrinks_the_limit_by_one_down_to_one():
+    controller = AdmissionController(3)
+
+    controller.record_throttle()
+    assert controller.limit == 2
+    controller.record_throttle()
+    controller.record_throttle()
+    assert controller.limit == 1
+
+
+def test_limit_grows_back_by_one_after_grow_after_successes():
+    controller = AdmissionController(3, grow_after=2)
+    controller.record_throttle()
+    controller.record_throttle()
+
+    controller.record_success()
+    assert controller.limit == 1
+    controller.record_success()
+    assert controller.limit == 2
+    controller.record_success()
+    controller.record_success()
+    assert controller.limit == 3
+
+    # Never past max_limit
+    controller.record_success()
+    controller.record_success()
+    assert controller.limit == 3
+
+
+def test_throttle_resets_the_success_run():
+    controller = AdmissionController(3, grow_after=2)
+    controller.record_throttle()
+    controller.record_success()
+
+    controller.record_throttle()
+    controller.record_success()
+
+    assert controller.limit == 1
+
+
+async def test_callers_past_the_limit_wait_for_a_release():
+    controller = AdmissionController(2)
+    release = asyncio.Event()
+    holders = [hold_slot(controller, release) for _ in range(3)]
+    await settle()
+
+    assert controller.active == 2
+    assert len(controller._waiters) == 1 # pylint: disable=protected-access
+
+    release.set()
+    await asyncio.gather(*holders)
+    assert controller.active == 0
+
+
+async def test_lowering_the_limit_holds_back_new_callers_only():
+    controller = AdmissionController(2)
+    release = asyncio.Event()
+    holders = [hold_slot(controller, release) for _ in range(2)]
+    await settle()
+
+    controller.record_throttle()
+    late = hold_slot(controller, release)
+    await settle()
+
+    # Both admitted calls keep running, the new one waits for the active count to drop below 1
+    assert controller.active == 2
+    assert not late.done()
+
+    release.set()
+    await asyncio.gather(*holders, late)
+    assert controller.active == 0
+
+
+async def test_raising_the_limit_wakes_waiters():
+    controller = AdmissionController(2)
+    controller.set_limit(1)
+    release = asyncio.Event()
+    holders = [hold_slot(controller, release) for _ in range(2)]
+    await settle()
+    assert controller.active == 1
+
+    controller.set_limit(2)
+    await settle()
+
+    assert controller.active == 2
+    release.set()
+    await asyncio.gather(*holders)
+
+
+async def test_cancelled_waiter_does_not_take_or_leak_a_slot():
+    controller = AdmissionController(1)
+    release = asyncio.Event()
+    holder = hold_slot(controller, release)
+    waiter = hold_slot(controller, release)
+    await settle()
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    release.set()
+    await holder
+    assert controller.active == 0
+    assert not controller._waiters # pylint: disable=protected-access
+
+
+async def test_cancelling_an_admitted_call_gives_its_slot_back():
+    controller = AdmissionController(1)
+    holder = hold_slot(controller, asyncio.Event())
+    await settle()
+    assert controller.active == 1
+
+    holder.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await holder
+
+    assert controller.active == 0
+
+
+async def test_wakeup_racing_a_cancel_is_passed_to_the_next_waiter():
+    controller = AdmissionController(1)
+    await controller.acquire()
+    first = asyncio.create_task(controller.acquire())
+    second = asyncio.create_task(controller.acquire())
+    await settle()
+
+    # The release wakes "first", which is cancelled before it gets to run
+    controller.release()
+    first.cancel()
+
+    await asyncio.gather(first, second, return_exceptions=True)
+    assert first.cancelled()
+    assert second.done() and not second.cancelled()
+    assert controller.active == 1
@@ -0,0 +1,212 @@
+# Python standard library imports
+from datetime import datetime, timezone
+
+# Third party imports
+import pytest
+
+# Application imports
+from app.models.email import Email
+from app.service.emails.email_cache_service import EmailCacheService
+
+RECEIVED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+# Helper: an email whose estimated cache size is exactly body_size bytes.
+def make_email(source_id, body_size=0):
+    return Email(
+        subject="",
+        sender="",
+        body="x" * body_size,
+        received_date=RECEIVED,
+        message_id=None,
+        source_id=source_id,
+    )
+
+# Helper: a paginated response holding the given emails, shaped like PaginatedEmailService builds it.
+def make_page(emails):
+    return {
+        "data": emails,
+        "elements_on_page": len(emails),
+        "total_elements": len(emails),
+        "total_pages": 1,
+    }
+
+@pytest.fixture(autouse=True)
+def _no_redis(monkeypatch):
+    # Without REDIS_URL the service runs with the local tier only
+    monkeypatch.delenv("REDIS_URL", raising=False)
+
+
+
+async def test_folder_cache_evicts_least_recently_used_past_max_bytes():
+    cache = EmailCacheService(max_bytes=250)
+
+    await cache.store_folder_emails("a", [make_email("a1", 100)])
+    await cache.store_folder_emails("b", [make_email("b1", 100)])
+    # Touch "a" so "b" becomes the least recently used folder
+    assert cache.get_cache_info("a") is not None
+    await cache.store_folder_emails("c", [make_email("c1", 100)])
+
+    assert list(cache.cache) == ["a", "c"]
+    assert cache.total_bytes == 200
+
+
+async def test_folder_cache_keeps_a_single_folder_over_budget():
+    cache = EmailCacheService(max_bytes=50)
+
+    await cache.store_folder_emails("a", [make_email("a1", 100)])
+
+    assert list(cache.cache) == ["a"]
+    assert cache.total_bytes == 100
+
+
+async def test_restoring_a_folder_replaces_its_size():
+    cache = EmailCacheService(max_bytes=1000)
+
+    await cache.store_folder_emails("a", [make_email("a1", 100)])
+    await cache.store_folder_emails("a", [make_email("a1", 30)])
+
+    assert cache.total_bytes == 30
+
+
+def test_page_cache_evicts_least_recently_used_past_page_max_bytes():
+    cache = EmailCacheService(page_max_bytes=250)
+
+    cache.store_folder_page("a", 1, 25, None, make_page([make_email("a1", 100)]))
+    cache.store_folder_page("a", 2, 25, None, make_page([make_email("a2", 100)]))
+    # Touch page 1 so page 2 becomes the least recently used page
+    assert cache.get_folder_page("a", 1, 25, None) is not None
+    cache.store_folder_page("b", 1, 25, None, make_page([make_email("b1", 100)]))
+
+    assert cache.get_folder_page("a", 2, 25, None) is None
+    assert cache.get_folder_page("a", 1, 25, None) is not None
+    assert cache.page_total_bytes == 200
+    assert cache.folder_pages == {"a": {("a", 1, 25, None)}, "b": {("b", 1, 25, None)}}
+
+
+def test_expired_page_is_dropped_on_read():
+    cache = EmailCacheService(page_cache_ttl=-1)
+
+    cache.store_folder_page("a", 1, 25, None, make_page([make_email("a1", 10)]))
+
+    assert cache.get_folder_page("a", 1, 25, None) is None
+    assert not cache.page_cache
+    assert not cache.folder_pages
+    assert cache.page_total_bytes == 0
+
+
+async def test_clear_folder_cache_only_drops_that_folders_pages():
+    cache = EmailCacheService()
+    await cache.store_folder_emails("a", [make_email("a1", 10)])
+    cache.store_folder_page("a", 1, 25, None, make_page([make_email("a1", 10)]))
+    cache.store_folder_page("a", 1, 25, "subject", make_page([make_email("a1", 10)]))
+    cache.store_folder_page("b", 1, 25, None, make_page([make_email("b1", 5)]))
+
+    cache.clear_folder_cache("a")
+
+    assert "a" not in cache.cache
+    assert list(cache.page_cache) == [("b", 1, 25, None)]
+    assert cache.folder_pages == {"b": {("b", 1, 25, None)}}
+    assert cache.page_total_bytes == 5
+
+
+async def test_top_up_keeps_the_time_of_the_full_download():
+    cache = EmailCacheService()
+    await cache.store_folder_emails("a", [make_email("a1")], complete=True)
+    cache.cache["a"].fetched_at -= 60
+    fetched_at = cache.cache["a"].fetched_at
+
+    await cache.add_folder_emails("a", [make_email("a2")])
+
+    assert set(cache.get_complete_folder_emails("a")) == {"a1", "a2"}
+    assert cache.cache["a"].fetched_at == fetched_at
+
+
+async def test_only_a_recent_full_download_is_complete():
+    cache = EmailCacheService(full_refresh_age=60)
+    await cache.store_folder_emails("a", [make_email("a1")])
+    await cache.store_folder_emails("b", [make_email("b1")], complete=True)
+    await cache.store_folder_emails("c", [make_email("c1")], complete=True)
+    cache.cache["c"].fetched_at -= 61
+
+    assert cache.get_complete_folder_emails("a") is None
+    assert set(cache.get_complete_folder_emails("b")) == {"b1"}
+    assert cache.get_complete_folder_emails("c") is None
+
+
+# Stand-in for the Redis L2 backend, keeps folders in a dict and records the calls made to it.
+class _StubL2Backend:
+    def __init__(self, folders=None):
+        self.folders = folders or {}
+        self.get_calls = []
+        self.set_calls = []
+
+    async def get_many(self, folder_id, source_ids):
+        self.get_calls.append((folder_id, list(source_ids)))
+        stored = self.folders.get(folder_id, {})
+        return {source_id: stored[source_id] for source_id in source_ids if source_id in stored}
+
+    async def set_many(self, folder_id, emails, ttl):
+        self.set_calls.append((folder_id, [email.source_id for email in emails], ttl))
+
+
+async def test_store_writes_through_to_l2_with_the_cache_ttl():
+    l2_backend = _StubL2Backend()
+    cache = EmailCacheService(cache_ttl=120, l2_backend=l2_backend)
+
+    await cache.store_folder_emails("a", [make_email("a1"), make_email("a2")])
+
+    assert l2_backend.set_calls == [("a", ["a1", "a2"], 120)]
+
+
+async def test_local_hit_does_not_touch_l2():
+    l2_backend = _StubL2Backend()
+    cache = EmailCacheService(l2_backend=l2_backend)
+    await cache.store_folder_emails("a", [make_email("a1"), make_email("a2")])
+
+    emails = await cache.get_emails_by_ids("a", ["a2", "a1"])
+
+    assert [email.source_id for email in emails] == ["a2", "a1"]
+    assert not l2_backend.get_calls
+
+
+async def test_local_miss_reads_l2_without_creating_a_folder_entry():
+    l2_backend = _StubL2Backend({"a": {"a1": make_email("a1"), "a2": make_email("a2")}})
+    cache = EmailCacheService(l2_backend=l2_backend)
+
+    emails = await cache.get_emails_by_ids("a", ["a2", "missing", "a1"])
+
+    # Selection order is kept and IDs found nowhere are left out
+    assert [email.source_id for email in emails] == ["a2", "a1"]
+    assert l2_backend.get_calls == [("a", ["a2", "missing", "a1"])]
+    # A few emails looked up by ID are not the folder, nothing is cached locally
+    assert "a" not in cache.cache
+
+
+async def test_l2_hits_leave_the_local_folder_entry_unchanged():
+    l2_backend = _StubL2Backend({"a": {"a2": make_email("a2")}})
+    cache = EmailCacheService(l2_backend=l2_backend)
+    await cache.store_folder_emails("a", [make_email("a1")], complete=True)
+    cached_map = cache.cache["a"].emails
+
+    await cache.get_emails_by_ids("a", ["a1", "a2"])
+
+    assert cache.cache["a"].emails is cached_map
+    assert set(cached_map) == {"a1"}
+
+
+async def test_partial_local_hit_only_asks_l2_for_the_missing_ids():
+    l2_backend = _StubL2Backend({"a": {"a2": make_email("a2")}})
+    cache = EmailCacheService(l2_backend=l2_backend)
+    await cache.store_folder_emails("a", [make_email("a1")])
+
+    emails = await cache.get_emails_by_ids("a", ["a1", "a2"])
+
+    assert [email.source_id for email in emails] == ["a1", "a2"]
+    assert l2_backend.get_calls == [("a", ["a2"])]
+
+
+async def test_miss_everywhere_returns_empty():
+    cache = EmailCacheService(l2_backend=_StubL2Backend())
+
+    assert await cache.get_emails_by_ids("a", ["a1"]) == []
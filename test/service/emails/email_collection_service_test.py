@@ -0,0 +1,175 @@
+# Python standard library imports
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Third party imports
+import pytest
+from kiota_abstractions.api_error import APIError
+
+# Application imports
+from app.error_handling.exceptions.email_exception import EmailException
+from app.service.emails.email_collection_service import EmailCollectionService
+
+"""
+The pipeline is driven with the Graph page fetch and the Email conversion replaced at the
+service boundary. Pages are lists of bare messages with an id, "emails" are (source_id, immutable_id)
+tuples, so the assertions only depend on how the stages hand work to each other.
+"""
+
+
+# Stand-in for the ID translator, maps every ID to "imm-<id>" and records the batches it was given.
+class _StubTranslator:
+    def __init__(self):
+        self.batches = []
+
+    async def translate_ids(self, ids):
+        self.batches.append(list(ids))
+        return [(source_id, f"imm-{source_id}") for source_id in ids]
+
+
+def make_pages(*page_sizes):
+    counter = iter(range(sum(page_sizes)))
+    return [[SimpleNamespace(id=f"m{next(counter)}") for _ in range(size)] for size in page_sizes]
+
+
+# Replace the Graph page fetch with one serving the given pages through next links "1", "2", ...
+def serve_pages(service, pages, before_page=None):
+    async def fetch_single_page(folder_id, messages_builder, page_num, metrics, # pylint: disable=unused-argument
+                                get_count=False, next_link=None, received_after=None):
+        index = int(next_link) if next_link else 0
+        if before_page:
+            await before_page(index)
+        link = str(index + 1) if index + 1 < len(pages) else None
+        return pages[index], (sum(map(len, pages)) if get_count else None), link
+    service._fetch_single_page = fetch_single_page # pylint: disable=protected-access
+
+
+@pytest.fixture
+def service():
+    collection_service = EmailCollectionService(MagicMock(), _StubTranslator())
+    collection_service.config['translation_batch_size'] = 2
+    collection_service.config['progress_interval'] = 0
+    collection_service.retry_service.max_retries = 1  # no backoff sleeps in the error cases
+    collection_service._build_emails = lambda messages, id_mapping: [ # pylint: disable=protected-access
+        (msg.id, id_mapping[msg.id]) for msg in messages if msg.id in id_mapping
+    ]
+    return collection_service
+
+
+async def collect(service, folder_id="folder"):
+    return [event async for event in service.get_all_emails_by_folder_id(folder_id)]
+
+
+
+
+async def test_every_message_is_emitted_once_in_message_order_within_its_batch(service): # pylint: disable=redefined-outer-name
+    serve_pages(service, make_pages(3, 2, 2))
+
+    events = await collect(service)
+
+    batches = [payload for kind, payload in events if kind == "emails"]
+    assert sorted(email for batch in batches for email in batch) == sorted(
+        (f"m{i}", f"imm-m{i}") for i in range(7)
+    )
+    for batch in batches:
+        assert batch == sorted(batch, key=lambda email: int(email[0][1:]))
+    assert sorted(map(len, service.graph_translator.batches)) == [1, 2, 2, 2]
+    # The last event is the forced progress update closing the processing phase
+    kind, progress = events[-1]
+    assert kind == "progress"
+    assert progress["phase"] == "processing"
+    assert progress["processed_emails"] == 7
+
+
+async def test_slow_consumer_with_a_full_event_buffer_still_gets_everything(service): # pylint: disable=redefined-outer-name
+    service.config['event_buffer'] = 1
+    serve_pages(service, make_pages(*([2] * 10)))
+
+    emails = []
+    async for kind, payload in service.get_all_emails_by_folder_id("folder"):
+        await asyncio.sleep(0)  # let the producers run ahead and fill the buffer
+        if kind == "emails":
+            emails.extend(payload)
+
+    assert len(emails) == 20
+
+
+async def test_closing_the_consumer_cancels_the_pipeline(service): # pylint: disable=redefined-outer-name
+    blocked = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def hang_on_second_page(index):
+        if index == 1:
+            blocked.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+    serve_pages(service, make_pages(2, 2), before_page=hang_on_second_page)
+
+    events = service.get_all_emails_by_folder_id("folder")
+    await anext(events)
+    await blocked.wait()
+    await events.aclose()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+async def test_graph_api_error_in_the_fetch_stage_is_raised_as_is(service): # pylint: disable=redefined-outer-name
+    async def fail_on_second_page(index):
+        if index == 1:
+            raise APIError(message="throttled", response_status_code=400)
+
+    serve_pages(service, make_pages(2, 2), before_page=fail_on_second_page)
+
+    with pytest.raises(APIError):
+        await collect(service)
+
+
+async def test_unexpected_error_in_the_translate_stage_is_wrapped(service): # pylint: disable=redefined-outer-name
+    async def broken_translate(ids):
+        raise RuntimeError(f"translator down for {len(ids)} ids")
+
+    service.graph_translator.translate_ids = broken_translate
+    serve_pages(service, make_pages(2))
+
+    with pytest.raises(EmailException) as exc_info:
+        await collect(service)
+    assert "translator down" in exc_info.value.detail
+
+
+async def test_error_in_the_process_stage_is_wrapped(service): # pylint: disable=redefined-outer-name
+    def broken_build(messages, id_mapping): # pylint: disable=unused-argument
+        raise ValueError("bad message")
+
+    service._build_emails = broken_build # pylint: disable=protected-access
+    serve_pages(service, make_pages(2))
+
+    with pytest.raises(EmailException) as exc_info:
+        await collect(service)
+    assert "bad message" in exc_info.value.detail
+
+
+async def test_translation_batches_in_flight_are_capped(service): # pylint: disable=redefined-outer-name
+    service.config['max_concurrent_requests'] = 2
+    in_flight = 0
+    peak = 0
+
+    async def slow_translate(ids):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return [(source_id, f"imm-{source_id}") for source_id in ids]
+
+    service.graph_translator.translate_ids = slow_translate
+    serve_pages(service, make_pages(*([2] * 10)))
+
+    events = await collect(service)
+
+    assert peak == 2
+    assert sum(len(payload) for kind, payload in events if kind == "emails") == 20
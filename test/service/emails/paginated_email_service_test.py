@@ -0,0 +1,55 @@
+# Python standard library imports
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+# Third party imports
+import pytest
+
+# Application imports
+from app.models.email import Email
+from app.service.emails.paginated_email_service import PaginatedEmailService
+
+RECEIVED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_email(source_id):
+    return Email(received_date=RECEIVED, message_id=None, source_id=source_id)
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    paginated_service = PaginatedEmailService(MagicMock())
+    folder_emails = [make_email(f"m{i}") for i in range(50)]
+    paginated_service.fetched = []
+
+    # Cache misses refetch the page the emails were selected from, served here without Graph
+    async def get_page(folder_id, page=1, per_page=25, subject=None): # pylint: disable=unused-argument
+        paginated_service.fetched.append((page, per_page))
+        return {"data": folder_emails[(page - 1) * per_page:page * per_page]}
+    paginated_service.get_paginated_emails_by_folder_id = get_page
+    return paginated_service
+
+
+
+
+async def test_cache_miss_returns_emails_in_selection_order(service): # pylint: disable=redefined-outer-name
+    emails = await service.get_cached_emails_by_ids("folder", ["m20", "missing", "m3"])
+
+    assert [email.source_id for email in emails] == ["m20", "m3"]
+    assert service.fetched == [(1, 25)]
+
+
+async def test_cache_miss_refetches_the_page_the_emails_were_selected_from(service): # pylint: disable=redefined-outer-name
+    emails = await service.get_cached_emails_by_ids("folder", ["m45", "m30"], page=2, per_page=25)
+
+    assert [email.source_id for email in emails] == ["m45", "m30"]
+    assert service.fetched == [(2, 25)]
+
+
+async def test_cache_hit_returns_emails_in_selection_order(service): # pylint: disable=redefined-outer-name
+    await service.email_cache.store_folder_emails("folder", [make_email("a"), make_email("b")])
+
+    emails = await service.get_cached_emails_by_ids("folder", ["b", "a"])
+
+    assert [email.source_id for email in emails] == ["b", "a"]
+    assert not service.fetched
@@ -0,0 +1,187 @@
+# Python standard library imports
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+# Third party imports
+import pytest
+
+# Application imports
+from app.error_handling.exceptions.folder_exception import FolderException
+from app.models.email import Email
+from app.models.folder import Folder
+from app.service.emails.email_cache_service import EmailCacheService
+from app.service.emails.recursive_email_service import RecursiveEmailService
+
+"""
+The walk is driven with a stub folder service serving a fixed tree and a collection service
+that finds no emails, so the assertions only depend on which folder lookups the walk makes.
+"""
+
+
+def make_folder(folder_id, child_folder_count=0):
+    return Folder(
+        id=folder_id,
+        display_name=folder_id,
+        parent_folder_id=None,
+        child_folder_count=child_folder_count,
+        total_item_count=0,
+        unread_item_count=0,
+        is_hidden=False,
+    )
+
+# root -> a, b; a -> a1; b has no children
+TREE = {
+    "root": [make_folder("a", 1), make_folder("b")],
+    "a": [make_folder("a1")],
+    "a1": [],
+    "b": [],
+}
+
+
+# Stand-in for the folder service, serves TREE and records every lookup made.
+class _StubFolderService:
+    def __init__(self, batch_error=None):
+        self.batch_error = batch_error
+        self.child_calls = []
+        self.batch_calls = []
+
+    async def get_folder(self, folder_id):
+        return make_folder(folder_id, len(TREE[folder_id]))
+
+    async def get_child_folders(self, folder_id):
+        self.child_calls.append(folder_id)
+        return list(TREE[folder_id])
+
+    async def get_child_folders_batch(self, parent_ids):
+        self.batch_calls.append(list(parent_ids))
+        if self.batch_error:
+            raise self.batch_error
+        return {parent_id: list(TREE[parent_id]) for parent_id in parent_ids}
+
+
+# Stand-in for the collection service, records the folders walked and serves the given emails,
+# none unless told otherwise.
+class _StubCollectionService:
+    def __init__(self, emails_by_folder=None):
+        self.folders = []
+        self.received_after = {}
+        self.emails_by_folder = emails_by_folder or {}
+
+    async def get_all_emails_by_folder_id(self, folder_id, received_after=None):
+        self.folders.append(folder_id)
+        self.received_after[folder_id] = received_after
+        for batch in self.emails_by_folder.get(folder_id, ()):
+            yield "emails", batch
+
+
+def make_service(folder_service, collection_service=None):
+    return RecursiveEmailService(
+        folder_service,
+        collection_service or _StubCollectionService(),
+        EmailCacheService(),
+        MagicMock(),
+        MagicMock(),
+        max_concurrent_folders=2,
+    )
+
+@pytest.fixture(autouse=True)
+def _no_redis(monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+
+
+
+
+async def test_child_folders_below_the_root_are_fetched_in_batches():
+    folder_service = _StubFolderService()
+    service = make_service(folder_service)
+
+    await service._walk_folders("root", asyncio.Queue()) # pylint: disable=protected-access
+
+    assert sorted(service.email_collection_service.folders) == ["a", "a1", "b", "root"]
+    # Only the root's listing is fetched on its own, "b" and "a1" have no children to ask for
+    assert folder_service.child_calls == ["root"]
+    assert folder_service.batch_calls == [["a"]]
+
+
+async def test_failed_batch_leaves_the_listings_to_each_subfolder():
+    folder_service = _StubFolderService(batch_error=FolderException(detail="batch failed", status_code=500))
+    service = make_service(folder_service)
+
+    await service._walk_folders("root", asyncio.Queue()) # pylint: disable=protected-access
+
+    assert sorted(service.email_collection_service.folders) == ["a", "a1", "b", "root"]
+    assert sorted(folder_service.child_calls) == ["a", "root"]
+
+
+async def test_failed_root_lookup_cancels_the_listing():
+    folder_service = _StubFolderService()
+    listing_cancelled = asyncio.Event()
+
+    async def get_folder(folder_id):
+        raise FolderException(detail=f"{folder_id} not found", status_code=404)
+
+    async def get_child_folders(folder_id): # pylint: disable=unused-argument
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            listing_cancelled.set()
+            raise
+    folder_service.get_folder, folder_service.get_child_folders = get_folder, get_child_folders
+    service = make_service(folder_service)
+
+    with pytest.raises(FolderException):
+        await service._process_single_folder("root", asyncio.Queue()) # pylint: disable=protected-access
+    assert listing_cancelled.is_set()
+
+
+def make_email(source_id, day):
+    return Email(received_date=datetime(2024, 1, day, tzinfo=timezone.utc), message_id=None, source_id=source_id)
+
+async def walk_leaf(service, folder_id="b"):
+    await service._process_single_folder(folder_id, asyncio.Queue(), make_folder(folder_id), []) # pylint: disable=protected-access
+    return service.email_collection_service.received_after[folder_id]
+
+
+async def test_recent_full_download_is_topped_up_from_the_newest_cached_email():
+    service = make_service(_StubFolderService())
+    await service.email_cache_service.store_folder_emails("b", [make_email("m1", 1), make_email("m2", 5)], complete=True)
+
+    assert await walk_leaf(service) == datetime(2024, 1, 5, tzinfo=timezone.utc)
+
+
+async def test_partial_cache_entry_is_downloaded_in_full():
+    service = make_service(_StubFolderService())
+    # A page of the folder, as the paginated service caches it
+    await service.email_cache_service.store_folder_emails("b", [make_email("m1", 1)])
+
+    assert await walk_leaf(service) is None
+
+
+async def test_full_download_past_the_refresh_age_is_downloaded_again():
+    service = make_service(_StubFolderService())
+    await service.email_cache_service.store_folder_emails("b", [make_email("m1", 1)], complete=True)
+    service.email_cache_service.cache["b"].fetched_at -= service.email_cache_service.full_refresh_age + 1
+
+    assert await walk_leaf(service) is None
+
+
+async def test_every_persisted_batch_is_reported_with_bounded_queues():
+    # Ten batches of two emails, each folder sending them in one go
+    emails = [make_email(f"m{i}", 1) for i in range(20)]
+    service = make_service(_StubFolderService(), _StubCollectionService({"root": [emails[:10]], "a": [emails[10:]]}))
+    service.PERSIST_BATCH_SIZE = 2
+    service.PERSIST_QUEUE_SIZE = 1
+    service.EVENT_QUEUE_SIZE = 1
+
+    async def persist_batch(batch, request, successful, duplicates, failures): # pylint: disable=unused-argument
+        await asyncio.sleep(0)
+        successful.extend(email.source_id for email in batch)
+        return {"status": "progress", "message": "Persisted batch"}
+    service._persist_batch = persist_batch # pylint: disable=protected-access
+
+    updates = [update async for update in service.get_all_emails_recursively("root", MagicMock())]
+
+    assert sum(update.get("message") == "Persisted batch" for update in updates) == 10
+    assert updates[-1]["status"] == "persistence_complete"
+    assert sorted(updates[-1]["data"]["successful"]) == sorted(email.source_id for email in emails)
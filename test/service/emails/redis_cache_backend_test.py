@@ -0,0 +1,90 @@
+# Python standard library imports
+from datetime import datetime, timezone
+
+# Third party imports
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+# Application imports
+from app.models.email import Email
+from app.service.emails.redis_cache_backend import RedisCacheBackend
+
+RECEIVED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_email(source_id):
+    return Email(received_date=RECEIVED, message_id=None, source_id=source_id)
+
+
+# Minimal in-memory stand-in for the redis.asyncio client calls the backend makes.
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def hset(self, key, mapping):
+        self.client.hashes.setdefault(key, {}).update(mapping)
+
+    def expire(self, key, ttl):
+        self.client.ttls[key] = ttl
+
+    async def execute(self):
+        return []
+
+class _FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+        self.ttls = {}
+
+    def pipeline(self, transaction=True): # pylint: disable=unused-argument
+        return _FakePipeline(self)
+
+    async def hmget(self, key, fields):
+        stored = self.hashes.get(key, {})
+        return [stored.get(field) for field in fields]
+
+# A client whose every call fails the way an unreachable Redis does.
+class _DownRedis:
+    def pipeline(self, transaction=True):
+        raise RedisConnectionError("connection refused")
+
+    async def hmget(self, key, fields):
+        raise RedisConnectionError("connection refused")
+
+
+
+async def test_set_many_then_get_many_round_trips_emails():
+    client = _FakeRedis()
+    backend = RedisCacheBackend(client)
+
+    await backend.set_many("f1", [make_email("a1"), make_email("a2")], ttl=300)
+    emails = await backend.get_many("f1", ["a2", "missing", "a1"])
+
+    assert client.ttls == {"folder:f1": 300}
+    assert list(emails) == ["a2", "a1"]
+    assert emails["a1"] == make_email("a1")
+
+
+async def test_empty_calls_skip_redis():
+    backend = RedisCacheBackend(_DownRedis())
+
+    assert await backend.get_many("f1", []) == {}
+    await backend.set_many("f1", [], ttl=300)
+
+
+async def test_redis_errors_behave_like_a_cache_miss():
+    backend = RedisCacheBackend(_DownRedis())
+
+    assert await backend.get_many("f1", ["a1"]) == {}
+    # Must not raise
+    await backend.set_many("f1", [make_email("a1")], ttl=300)
+
+
+def test_from_env_is_disabled_without_redis_url(monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+
+    assert RedisCacheBackend.from_env() is None
@@ -0,0 +1,37 @@
+# Python standard library imports
+import asyncio
+from unittest.mock import MagicMock
+
+# Third party imports
+import pytest
+from kiota_abstractions.api_error import APIError
+
+# Application imports
+from app.models.dto.email_selection_dto import EmailSelectionDTO
+from app.service.emails.select_email_service import SelectEmailService
+
+SELECTION = EmailSelectionDTO(email_source_ids=["s1"], ref_id=7, ref_type="MATTER", created_by=3)
+
+
+
+
+async def test_failed_cache_lookup_cancels_the_id_translation():
+    paginated_service = MagicMock()
+    service = SelectEmailService(MagicMock(), MagicMock(), MagicMock(), MagicMock(), paginated_service)
+    translation_cancelled = asyncio.Event()
+
+    async def get_cached_emails_by_ids(folder_id, source_ids, page=1, per_page=25): # pylint: disable=unused-argument
+        raise APIError("folder lookup failed", 404)
+
+    async def translate_ids_parallel(selection): # pylint: disable=unused-argument
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            translation_cancelled.set()
+            raise
+    paginated_service.get_cached_emails_by_ids = get_cached_emails_by_ids
+    service._translate_ids_parallel = translate_ids_parallel # pylint: disable=protected-access
+
+    with pytest.raises(APIError):
+        await service.select_and_persist_emails("folder", SELECTION)
+    assert translation_cancelled.is_set()
@@ -0,0 +1,125 @@
+# Python standard library imports
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+# Third party imports
+import pytest
+from kiota_abstractions.api_error import APIError
+
+# Application imports
+from app.error_handling.exceptions.id_translation_exception import IdTranslationException
+from app.service.graph.graph_id_translation_service import GraphIDTranslator
+from app.utils.graph_utils import GraphUtils
+
+"""
+Graph is replaced at GraphUtils.send_json_batch. Every sub-request is answered by translating
+each ID to "imm-<id>", unless its chunk contains an ID listed in failing_ids.
+"""
+
+
+# Stand-in for the Graph JSON batch endpoint, records the chunks of every batch it was sent.
+class _FakeBatchEndpoint:
+    def __init__(self, failing_ids=(), error=None):
+        self.failing_ids = set(failing_ids)
+        self.error = error
+        self.batches = []
+
+    async def __call__(self, client, requests): # pylint: disable=unused-argument
+        chunks = [request["body"]["inputIds"] for request in requests]
+        self.batches.append(chunks)
+        if self.error:
+            raise self.error
+        return [
+            {"status": 400, "body": {}} if self.failing_ids.intersection(chunk) else
+            {"status": 200, "body": {"value": [{"sourceId": i, "targetId": f"imm-{i}"} for i in chunk]}}
+            for chunk in chunks
+        ]
+
+@pytest.fixture
+def translator():
+    graph = MagicMock()
+    graph.ensure_authenticated = AsyncMock()
+    return GraphIDTranslator(graph)
+
+def use_endpoint(monkeypatch, endpoint):
+    monkeypatch.setattr(GraphUtils, "send_json_batch", endpoint)
+    return endpoint
+
+
+
+
+async def test_concurrent_callers_share_one_batch(monkeypatch, translator): # pylint: disable=redefined-outer-name
+    endpoint = use_endpoint(monkeypatch, _FakeBatchEndpoint())
+
+    first, second = await asyncio.gather(
+        translator.translate_ids(["b", "a"]),
+        translator.translate_ids(["c"]),
+    )
+
+    assert first == [("b", "imm-b"), ("a", "imm-a")]
+    assert second == [("c", "imm-c")]
+    assert endpoint.batches == [[["b", "a"], ["c"]]]
+
+
+async def test_cached_ids_are_not_sent_again(monkeypatch, translator): # pylint: disable=redefined-outer-name
+    endpoint = use_endpoint(monkeypatch, _FakeBatchEndpoint())
+    await translator.translate_ids(["a"])
+
+    assert await translator.translate_ids(["a", "b"]) == [("a", "imm-a"), ("b", "imm-b")]
+    assert endpoint.batches == [[["a"]], [["b"]]]
+
+
+async def test_failed_sub_request_only_fails_its_caller(monkeypatch, translator): # pylint: disable=redefined-outer-name
+    use_endpoint(monkeypatch, _FakeBatchEndpoint(failing_ids={"bad"}))
+    await translator.translate_ids(["cached"])
+
+    failed, succeeded = await asyncio.gather(
+        translator.translate_ids(["cached", "bad"]),
+        translator.translate_ids(["good"]),
+        return_exceptions=True,
+    )
+
+    assert isinstance(failed, IdTranslationException)
+    assert failed.source_ids == ["bad"]
+    assert succeeded == [("good", "imm-good")]
+    # Only the failed chunk's IDs are forgotten, the caller's cached translations stay
+    assert "cached" in translator._id_cache # pylint: disable=protected-access
+
+
+async def test_graph_errors_reach_every_caller(monkeypatch, translator): # pylint: disable=redefined-outer-name
+    use_endpoint(monkeypatch, _FakeBatchEndpoint(error=APIError(message="throttled", response_status_code=429)))
+
+    results = await asyncio.gather(
+        translator.translate_ids(["a"]),
+        translator.translate_ids(["b"]),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, APIError) for result in results)
+
+
+async def test_unexpected_errors_are_wrapped(monkeypatch, translator): # pylint: disable=redefined-outer-name
+    use_endpoint(monkeypatch, _FakeBatchEndpoint(error=RuntimeError("connection reset")))
+
+    with pytest.raises(IdTranslationException) as exc_info:
+        await translator.translate_ids(["a"])
+    assert exc_info.value.source_ids == ["a"]
+
+
+async def test_cancelled_flush_does_not_leave_callers_waiting(monkeypatch, translator): # pylint: disable=redefined-outer-name
+    use_endpoint(monkeypatch, _FakeBatchEndpoint())
+
+    caller = asyncio.create_task(translator.translate_ids(["a"]))
+    await asyncio.sleep(0)  # let the caller queue its IDs and start the flush
+    for flush_task in list(translator._flush_tasks): # pylint: disable=protected-access
+        flush_task.cancel()
+
+    with pytest.raises(IdTranslationException):
+        await asyncio.wait_for(caller, timeout=1)
+    assert not translator._queued # pylint: disable=protected-access
+
+
+async def test_no_input_ids_is_rejected(translator): # pylint: disable=redefined-outer-name
+    with pytest.raises(IdTranslationException) as exc_info:
+        await translator.translate_ids([])
+    assert exc_info.value.status_code == 400
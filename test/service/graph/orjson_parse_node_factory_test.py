@@ -0,0 +1,58 @@
+# Third party imports
+import pytest
+from kiota_abstractions.api_client_builder import register_default_deserializer
+from kiota_abstractions.serialization import ParseNodeFactoryRegistry
+from kiota_abstractions.store.backing_store_parse_node_factory import BackingStoreParseNodeFactory
+from kiota_serialization_json.json_parse_node_factory import JsonParseNodeFactory
+
+# Application imports
+from app.service.graph.orjson_parse_node_factory import OrjsonParseNodeFactory
+
+JSON = "application/json"
+
+
+@pytest.fixture(autouse=True)
+def _restore_registry():
+    # The registry is process wide, put back what the test found
+    factories = dict(ParseNodeFactoryRegistry.CONTENT_TYPE_ASSOCIATED_FACTORIES)
+    yield
+    ParseNodeFactoryRegistry.CONTENT_TYPE_ASSOCIATED_FACTORIES.clear()
+    ParseNodeFactoryRegistry.CONTENT_TYPE_ASSOCIATED_FACTORIES.update(factories)
+
+# Helper: the factory registered for JSON, unwrapped from its backing store proxy.
+def registered_json_factory():
+    factory = ParseNodeFactoryRegistry().CONTENT_TYPE_ASSOCIATED_FACTORIES[JSON]
+    assert isinstance(factory, BackingStoreParseNodeFactory)
+    return factory._concrete # pylint: disable=protected-access
+
+
+
+
+def test_register_replaces_the_stock_factory_behind_the_backing_store():
+    # What GraphServiceClient does on construction
+    register_default_deserializer(JsonParseNodeFactory)
+
+    OrjsonParseNodeFactory.register()
+
+    assert isinstance(registered_json_factory(), OrjsonParseNodeFactory)
+
+
+def test_registering_again_does_not_stack_proxies():
+    OrjsonParseNodeFactory.register()
+    OrjsonParseNodeFactory.register()
+
+    assert isinstance(registered_json_factory(), OrjsonParseNodeFactory)
+
+
+def test_registered_factory_decodes_through_the_registry():
+    OrjsonParseNodeFactory.register()
+
+    node = ParseNodeFactoryRegistry().get_root_parse_node(JSON, b'{"value": [1, 2]}')
+
+    assert node.get_child_node("value").get_collection_of_primitive_values(int) == [1, 2]
+
+
+def test_responses_are_decoded():
+    node = OrjsonParseNodeFactory().get_root_parse_node(JSON, b'{"value": [1, 2]}')
+
+    assert node.get_child_node("value").get_collection_of_primitive_values(int) == [1, 2]
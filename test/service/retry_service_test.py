@@ -0,0 +1,122 @@
+# Python standard library imports
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+# Third party imports
+import pytest
+from kiota_abstractions.api_error import APIError
+
+# Application imports
+from app.models.retries.retry_context import RetryContext
+from app.models.retries.retry_enums import RetryProfile
+from app.service.retry_service import RetryService
+
+
+# Helper: an operation failing with each of the given errors in turn, then returning "ok".
+def failing_operation(*errors):
+    remaining = list(errors)
+
+    async def operation():
+        if remaining:
+            raise remaining.pop(0)
+        return "ok"
+    return operation
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # Record the backoff delays instead of waiting them out
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    return delays
+
+
+
+
+async def test_throttled_api_error_is_retried_after_retry_after(sleeps): # pylint: disable=redefined-outer-name
+    throttled = APIError(message="throttled", response_status_code=429, response_headers={"Retry-After": "3"})
+    context = RetryContext(operation=failing_operation(throttled), error_msg="failed", respect_retry_after=True)
+
+    assert await RetryService().retry_operation(context) == "ok"
+    assert sleeps == [pytest.approx(3.0)]
+
+
+async def test_unavailable_api_error_is_retried_too(sleeps): # pylint: disable=redefined-outer-name
+    unavailable = APIError(message="unavailable", response_status_code=503)
+    context = RetryContext(operation=failing_operation(unavailable), error_msg="failed", respect_retry_after=True)
+
+    assert await RetryService().retry_operation(context) == "ok"
+    assert len(sleeps) == 1
+
+
+async def test_throttled_api_error_aborts_without_respect_retry_after(sleeps): # pylint: disable=redefined-outer-name
+    throttled = APIError(message="throttled", response_status_code=429, response_headers={"Retry-After": "3"})
+    context = RetryContext(operation=failing_operation(throttled), error_msg="failed")
+
+    with pytest.raises(APIError):
+        await RetryService().retry_operation(context)
+    assert not sleeps
+
+
+async def test_other_api_errors_still_abort(sleeps): # pylint: disable=redefined-outer-name
+    not_found = APIError(message="not found", response_status_code=404)
+    context = RetryContext(operation=failing_operation(not_found), error_msg="failed", respect_retry_after=True)
+
+    with pytest.raises(APIError):
+        await RetryService().retry_operation(context)
+    assert not sleeps
+
+
+def test_retry_after_reads_delta_seconds():
+    error = APIError(message="throttled", response_status_code=429, response_headers={"Retry-After": " 7 "})
+
+    assert RetryService._retry_after(error) == 7.0 # pylint: disable=protected-access
+
+
+def test_retry_after_reads_an_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    error = APIError(
+        message="throttled",
+        response_status_code=503,
+        response_headers={"retry-after": [format_datetime(retry_at, usegmt=True)]}
+    )
+
+    assert RetryService._retry_after(error) == pytest.approx(30, abs=2) # pylint: disable=protected-access
+
+
+def test_retry_after_in_the_past_is_zero():
+    error = APIError(
+        message="throttled",
+        response_status_code=503,
+        response_headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    )
+
+    assert RetryService._retry_after(error) == 0.0 # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize("headers", [None, {}, {"Retry-After": ""}, {"Retry-After": "soon"}])
+def test_retry_after_without_a_usable_header_is_none(headers):
+    error = APIError(message="throttled", response_status_code=429, response_headers=headers)
+
+    assert RetryService._retry_after(error) is None # pylint: disable=protected-access
+
+
+def test_retry_after_is_capped_at_max_delay():
+    service = RetryService(retry_profile=RetryProfile.BATCH)
+    error = APIError(message="throttled", response_status_code=429, response_headers={"Retry-After": "3600"})
+
+    assert service._calculate_delay(0, error) == service.max_delay # pylint: disable=protected-access
+
+
+async def test_retry_after_past_the_timeout_fails_fast(sleeps): # pylint: disable=redefined-outer-name
+    service = RetryService()
+    service.max_delay = 3600  # let the wait run past the timeout instead of being capped
+    throttled = APIError(message="throttled", response_status_code=429, response_headers={"Retry-After": "600"})
+    context = RetryContext(operation=failing_operation(throttled), error_msg="failed", respect_retry_after=True)
+
+    with pytest.raises(APIError):
+        await service.retry_operation(context)
+    assert not sleeps
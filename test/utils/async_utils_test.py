@@ -0,0 +1,18 @@
+# Application imports
+from app.utils.async_utils import AsyncUtils
+
+
+
+
+def test_unwrap_exception_group_returns_the_first_nested_exception():
+    first = ValueError("first")
+    group = ExceptionGroup("outer", [ExceptionGroup("inner", [first, KeyError("second")]), TypeError("third")])
+
+    assert AsyncUtils.unwrap_exception_group(group) is first
+
+
+def test_unwrap_exception_group_passes_other_values_through():
+    error = RuntimeError("plain")
+
+    assert AsyncUtils.unwrap_exception_group(error) is error
+    assert AsyncUtils.unwrap_exception_group(None) is None
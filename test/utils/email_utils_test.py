@@ -0,0 +1,148 @@
+# Python standard library imports
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+# Third party imports
+import pytest
+
+# Application imports
+from app.error_handling.exceptions.db_email_exception import DBEmailException
+from app.models.dto.email_selection_dto import EmailSelectionDTO
+from app.models.dto.recursive_email_request_dto import RecursiveEmailRequestDTO
+from app.models.email import Email
+from app.models.persistence_models.email_recipient_types import RecipientType
+from app.utils import email_utils
+from app.utils.email_utils import EmailUtils
+
+RECEIVED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+SELECTION = EmailSelectionDTO(email_source_ids=["s1"], ref_id=7, ref_type="MATTER", created_by=3)
+REQUEST = RecursiveEmailRequestDTO(ref_id=7, ref_type="MATTER", created_by=3)
+
+
+# Helper: an email with the given source ID and recipients.
+def make_email(source_id, receivers=(), cc=(), bcc=(), **fields):
+    return Email(
+        received_date=RECEIVED,
+        message_id=None,
+        source_id=source_id,
+        receivers=list(receivers),
+        cc=list(cc),
+        bcc=list(bcc),
+        **fields,
+    )
+
+
+
+
+def test_email_to_db_email_batch_converts_every_pair():
+    emails = [make_email("s1", subject=None, sender="a@x"), make_email("s2", subject="Hi", body=None)]
+
+    db_emails = EmailUtils.email_to_db_email_batch(emails, SELECTION, ["imm-1", "imm-2"])
+
+    assert [(db.graph_source_id, db.graph_message_id) for db in db_emails] == [("s1", "imm-1"), ("s2", "imm-2")]
+    assert [(db.subject, db.body) for db in db_emails] == [("No Subject", ""), ("Hi", "")]
+    assert all((db.ref_id, db.ref_type, db.created_by) == (7, "MATTER", 3) for db in db_emails)
+    # Every row of a batch shares one created_date
+    assert db_emails[0].created_date == db_emails[1].created_date
+
+
+def test_email_to_db_email_matches_the_batch_conversion():
+    email = make_email("s1", subject="Hi", sender="a@x")
+
+    single = EmailUtils.email_to_db_email(email, SELECTION, "imm-1", RECEIVED)
+    batch = EmailUtils.email_to_db_email_batch([email], SELECTION, ["imm-1"])[0]
+
+    columns = ("ref_id", "from_addr", "subject", "body", "graph_message_id", "graph_source_id")
+    assert [getattr(single, c) for c in columns] == [getattr(batch, c) for c in columns]
+    assert single.created_date == RECEIVED
+
+
+def test_email_to_rows_recursive_builds_one_row_per_email():
+    emails = [make_email("s1", sender="a@x", is_read=True), make_email("s2", has_attachments=True)]
+
+    rows = EmailUtils.email_to_rows_recursive(emails, REQUEST)
+
+    assert [(row["graph_source_id"], row["graph_message_id"]) for row in rows] == [("s1", "s1"), ("s2", "s2")]
+    assert rows[0]["from_addr"] == "a@x"
+    assert rows[0]["is_read"] and rows[1]["has_attachments"]
+    assert all((row["ref_id"], row["ref_type"], row["created_by"]) == (7, "MATTER", 3) for row in rows)
+
+
+def test_email_to_rows_recursive_matches_the_orm_conversion():
+    email = make_email("s1", subject="Hi", conversation_id="c1")
+
+    row = EmailUtils.email_to_rows_recursive((email,), REQUEST)[0]
+    db_email = EmailUtils.email_to_db_email_recursive(email, REQUEST)
+
+    assert row == {column: getattr(db_email, column) for column in row}
+
+
+def test_email_to_rows_recursive_accepts_any_iterable():
+    rows = EmailUtils.email_to_rows_recursive((make_email(f"s{i}") for i in range(3)), REQUEST)
+
+    assert [row["graph_source_id"] for row in rows] == ["s0", "s1", "s2"]
+
+
+def test_extract_email_ids_from_results_reads_the_id_of_each_outcome():
+    successful = [SimpleNamespace(email_id=1), SimpleNamespace(email_id=2)]
+    duplicates = [SimpleNamespace(graph_message_id="imm-3")]
+    failed = [SimpleNamespace(graph_source_id="s4")]
+
+    assert EmailUtils.extract_email_ids_from_results(successful, duplicates, failed) == ([1, 2], ["imm-3"], ["s4"])
+
+
+def test_match_persisted_pairs_emails_with_their_database_ids():
+    emails = [make_email("s1"), make_email("unsaved"), make_email("s2")]
+    persisted = [SimpleNamespace(graph_source_id="s2", email_id=20), SimpleNamespace(graph_source_id="s1", email_id=10)]
+
+    matches = list(EmailUtils._match_persisted(emails, persisted)) # pylint: disable=protected-access
+
+    assert [(email.source_id, email_id) for email, email_id in matches] == [("s1", 10), ("s2", 20)]
+
+
+def test_recipient_rows_from_email_covers_every_recipient_type():
+    email = make_email("s1", receivers=["to@x"], cc=["cc@x"], bcc=["bcc1@x", "bcc2@x"])
+
+    assert EmailUtils.recipient_rows_from_email(email, 10) == [
+        {"email_id": 10, "email_address": "to@x", "recipient_type": RecipientType.TO},
+        {"email_id": 10, "email_address": "cc@x", "recipient_type": RecipientType.CC},
+        {"email_id": 10, "email_address": "bcc1@x", "recipient_type": RecipientType.BCC},
+        {"email_id": 10, "email_address": "bcc2@x", "recipient_type": RecipientType.BCC},
+    ]
+
+
+def test_recipient_rows_from_init_response_emails_skips_emails_not_persisted():
+    emails = [make_email("s1", receivers=["to@x"]), make_email("unsaved", receivers=["lost@x"]), make_email("s2", cc=["cc@x"])]
+    persisted = [SimpleNamespace(graph_source_id="s1", email_id=10), SimpleNamespace(graph_source_id="s2", email_id=20)]
+
+    rows = EmailUtils.recipient_rows_from_init_response_emails(emails, persisted)
+
+    assert [(row["email_id"], row["email_address"]) for row in rows] == [(10, "to@x"), (20, "cc@x")]
+
+
+def test_extract_recipients_from_init_response_emails_matches_the_row_version():
+    emails = [make_email("s1", receivers=["to@x"], bcc=["bcc@x"])]
+    persisted = [SimpleNamespace(graph_source_id="s1", email_id=10)]
+
+    recipients = EmailUtils.extract_recipients_from_init_response_emails(emails, persisted)
+
+    assert [
+        {"email_id": r.email_id, "email_address": r.email_address, "recipient_type": r.recipient_type}
+        for r in recipients
+    ] == EmailUtils.recipient_rows_from_init_response_emails(emails, persisted)
+
+
+def test_email_to_db_email_batch_reports_the_email_that_failed(monkeypatch):
+    build_db_email = email_utils.DBEmail
+
+    def failing_db_email(**columns):
+        if columns["graph_source_id"] == "bad":
+            raise ValueError("invalid email date")
+        return build_db_email(**columns)
+    monkeypatch.setattr(email_utils, "DBEmail", failing_db_email)
+
+    with pytest.raises(DBEmailException) as exc_info:
+        EmailUtils.email_to_db_email_batch(
+            [make_email("s1"), make_email("bad"), make_email("s3")], SELECTION, ["imm-1", "imm-bad", "imm-3"]
+        )
+    assert (exc_info.value.message_id, exc_info.value.source_id) == ("imm-bad", "bad")
@@ -0,0 +1,36 @@
+# Third party imports
+import pytest
+
+# Application imports
+from app.error_handling.exceptions.graph_response_exception import GraphResponseException
+from app.utils.graph_utils import GraphUtils
+
+
+# Stand-in for an SDK collection response.
+class _CollectionResponse:
+    def __init__(self, value):
+        self.value = value
+
+
+class _OtherResponse(_CollectionResponse):
+    pass
+
+
+
+
+def test_get_collection_value_returns_the_value():
+    assert GraphUtils.get_collection_value(_CollectionResponse([1, 2]), _CollectionResponse) == [1, 2]
+
+
+@pytest.mark.parametrize("response, expected_type", [
+    (None, _CollectionResponse),
+    (_CollectionResponse([1]), _OtherResponse),
+    (_CollectionResponse(None), _CollectionResponse),
+])
+def test_get_collection_value_rejects_unusable_responses(response, expected_type):
+    with pytest.raises(GraphResponseException):
+        GraphUtils.get_collection_value(response, expected_type)
+
+
+def test_escape_odata_string_doubles_single_quotes():
+    assert GraphUtils.escape_odata_string("it's") == "it''s"